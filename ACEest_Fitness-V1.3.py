@@ -1,14 +1,16 @@
+import time
+_MODULE_START = time.perf_counter()
 import tkinter as tk
 from tkinter import messagebox, ttk
 from datetime import datetime, date, timedelta
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+from types import SimpleNamespace
+import base64
 import io
-from reportlab.pdfgen import canvas as pdf_canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import Table, TableStyle
-from reportlab.lib import colors as rl_colors
-from reportlab.lib.utils import ImageReader
+import os
+import queue
+import sys
+import threading
+import uuid
 
 # ---------- Color Palette ----------
 COLOR_PRIMARY = "#4CAF50"   # Green
@@ -17,13 +19,293 @@ COLOR_BACKGROUND = "#F8F9FA"
 COLOR_CARD_BG = "#FFFFFF"
 COLOR_TEXT = "#343A40"
 
-# ---------- MET Values for Exercises ----------
-MET_VALUES = {
-    "Warm-up": 3,
-    "Workout": 6,
-    "Cool-down": 2.5
-}
-        
+# ---------- Health Calculations ----------
+# One copy of the formulas, shared with the API and the batch reports in app/.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from app.fitness import calculate_bmi, calculate_bmr, calories_burned  # noqa: E402
+
+# ---------- Startup Timing ----------
+class StartupTimer:
+    """Collects named milestones (seconds since this module started loading)."""
+
+    def __init__(self, start):
+        self.start = start
+        self.marks = []
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        with self._lock:
+            self.marks.append((name, time.perf_counter() - self.start))
+
+    def report(self):
+        with self._lock:
+            lines = [f"  {elapsed * 1000:8.1f} ms  {name}" for name, elapsed in self.marks]
+        return "ACEest startup timing:\n" + "\n".join(lines)
+
+
+STARTUP = StartupTimer(_MODULE_START)
+
+# ---------- Lazy Dependencies ----------
+# matplotlib and ReportLab dominate import time but are only needed for the
+# Progress tab and PDF export, so they load on first use (or on pre-warm).
+_lazy_lock = threading.Lock()
+_matplotlib = None
+
+
+def matplotlib_api():
+    global _matplotlib
+    if _matplotlib is None:
+        with _lazy_lock:
+            if _matplotlib is None:
+                from matplotlib.backends.backend_agg import FigureCanvasAgg
+                from matplotlib.figure import Figure
+                _matplotlib = SimpleNamespace(Figure=Figure, FigureCanvasAgg=FigureCanvasAgg)
+                STARTUP.mark("matplotlib loaded")
+    return _matplotlib
+
+
+def reportlab_api():
+    """The ReportLab namespace the PDF export (``app.reports.draw_report``) renders with."""
+    from app.reports import reportlab_api as load
+    rl = load()
+    STARTUP.mark("reportlab loaded")
+    return rl
+
+
+def prewarm_dependencies():
+    """Import the heavy dependencies on a daemon thread so first use is instant."""
+    def run():
+        matplotlib_api()
+        reportlab_api()
+        STARTUP.mark("pre-warm finished")
+    thread = threading.Thread(target=run, name="aceest-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+# ---------- Background Tasks ----------
+class TaskCancelled(Exception):
+    pass
+
+
+class BackgroundTask:
+    """Handle for a job running on the TaskExecutor worker thread."""
+
+    def __init__(self, executor, fn, args, on_done, on_error, on_progress):
+        self.executor = executor
+        self.fn = fn
+        self.args = args
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise TaskCancelled()
+
+    def report(self, fraction, message=""):
+        # Called from the worker thread; delivered to on_progress on the Tk thread.
+        self.check_cancelled()
+        self.executor._results.put(("progress", self, (fraction, message)))
+
+
+class TaskExecutor:
+    """Runs blocking jobs off the Tk mainloop.
+
+    Jobs run one at a time on a single daemon thread, so writes keep their
+    submission order. Results, errors and progress updates travel back
+    through a thread-safe queue that the Tk thread drains with ``after()``;
+    callbacks therefore always run on the UI thread and may touch widgets.
+    """
+
+    def __init__(self, master, poll_ms=50, name="aceest-worker"):
+        self.master = master
+        self.poll_ms = poll_ms
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+        self.master.after(self.poll_ms, self._poll)
+
+    def submit(self, fn, *args, on_done=None, on_error=None, on_progress=None):
+        """Queue ``fn(task, *args)`` for the worker and return its task handle."""
+        task = BackgroundTask(self, fn, args, on_done, on_error, on_progress)
+        self._jobs.put(task)
+        return task
+
+    def shutdown(self):
+        self._jobs.put(None)
+
+    def _run(self):
+        while True:
+            task = self._jobs.get()
+            if task is None:
+                return
+            try:
+                task.check_cancelled()
+                result = task.fn(task, *task.args)
+                task.check_cancelled()
+            except TaskCancelled:
+                self._results.put(("cancelled", task, None))
+            except Exception as e:
+                self._results.put(("error", task, e))
+            else:
+                self._results.put(("done", task, result))
+
+    def _poll(self):
+        while True:
+            try:
+                kind, task, payload = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if task.on_progress and not task.cancelled:
+                    task.on_progress(*payload)
+            elif kind == "done":
+                if task.on_done:
+                    task.on_done(payload)
+            elif kind == "error":
+                if task.on_error:
+                    task.on_error(payload)
+            elif kind == "cancelled":
+                if task.on_error:
+                    task.on_error(TaskCancelled())
+        self.master.after(self.poll_ms, self._poll)
+
+
+def render_progress_chart(task, categories, values):
+    """Draw the progress charts to PNG bytes on the worker thread."""
+    mpl = matplotlib_api()
+    fig = mpl.Figure(figsize=(8,5), dpi=100, facecolor=COLOR_CARD_BG)
+    mpl.FigureCanvasAgg(fig)
+    chart_colors = [COLOR_SECONDARY, COLOR_PRIMARY, "#FFC107"]
+    ax1 = fig.add_subplot(121)
+    ax1.bar(categories, values, color=chart_colors)
+    ax1.set_title("Total Minutes per Category", fontsize=10, color=COLOR_TEXT)
+    ax1.set_ylabel("Total Minutes", fontsize=8, color=COLOR_TEXT)
+    ax1.tick_params(axis='x', labelsize=8, colors=COLOR_TEXT)
+    ax1.tick_params(axis='y', labelsize=8, colors=COLOR_TEXT)
+    ax1.spines['right'].set_visible(False); ax1.spines['top'].set_visible(False)
+    ax1.grid(axis='y', linestyle='-', alpha=0.3); ax1.set_facecolor(COLOR_CARD_BG)
+    task.check_cancelled()
+    ax2 = fig.add_subplot(122)
+    pie_labels = [c for c, v in zip(categories, values) if v>0]; pie_values = [v for v in values if v>0]
+    pie_colors = [chart_colors[i] for i, v in enumerate(values) if v>0]
+    ax2.pie(pie_values, labels=pie_labels, autopct="%1.1f%%", startangle=90, colors=pie_colors, wedgeprops={"edgecolor":"white",'linewidth':1}, textprops={'fontsize':8,'color':COLOR_TEXT})
+    ax2.set_title("Workout Distribution (%)", fontsize=10, color=COLOR_TEXT); ax2.axis('equal'); ax2.set_facecolor(COLOR_CARD_BG)
+    fig.tight_layout(pad=2.0)
+    task.check_cancelled()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", facecolor=COLOR_CARD_BG)
+    return buf.getvalue()
+
+
+def build_weekly_report_pdf(task, filename, user_info, rows):
+    """Write the weekly PDF report on the worker thread and return its filename."""
+    from app.reports import draw_report
+
+    table_rows = []
+    total = max(len(rows), 1)
+    for i, (cat, e) in enumerate(rows, 1):
+        table_rows.append([cat, e['exercise'], str(e['duration']), f"{e['calories']:.1f}", e['timestamp'].split()[0]])
+        if i % 200 == 0:
+            task.report(0.6 * i / total, f"Preparing rows ({i}/{total})")
+    draw_report(filename, f"Weekly Fitness Report - {user_info['name']}", [
+        f"Regn-ID: {user_info['regn_id']} | Age: {user_info['age']} | Gender: {user_info['gender']}",
+        f"Height: {user_info['height']} cm | Weight: {user_info['weight']} kg | BMI: {user_info['bmi']:.1f} | BMR: {user_info['bmr']:.0f} kcal/day",
+    ], table_rows, progress=lambda fraction, message: task.report(0.6 + 0.4 * fraction, message))
+    return filename
+
+
+# ---------- Sync ----------
+SYNC_INTERVAL_MS = 60000
+
+
+class SyncClient:
+    """Offline-first delta sync of logged sessions with the ACEest API.
+
+    Sessions are saved locally first and queued here under a client-made id.
+    One ``POST /sync`` pushes the queue and pulls everything newer than the
+    last server version, so a normal sync is a single round trip on a pooled
+    keep-alive session. Ids resolve conflicts: the server skips ids it
+    already holds and the client skips pulled sessions it already has.
+    Anything not acknowledged stays queued while offline.
+
+    A new server ``epoch`` (a restart, or another gunicorn worker) only
+    resets the pull; sessions already acknowledged are not uploaded again,
+    and pulled ones the client already has are skipped by id.
+    """
+
+    def __init__(self, base_url, batch_size=500, timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.epoch = None
+        self.version = 0
+        self.local = {}    # id -> (category, entry) for every session we hold
+        self.pending = {}  # id -> (category, entry) not yet acknowledged, oldest first
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        # Created on first sync, so requests stays off the startup path.
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def track(self, category, entry):
+        entry.setdefault("id", uuid.uuid4().hex)
+        with self._lock:
+            self.local[entry["id"]] = (category, entry)
+            self.pending[entry["id"]] = (category, entry)
+
+    def pending_count(self):
+        with self._lock:
+            return len(self.pending)
+
+    def sync(self, task=None):
+        """Push queued sessions and pull new ones; returns ``[(category, entry)]`` received.
+
+        Runs on the app's dedicated sync TaskExecutor.
+        """
+        received = []
+        while True:
+            with self._lock:
+                batch = list(self.pending.items())[:self.batch_size]
+            payload = {"since_version": self.version, "changes": [
+                {"id": entry_id, "category": category, "workout": entry["exercise"],
+                 "duration": entry["duration"], "timestamp": entry["timestamp"]}
+                for entry_id, (category, entry) in batch]}
+            params = {"epoch": self.epoch} if self.epoch else None
+            response = self.session.post(f"{self.base_url}/sync", json=payload, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            body = response.json()
+            with self._lock:
+                # Rejected entries would fail the same way on every retry.
+                for entry_id in body["applied"] + body["duplicates"] + [e["id"] for e in body["errors"]]:
+                    self.pending.pop(entry_id, None)
+                for change in body["changes"]:
+                    if change["id"] in self.local:
+                        continue
+                    category = change.pop("category")
+                    self.local[change["id"]] = (category, change)
+                    received.append((category, change))
+                self.epoch, self.version = body["epoch"], body["version"]
+            if task is not None:
+                task.check_cancelled()
+            if not body["more"] and len(batch) < self.batch_size:
+                return received
+
+
 class FitnessTrackerApp:
     def __init__(self, master):
         self.master = master
@@ -65,12 +347,27 @@ class FitnessTrackerApp:
 
         self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_change)
 
+        # --- Background Work ---
+        self.executor = TaskExecutor(master)
+        self.chart_task = None
+        self.export_task = None
+        # Sync is opt-in: without ACEEST_API_URL the app works fully offline.
+        api_url = os.environ.get("ACEEST_API_URL")
+        self.sync_client = SyncClient(api_url) if api_url else None
+        # Its own worker: a sync waiting out a network timeout must not hold up charts or PDF exports.
+        self.sync_executor = TaskExecutor(master, name="aceest-sync") if self.sync_client else None
+        self.sync_task = None
+        self.sync_again = False
+
         # --- Initialize Tabs ---
         self.create_user_info_section()
         self.create_log_tab()
         self.create_workout_plan_tab()
         self.create_diet_guide_tab()
         self.create_progress_tab()
+        self.create_task_status()
+        if self.sync_client:
+            master.after(1000, self.schedule_sync)
     # ADD THESE if not already present
     def create_workout_plan_tab(self):
         tk.Label(self.chart_tab, text="Workout Plan coming soon.", bg=COLOR_BACKGROUND).pack(pady=100)
@@ -84,6 +381,28 @@ class FitnessTrackerApp:
         if "Progress Tracker" in selected_tab:
             self.update_progress_charts()
 
+    # ---------- Task Status ----------
+    def create_task_status(self):
+        self.task_frame = tk.Frame(self.master, bg=COLOR_CARD_BG, padx=10, pady=8, relief=tk.RIDGE, bd=1)
+        self.task_label = tk.Label(self.task_frame, text="", anchor="w", bg=COLOR_CARD_BG, fg="#6C757D", font=("Inter", 10))
+        self.task_label.pack(fill="x")
+        self.task_progress = ttk.Progressbar(self.task_frame, mode="determinate", maximum=1.0)
+        self.task_progress.pack(fill="x", pady=4)
+        ttk.Button(self.task_frame, text="Cancel", command=self.cancel_export).pack(anchor="e")
+
+    def show_task_status(self, message, fraction=0.0):
+        self.task_label.config(text=message)
+        self.task_progress["value"] = fraction
+        self.task_frame.place(x=20, y=400, width=300)
+
+    def hide_task_status(self):
+        self.task_frame.place_forget()
+
+    def cancel_export(self):
+        if self.export_task:
+            self.export_task.cancel()
+            self.show_task_status("Cancelling export...", self.task_progress["value"])
+
     # ---------- User Info ----------
     def create_user_info_section(self):
         info_frame = tk.Frame(self.master, bg=COLOR_CARD_BG, padx=20, pady=15, relief=tk.RIDGE, bd=2)
@@ -118,11 +437,8 @@ class FitnessTrackerApp:
             gender = self.gender_entry.get().strip().upper()
             height_cm = float(self.height_entry.get().strip())
             weight_kg = float(self.weight_entry.get().strip())
-            bmi = weight_kg / ((height_cm/100)**2)
-            if gender == "M":
-                bmr = 10*weight_kg + 6.25*height_cm - 5*age + 5
-            else:
-                bmr = 10*weight_kg + 6.25*height_cm - 5*age - 161
+            bmi = calculate_bmi(weight_kg, height_cm)
+            bmr = calculate_bmr(weight_kg, height_cm, age, gender)
             self.user_info = {
                 "name": name, "regn_id": regn_id, "age": age, "gender": gender,
                 "height": height_cm, "weight": weight_kg, "bmi": bmi, "bmr": bmr,
@@ -170,16 +486,16 @@ class FitnessTrackerApp:
             if duration <= 0: raise ValueError
         except ValueError:
             messagebox.showerror("Input Error", "Duration must be a positive whole number."); return
-        # Calories calculation
-        weight = self.user_info.get("weight", 70)
-        met = MET_VALUES.get(category, 5)
-        calories = (met * 3.5 * weight / 200) * duration
+        calories = calories_burned(category, duration, self.user_info.get("weight", 70))
         entry = {"exercise": workout, "duration": duration, "calories": calories, "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
         self.workouts[category].append(entry)
         today_iso = date.today().isoformat()
         if today_iso not in self.daily_workouts:
             self.daily_workouts[today_iso] = {"Warm-up": [], "Workout": [], "Cool-down": []}
         self.daily_workouts[today_iso][category].append(entry)
+        if self.sync_client:
+            self.sync_client.track(category, entry)
+            self.request_sync()
         self.workout_entry.delete(0, tk.END); self.duration_entry.delete(0, tk.END)
         self.status_label.config(text=f"Added {workout} ({duration} min) to {category}! 💪")
         self.update_progress_charts()
@@ -218,60 +534,121 @@ class FitnessTrackerApp:
         self.chart_canvas = None
 
     def update_progress_charts(self):
-        for widget in self.chart_container.winfo_children(): widget.destroy()
         totals = {cat: sum(entry['duration'] for entry in sessions) for cat, sessions in self.workouts.items()}
         categories = list(totals.keys()); values = list(totals.values())
+        if self.chart_task:
+            self.chart_task.cancel()
         if sum(values) == 0:
+            self.chart_task = None
+            for widget in self.chart_container.winfo_children(): widget.destroy()
             tk.Label(self.chart_container, text="No workout data logged yet.", font=("Inter", 14, "italic"), fg="#888", bg=COLOR_CARD_BG).pack(pady=100); return
-        fig = Figure(figsize=(8,5), dpi=100, facecolor=COLOR_CARD_BG)
-        chart_colors = [COLOR_SECONDARY, COLOR_PRIMARY, "#FFC107"]
-        ax1 = fig.add_subplot(121)
-        ax1.bar(categories, values, color=chart_colors)
-        ax1.set_title("Total Minutes per Category", fontsize=10, color=COLOR_TEXT)
-        ax1.set_ylabel("Total Minutes", fontsize=8, color=COLOR_TEXT)
-        ax1.tick_params(axis='x', labelsize=8, colors=COLOR_TEXT)
-        ax1.tick_params(axis='y', labelsize=8, colors=COLOR_TEXT)
-        ax1.spines['right'].set_visible(False); ax1.spines['top'].set_visible(False)
-        ax1.grid(axis='y', linestyle='-', alpha=0.3); ax1.set_facecolor(COLOR_CARD_BG)
-        ax2 = fig.add_subplot(122)
-        pie_labels = [c for c, v in zip(categories, values) if v>0]; pie_values = [v for v in values if v>0]
-        pie_colors = [chart_colors[i] for i, v in enumerate(values) if v>0]
-        ax2.pie(pie_values, labels=pie_labels, autopct="%1.1f%%", startangle=90, colors=pie_colors, wedgeprops={"edgecolor":"white",'linewidth':1}, textprops={'fontsize':8,'color':COLOR_TEXT})
-        ax2.set_title("Workout Distribution (%)", fontsize=10, color=COLOR_TEXT); ax2.axis('equal'); ax2.set_facecolor(COLOR_CARD_BG)
-        fig.tight_layout(pad=2.0)
-        self.chart_canvas = FigureCanvasTkAgg(fig, master=self.chart_container)
-        self.chart_canvas.draw(); self.chart_canvas.get_tk_widget().pack(fill="both", expand=True)
-        total_minutes = sum(values)
-        tk.Label(self.progress_tab, text=f"LIFETIME TOTAL: {total_minutes} minutes logged", font=("Inter", 13, "bold"), bg=COLOR_CARD_BG, fg="#DC3545").pack(pady=(10,5))
+        task = self.chart_task = self.executor.submit(render_progress_chart, categories, values, on_done=lambda png: self.show_progress_chart(task, png, sum(values)))
+
+    def show_progress_chart(self, task, png, total_minutes):
+        if task is not self.chart_task:
+            # Finished before its cancel() landed; a newer render (or the empty state) owns the view.
+            return
+        self.chart_task = None
+        for widget in self.chart_container.winfo_children(): widget.destroy()
+        self.chart_image = tk.PhotoImage(data=base64.b64encode(png))
+        self.chart_canvas = tk.Label(self.chart_container, image=self.chart_image, bg=COLOR_CARD_BG)
+        self.chart_canvas.pack(fill="both", expand=True)
+        if getattr(self, "total_label", None) is None:
+            self.total_label = tk.Label(self.progress_tab, font=("Inter", 13, "bold"), bg=COLOR_CARD_BG, fg="#DC3545")
+            self.total_label.pack(pady=(10,5))
+        self.total_label.config(text=f"LIFETIME TOTAL: {total_minutes} minutes logged")
     
+    # ---------- Sync ----------
+    def schedule_sync(self):
+        self.request_sync()
+        self.master.after(SYNC_INTERVAL_MS, self.schedule_sync)
+
+    def request_sync(self):
+        if self.sync_task:
+            # Coalesce: one more sync after the running one picks up new sessions.
+            self.sync_again = True; return
+        self.sync_task = self.sync_executor.submit(self.sync_client.sync, on_done=self.on_sync_done, on_error=self.on_sync_error)
+
+    def on_sync_done(self, received):
+        self.sync_task = None
+        weight = self.user_info.get("weight", 70)
+        for category, change in received:
+            if category not in self.workouts:
+                continue
+            entry = {"id": change["id"], "exercise": change["exercise"], "duration": change["duration"],
+                     "calories": calories_burned(category, change["duration"], weight),
+                     "timestamp": change["timestamp"]}
+            self.workouts[category].append(entry)
+            day = self.daily_workouts.setdefault(entry["timestamp"][:10], {"Warm-up": [], "Workout": [], "Cool-down": []})
+            day[category].append(entry)
+        if received:
+            self.status_label.config(text=f"Synced {len(received)} new session(s) from the server.")
+            self.update_progress_charts()
+        if self.sync_again:
+            self.sync_again = False
+            self.request_sync()
+
+    def on_sync_error(self, error):
+        self.sync_task = None
+        self.sync_again = False
+        waiting = self.sync_client.pending_count()
+        if waiting:
+            self.status_label.config(text=f"Offline: {waiting} session(s) will sync when the server is reachable.")
+
     # ---------- PDF Report ----------
     def export_weekly_report(self):
         if not self.user_info:
             messagebox.showerror("Error", "Please save user info first!"); return
+        if self.export_task:
+            messagebox.showinfo("PDF Export", "An export is already running."); return
         filename = f"{self.user_info['name'].replace(' ','_')}_weekly_report.pdf"
-        c = pdf_canvas.Canvas(filename, pagesize=A4); width, height = A4
-        c.setFont("Helvetica-Bold", 16); c.drawString(50, height-50, f"Weekly Fitness Report - {self.user_info['name']}")
-        # User Info
-        c.setFont("Helvetica", 11)
-        c.drawString(50, height-80, f"Regn-ID: {self.user_info['regn_id']} | Age: {self.user_info['age']} | Gender: {self.user_info['gender']}")
-        c.drawString(50, height-100, f"Height: {self.user_info['height']} cm | Weight: {self.user_info['weight']} kg | BMI: {self.user_info['bmi']:.1f} | BMR: {self.user_info['bmr']:.0f} kcal/day")
-        # Table of workouts
-        y = height-140
-        table_data = [["Category","Exercise","Duration(min)","Calories(kcal)","Date"]]
-        for cat, sessions in self.workouts.items():
-            for e in sessions:
-                table_data.append([cat,e['exercise'],str(e['duration']),f"{e['calories']:.1f}", e['timestamp'].split()[0]])
-        table = Table(table_data, colWidths=[80,150,80,80,80])
-        table.setStyle(TableStyle([("BACKGROUND",(0,0),(-1,0),rl_colors.lightblue),("GRID",(0,0),(-1,-1),0.5,rl_colors.black)]))
-        table.wrapOn(c, width-100, y); table.drawOn(c,50,y-20)
-        c.save()
+        # Snapshot the data on the Tk thread; the worker never touches live state.
+        rows = [(cat, dict(e)) for cat, sessions in self.workouts.items() for e in sessions]
+        self.show_task_status("Exporting weekly report...")
+        self.export_task = self.executor.submit(
+            build_weekly_report_pdf, filename, dict(self.user_info), rows,
+            on_done=self.on_export_done, on_error=self.on_export_error,
+            on_progress=lambda fraction, message: self.show_task_status(message, fraction))
+
+    def on_export_done(self, filename):
+        self.export_task = None
+        self.hide_task_status()
         messagebox.showinfo("PDF Export", f"Weekly report exported successfully as {filename}")
 
+    def on_export_error(self, error):
+        self.export_task = None
+        self.hide_task_status()
+        if isinstance(error, TaskCancelled):
+            self.status_label.config(text="PDF export cancelled.")
+        else:
+            messagebox.showerror("PDF Export", f"Export failed: {error}")
+
 # ---------- Main ----------
+def on_first_idle(report):
+    # The first idle callback runs once the window has been drawn and the
+    # event loop is accepting input.
+    STARTUP.mark("first window interactive")
+    prewarm = os.environ.get("ACEEST_PREWARM", "1") != "0"
+    if prewarm:
+        thread = prewarm_dependencies()
+    if report:
+        print(STARTUP.report(), file=sys.stderr)
+        if prewarm:
+            def report_when_warm():
+                if thread.is_alive():
+                    root.after(100, report_when_warm); return
+                print(STARTUP.report(), file=sys.stderr)
+            root.after(100, report_when_warm)
+
+
 if __name__ == "__main__":
+    STARTUP.mark("modules imported")
+    show_report = "--startup-report" in sys.argv or os.environ.get("ACEEST_STARTUP_REPORT") == "1"
     root = tk.Tk()
     app = FitnessTrackerApp(root)
     # Button placed inside main window for exporting weekly report
     export_btn = ttk.Button(root, text="📄 Export Weekly PDF Report", command=app.export_weekly_report, style="Secondary.TButton")
     export_btn.place(x=20, y=350)
+    STARTUP.mark("window built")
+    root.after_idle(on_first_idle, show_report)
     root.mainloop()
@@ -0,0 +1,186 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import g, jsonify, request
+
+# Probes and the static UI must never be throttled.
+EXEMPT_PREFIXES = ("/health", "/ready", "/ui", "/static/")
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+DEFAULTS = {
+    "RATELIMIT_ENABLED": True,
+    "RATELIMIT_TRUST_FORWARDED": False,
+    "RATELIMIT_MAX_CLIENTS": 10000,
+    "RATELIMIT_CLIENT_READ_RATE": 50.0,
+    "RATELIMIT_CLIENT_READ_BURST": 100,
+    "RATELIMIT_CLIENT_WRITE_RATE": 20.0,
+    "RATELIMIT_CLIENT_WRITE_BURST": 40,
+    "RATELIMIT_GLOBAL_READ_RATE": 1000.0,
+    "RATELIMIT_GLOBAL_READ_BURST": 2000,
+    "RATELIMIT_GLOBAL_WRITE_RATE": 400.0,
+    "RATELIMIT_GLOBAL_WRITE_BURST": 800,
+    # None: the worker's thread count (gunicorn's real one, see gunicorn.conf.py).
+    "SHED_MAX_INFLIGHT": None,
+    # Requests accepted by this worker but still waiting for a free thread.
+    "SHED_MAX_BACKLOG": 8,
+    "SHED_MAX_QUEUE_MS": 2000,
+}
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def wait_time(self, now: float, cost: float = 1.0) -> float:
+        """Refill, then return how long until ``cost`` tokens exist (0 if they do now)."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+    def consume(self, cost: float = 1.0):
+        self.tokens -= cost
+
+
+class Admission:
+    """Per-client and global token buckets plus in-flight/backlog/queue-time load shedding."""
+
+    def __init__(self, config, threads: int = 4):
+        self.trust_forwarded = config["RATELIMIT_TRUST_FORWARDED"]
+        self.max_clients = config["RATELIMIT_MAX_CLIENTS"]
+        self.fixed_inflight = config["SHED_MAX_INFLIGHT"]
+        self.max_inflight = threads if self.fixed_inflight is None else self.fixed_inflight
+        self.max_backlog = config["SHED_MAX_BACKLOG"]
+        # Set by use_worker() when the server exposes its own queue; None otherwise.
+        self.backlog = None
+        self.max_queue_ms = config["SHED_MAX_QUEUE_MS"]
+        self.limits = {
+            kind: (config[f"RATELIMIT_CLIENT_{kind.upper()}_RATE"], config[f"RATELIMIT_CLIENT_{kind.upper()}_BURST"])
+            for kind in ("read", "write")
+        }
+        now = time.monotonic()
+        self.global_buckets = {
+            kind: TokenBucket(config[f"RATELIMIT_GLOBAL_{kind.upper()}_RATE"], config[f"RATELIMIT_GLOBAL_{kind.upper()}_BURST"], now)
+            for kind in ("read", "write")
+        }
+        # LRU of client buckets so a scan of spoofed addresses cannot grow memory.
+        self.clients: OrderedDict[tuple[str, str], TokenBucket] = OrderedDict()
+        self.inflight = 0
+        self.shed = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def use_worker(self, threads: int, backlog):
+        """Adopt the server's real thread count and a ``backlog()`` of requests waiting for a thread."""
+        if self.fixed_inflight is None:
+            self.max_inflight = threads
+        self.backlog = backlog
+
+    def client_id(self) -> str:
+        if self.trust_forwarded and request.access_route:
+            return request.access_route[0]
+        return request.remote_addr or "unknown"
+
+    def admit(self, client: str, kind: str, queued_ms: float | None):
+        """Return ``None`` to admit, or ``(status, error, retry_after_seconds)`` to reject."""
+        now = time.monotonic()
+        waiting = self.backlog() if self.backlog is not None else 0
+        with self.lock:
+            if (self.inflight >= self.max_inflight or waiting > self.max_backlog
+                    or (queued_ms is not None and queued_ms > self.max_queue_ms)):
+                self.shed += 1
+                return 503, "Server overloaded, retry later", 1
+            key = (client, kind)
+            bucket = self.clients.get(key)
+            if bucket is None:
+                bucket = TokenBucket(*self.limits[kind], now)
+                self.clients[key] = bucket
+                if len(self.clients) > self.max_clients:
+                    self.clients.popitem(last=False)
+            else:
+                self.clients.move_to_end(key)
+            client_wait = bucket.wait_time(now)
+            if client_wait:
+                self.throttled += 1
+                return 429, "Rate limit exceeded", client_wait
+            global_bucket = self.global_buckets[kind]
+            global_wait = global_bucket.wait_time(now)
+            if global_wait:
+                self.shed += 1
+                return 503, "Server overloaded, retry later", global_wait
+            bucket.consume()
+            global_bucket.consume()
+            self.inflight += 1
+        return None
+
+    def release(self):
+        with self.lock:
+            self.inflight -= 1
+
+
+def queued_ms() -> float | None:
+    """Time spent queued upstream, from an ``X-Request-Start: t=<epoch>`` header if a proxy set one."""
+    header = request.headers.get("X-Request-Start")
+    if not header:
+        return None
+    try:
+        start = float(header.removeprefix("t="))
+    except ValueError:
+        return None
+    # Proxies disagree on units: seconds, milliseconds or microseconds.
+    if start > 1e14:
+        start /= 1e6
+    elif start > 1e11:
+        start /= 1e3
+    return max(0.0, (time.time() - start) * 1000)
+
+
+def gthread_backlog(worker):
+    """``backlog()`` for a gunicorn gthread worker, or None for other worker classes.
+
+    The worker hands each readable connection to its thread pool and keeps
+    the future until the request is done, so futures beyond the thread
+    count are requests that were accepted but have not started. Without
+    this, a request's wait is invisible to the app: in-flight requests can
+    never outnumber the threads.
+    """
+    futures = getattr(worker, "futures", None)
+    if futures is None:
+        return None
+    threads = worker.cfg.threads
+    return lambda: max(0, len(futures) - threads)
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    app.admission = admission = Admission(app.config, app.config["READY_WORKER_THREADS"])
+    if not app.config["RATELIMIT_ENABLED"]:
+        return
+
+    @app.before_request
+    def admit_request():
+        if request.path.startswith(EXEMPT_PREFIXES):
+            return None
+        kind = "write" if request.method in WRITE_METHODS else "read"
+        rejected = admission.admit(admission.client_id(), kind, queued_ms())
+        if rejected is None:
+            g.admitted = True
+            return None
+        status, error, retry_after = rejected
+        response = jsonify(error=error)
+        response.status_code = status
+        response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+        return response
+
+    @app.teardown_request
+    def release_request(exc):
+        if g.pop("admitted", False):
+            admission.release()
@@ -1,68 +1,389 @@
-from flask import Flask, request, jsonify, render_template
-from datetime import datetime
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+from flask import Flask, request, jsonify, render_template, abort, send_file
+from . import (admission, capture, counters, goals, idempotency, importer, ingest, jsonlog, members, profiling, readiness,
+               recommendations, retention, snapshot, streaks, sync)
+from .assets import IMMUTABLE, StaticAssets, prerender
+from .leaderboard import METRICS, OVERALL, Leaderboard
+from .search import ExerciseIndex
+from .sketch import DurationStats
+from .validation import ValidationError, parse_profile, parse_workout
 
 def create_app(test_config: dict | None = None):
-    app = Flask(__name__)
+    # Static files are served from memory by serve_static() below.
+    app = Flask(__name__, static_folder=None)
+    # Settings can be overridden from the environment, e.g. ACEEST_SHED_MAX_INFLIGHT=64.
+    app.config.from_prefixed_env("ACEEST")
     if test_config:
         app.config.update(test_config)
 
-    app.workouts = {"Warm-up": [], "Workout": [], "Cool-down": []}
+    # Registered first so its timer wraps every other hook.
+    jsonlog.init_app(app)
+    readiness.init_app(app)
+    capture.init_app(app)
+    profiling.init_app(app)
+    admission.init_app(app)
+    idempotency.init_app(app)
+    sync.init_app(app)
+    for module in (counters, importer, snapshot):
+        for key, value in module.DEFAULTS.items():
+            app.config.setdefault(key, value)
+
+    # Recent sessions stay in memory; older ones are sealed to disk when RETENTION_DIR is set.
+    retention.init_app(app, ("Warm-up", "Workout", "Cool-down"))
+    app.search_index = ExerciseIndex()
+    app.leaderboard = Leaderboard(app.workouts)
+    app.duration_stats = DurationStats(app.workouts)
+    app.counters = counters.SharedCounters(app.workouts, app.config["SHARED_COUNTERS_PATH"])
+    members.init_app(app)
+    goals.init_app(app)
+    streaks.init_app(app)
+    recommendations.init_app(app)
+
+    # Stamping and appending happen under one lock, so each category's store
+    # order is its sync version order and /sync can binary-search the store.
+    write_order = threading.Lock()
+
+    def record(category, entry):
+        # Single write path: every store and index is updated here.
+        started = time.perf_counter()
+        app.members.attach(category, entry)
+        with write_order:
+            app.sync_log.stamp(category, entry)
+            app.workouts[category].append(entry)
+        app.goals.add(category, entry)
+        app.streaks.add(category, entry)
+        app.recommender.add(category, entry)
+        app.search_index.add(category, entry)
+        app.leaderboard.add(category, entry)
+        app.duration_stats.add(category, entry["duration"])
+        app.counters.add(category, entry["duration"])
+        app.readiness.record_write((time.perf_counter() - started) * 1000)
+
+    def record_batch(items, count_shared=True, timed=True):
+        # Bulk variant of record(): indexes aggregate the batch before re-ranking.
+        # Group commits time the batch themselves, log write included (timed=False).
+        started = time.perf_counter()
+        app.members.attach_many(items)
+        grouped = {}
+        for category, entry in items:
+            grouped.setdefault(category, []).append(entry)
+        with write_order:
+            app.sync_log.stamp_many(items)
+            for category, entries in grouped.items():
+                app.workouts[category].extend(entries)
+        app.goals.add_many(items)
+        app.streaks.add_many(items)
+        app.recommender.add_many(items)
+        app.search_index.add_many(items)
+        app.leaderboard.add_many(items)
+        app.duration_stats.add_many(items)
+        if count_shared:
+            app.counters.add_many(items)
+        if timed:
+            app.readiness.record_write((time.perf_counter() - started) * 1000, len(items))
+
+    # Bulk writers outside a request (snapshot loading, data generators) use this.
+    app.record_batch = record_batch
+
+    snapshot_path = app.config["SNAPSHOT_PATH"]
+    loaded_snapshot = None
+    if snapshot_path and os.path.exists(snapshot_path):
+        # When the shared counters already existed, another worker has
+        # counted this snapshot in; only this worker's own store is filled.
+        loaded_snapshot = snapshot.load(snapshot_path, lambda items: record_batch(items, app.counters.created),
+                                        app.config["IMPORT_BATCH_SIZE"])
+    # Replays INGEST_WAL_PATH (from the last checkpoint into this snapshot,
+    # skipping ids it already has) and sets app.ingest when API writes
+    # should be group-committed. Readiness then sees each commit's write,
+    # fsync and apply time, not just the in-memory part.
+    ingest.init_app(app, lambda items: record_batch(items, timed=False),
+                    lambda items: record_batch(items, app.counters.created),
+                    app.sync_log.claim, loaded_snapshot, app.readiness.record_write)
+
+    def write_batch(items):
+        # API writes: group-committed (and logged) when app.ingest is set.
+        if app.ingest is None:
+            record_batch(items)
+        else:
+            app.ingest.submit(items)
 
     @app.get("/")
     def index():
-        return jsonify(message="ACEestFitness API is running", docs=["/health", "/workouts", "/summary"]), 200
+        return jsonify(message="ACEestFitness API is running", docs=["/health", "/ready", "/workouts", "/workouts/search", "/sync", "/members/<regn_id>", "/goals/progress", "/streaks", "/recommendations", "/leaderboard", "/summary", "/summary/stats", "/snapshot"]), 200
 
     @app.get("/health")
     def health():
         return jsonify(status="ok"), 200
 
+    @app.get("/ready")
+    def ready():
+        # Liveness stays on /health; this one fails while the worker is saturated.
+        is_ready, report = app.readiness.check()
+        return jsonify(status="ready" if is_ready else "saturated", **report), 200 if is_ready else 503
+
+    def create_workout(data):
+        try:
+            category, entry = parse_workout(data, app.workouts)
+        except ValidationError as e:
+            return {"error": str(e)}, 400
+        if app.ingest is None:
+            record(category, entry)
+        else:
+            app.ingest.submit(((category, entry),))
+        return {"message": "Workout added", "entry": entry, "category": category}, 201
+
     @app.post("/workouts")
     def add_workout():
         if not request.is_json:
             return jsonify(error="Expected application/json"), 415
 
-        data = request.get_json(silent=True) or {}
-        category = data.get("category", "Workout")  # Default to "Workout"
-        workout = (data.get("workout") or "").strip()
-        duration = data.get("duration")
+        key = request.headers.get("Idempotency-Key")
+        if key is None:
+            body, status = create_workout(request.get_json(silent=True) or {})
+            return jsonify(body), status
 
-        if category not in app.workouts:
-            return jsonify(error="Invalid category. Must be: Warm-up, Workout, or Cool-down"), 400
-
-        if not workout:
-            return jsonify(error="Field 'workout' is required"), 400
+        if not key or len(key) > idempotency.MAX_KEY_LENGTH:
+            return jsonify(error=f"Idempotency-Key must be 1-{idempotency.MAX_KEY_LENGTH} characters"), 400
+        state, stored = app.idempotency.begin(key, idempotency.fingerprint(request.get_data()))
+        if state == "replay":
+            response = jsonify(stored)
+            response.status_code = 201
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+        if state == "conflict":
+            return jsonify(error="Idempotency-Key was already used with a different request body"), 422
+        if state == "in_progress":
+            return jsonify(error="A request with this Idempotency-Key is still being processed"), 409
 
         try:
-            duration = int(duration)
-            if duration <= 0:
-                raise ValueError
+            body, status = create_workout(request.get_json(silent=True) or {})
         except Exception:
-            return jsonify(error="Field 'duration' must be a positive integer (minutes)"), 400
+            app.idempotency.abandon(key)
+            raise
+        if status == 201:
+            app.idempotency.complete(key, body)
+        else:
+            # Only successes are remembered, so a corrected retry can reuse the key.
+            app.idempotency.abandon(key)
+        return jsonify(body), status
 
-        entry = {
-            "exercise": workout,
-            "duration": duration,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        app.workouts[category].append(entry)
-        return jsonify(message="Workout added", entry=entry, category=category), 201
+    def json_items(items, chunk_size=1000):
+        # Comma-separated JSON for a stream of items, encoded a chunk at a time.
+        chunk, first = [], True
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield ("" if first else ",") + app.json.dumps(chunk, separators=(",", ":"))[1:-1]
+                chunk, first = [], False
+        if chunk:
+            yield ("" if first else ",") + app.json.dumps(chunk, separators=(",", ":"))[1:-1]
+
+    def json_categories(views):
+        # ``{category: [session, ...]}`` streamed from views of the store.
+        yield "{"
+        for i, (category, view) in enumerate(views.items()):
+            yield ("," if i else "") + app.json.dumps(category) + ":["
+            yield from json_items(view)
+            yield "]"
+        yield "}"
 
     @app.get("/workouts")
     def list_workouts():
-        all_workouts = []
-        for category, sessions in app.workouts.items():
-            for session in sessions:
-                all_workouts.append({**session, "category": category})
-        return jsonify(workouts=all_workouts, count=len(all_workouts), by_category=app.workouts), 200
+        # Streamed from one view of both tiers: sealed segments are read a
+        # line at a time instead of loading the whole history per request.
+        views = app.workouts.views()
+        count = sum(len(view) for view in views.values())
+
+        def generate():
+            yield '{"by_category":'
+            yield from json_categories(views)
+            yield f',"count":{count},"workouts":['
+            yield from json_items({**session, "category": category}
+                                  for category, view in views.items() for session in view)
+            yield "]}\n"
+
+        return app.response_class(generate(), mimetype="application/json")
+
+    @app.post("/workouts/import")
+    def import_workouts():
+        fmt = importer.detect_format(request.mimetype, request.args.get("format"))
+        if fmt is None:
+            return jsonify(error="Expected text/csv or application/x-ndjson"), 415
+        report = importer.import_rows(
+            importer.iter_rows(request.stream, fmt), app.workouts, write_batch,
+            app.config["IMPORT_BATCH_SIZE"], app.config["IMPORT_MAX_ERRORS"])
+        return jsonify(report.as_dict()), 200
+
+    def sync_since(since_version):
+        # A version from another server run (or from the future) means nothing here.
+        epoch = request.args.get("epoch")
+        if (epoch and epoch != app.sync_log.epoch) or since_version > app.sync_log.version:
+            since_version = 0
+        changes, more, upto = sync.changes_since(
+            app.sync_log, app.workouts, since_version, app.config["SYNC_PAGE_SIZE"])
+        return {
+            "epoch": app.sync_log.epoch,
+            "version": upto,
+            "more": more,
+            "changes": [{**entry, "category": category} for category, entry in changes],
+        }
+
+    @app.get("/sync")
+    def pull_changes():
+        try:
+            since_version = int(request.args.get("since_version", 0))
+        except ValueError:
+            return jsonify(error="since_version must be an integer"), 400
+        return jsonify(sync_since(since_version)), 200
+
+    @app.post("/sync")
+    def push_changes():
+        # One round trip: apply the client's new entries, then return what
+        # the client has not seen yet. Entries are matched by id; an id the
+        # server already has is not applied again.
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify(error="Expected a JSON object"), 400
+        try:
+            since_version = int(request.args.get("since_version", data.get("since_version", 0)))
+        except (TypeError, ValueError):
+            return jsonify(error="since_version must be an integer"), 400
+        pushed = data.get("changes") or []
+        if not isinstance(pushed, list) or len(pushed) > app.config["SYNC_MAX_PUSH"]:
+            return jsonify(error=f"changes must be a list of at most {app.config['SYNC_MAX_PUSH']} entries"), 400
+
+        valid, errors = [], []
+        for change in pushed:
+            entry_id = change.get("id") if isinstance(change, dict) else None
+            if not isinstance(entry_id, str) or not 0 < len(entry_id) <= sync.MAX_ID_LENGTH:
+                errors.append({"id": entry_id, "error": f"Field 'id' must be 1-{sync.MAX_ID_LENGTH} characters"})
+                continue
+            try:
+                category, entry = parse_workout(change, app.workouts, allow_timestamp=True)
+            except ValidationError as e:
+                errors.append({"id": entry_id, "error": str(e)})
+                continue
+            entry["id"] = entry_id
+            valid.append((category, entry))
+        claimed = app.sync_log.claim(entry["id"] for _, entry in valid)
+        applied, duplicates = [], []
+        for category, entry in valid:
+            if entry["id"] in claimed:
+                claimed.discard(entry["id"])  # an id repeated within one push is applied once
+                applied.append((category, entry))
+            else:
+                duplicates.append(entry["id"])
+        if applied:
+            try:
+                write_batch(applied)
+            except Exception:
+                # Ids that were never stamped were not stored; a retry with them is not a duplicate.
+                app.sync_log.release(entry["id"] for _, entry in applied)
+                raise
+
+        body = sync_since(since_version)
+        sent = {entry["id"] for _, entry in valid}
+        body["changes"] = [change for change in body["changes"] if change["id"] not in sent]
+        body["applied"] = [entry["id"] for _, entry in applied]
+        body["duplicates"] = duplicates
+        body["errors"] = errors
+        return jsonify(body), 200
+
+    @app.put("/members/<regn_id>")
+    def save_member(regn_id):
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify(error="Expected a JSON object"), 400
+        try:
+            profile = parse_profile(data, regn_id)
+        except ValidationError as e:
+            return jsonify(error=str(e)), 400
+        profile, created, recalculated = app.members.save(profile)
+        app.goals.refresh(profile["regn_id"])
+        app.recommender.invalidate(profile["regn_id"])
+        return jsonify(member=profile, recalculated=recalculated), 201 if created else 200
+
+    @app.get("/members/<regn_id>")
+    def get_member(regn_id):
+        profile = app.members.get(regn_id)
+        if profile is None:
+            return jsonify(error="Member not found"), 404
+        return jsonify(member=profile), 200
+
+    @app.get("/goals/progress")
+    def goals_progress():
+        weeks = request.args.get("weeks", app.config["GOALS_HISTORY_WEEKS"], type=int)
+        if not 0 <= weeks <= 520:
+            return jsonify(error="Parameter 'weeks' must be between 0 and 520"), 400
+        current_week = goals.iso_week(date.today().isoformat())
+        regn_id = request.args.get("member")
+        if regn_id is None:
+            return jsonify(app.goals.gym_progress(current_week, weeks)), 200
+        if app.members.get(regn_id) is None and regn_id not in app.goals.members:
+            return jsonify(error="Member not found"), 404
+        return jsonify(app.goals.member_progress(regn_id, current_week, weeks)), 200
+
+    @app.get("/streaks")
+    def get_streaks():
+        regn_id = request.args.get("member")
+        if regn_id is None:
+            rows = app.streaks.all()
+            return jsonify(members=rows, count=len(rows)), 200
+        row = app.streaks.get(regn_id)
+        if row is None:
+            return jsonify(error="No workouts logged for this member"), 404
+        return jsonify(row), 200
+
+    @app.get("/recommendations")
+    def get_recommendations():
+        goal = request.args.get("goal")
+        if goal is not None and goal not in recommendations.GOALS:
+            return jsonify(error=f"Parameter 'goal' must be one of: {', '.join(recommendations.GOALS)}"), 400
+        # Served from the per-member cache; an unchanged answer is a 304.
+        body, etag = app.recommender.recommend(request.args.get("member"), goal)
+        response = app.response_class(body, mimetype="application/json")
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
+
+    @app.get("/workouts/search")
+    def search_workouts():
+        query = request.args.get("q", "")
+        limit = request.args.get("limit", 10, type=int)
+        if not query.strip():
+            return jsonify(error="Query parameter 'q' is required"), 400
+        if not 1 <= limit <= 100:
+            return jsonify(error="Parameter 'limit' must be between 1 and 100"), 400
+        if request.args.get("mode", "search") == "suggest":
+            return jsonify(query=query, suggestions=app.search_index.suggest(query, limit)), 200
+        entries = max(0, min(request.args.get("entries", 5, type=int), app.search_index.recent_per_name))
+        results = app.search_index.search(query, limit, entries=entries)
+        return jsonify(query=query, results=results, count=len(results)), 200
+
+    @app.get("/leaderboard")
+    def leaderboard():
+        by = request.args.get("by", "frequency")
+        scope = request.args.get("category", OVERALL)
+        k = request.args.get("k", 10, type=int)
+        if by not in METRICS:
+            return jsonify(error=f"Parameter 'by' must be one of: {', '.join(METRICS)}"), 400
+        if scope not in app.leaderboard.scopes:
+            return jsonify(error="Invalid category. Must be: Warm-up, Workout, Cool-down, or all"), 400
+        if not 1 <= k <= app.leaderboard.size:
+            return jsonify(error=f"Parameter 'k' must be between 1 and {app.leaderboard.size}"), 400
+        return jsonify(by=by, category=scope, leaders=app.leaderboard.top(by, scope, k)), 200
 
     @app.get("/summary")
     def get_summary():
-        total_time = sum(
-            session['duration'] 
-            for sessions in app.workouts.values() 
-            for session in sessions
-        )
-        
+        # Totals come from the counters shared by all workers, not this
+        # worker's own lists, so every worker gives the same answer.
+        shared = app.counters.snapshot()
+        total_time = sum(shared["totals"].values())
+
         if total_time < 30:
             motivation = "Good start! Keep moving 💪"
         elif total_time < 60:
@@ -70,15 +391,63 @@ def create_app(test_config: dict | None = None):
         else:
             motivation = "Excellent dedication! Keep up the great work 🏆"
         
-        return jsonify(
-            by_category=app.workouts,
-            total_time=total_time,
-            motivation=motivation
-        ), 200
+        # by_category keeps its original shape, this worker's sessions per
+        # category, streamed like /workouts; counts and totals are the
+        # shared per-category aggregates.
+        fields = app.json.dumps(dict(total_time=total_time, counts=shared["counts"], totals=shared["totals"],
+                                     version=shared["version"], motivation=motivation))
+        views = app.workouts.views()
+
+        def generate():
+            yield '{"by_category":'
+            yield from json_categories(views)
+            yield "," + fields[1:] + "\n"
+
+        return app.response_class(generate(), mimetype="application/json")
         
+    # The UI has no per-request state, so render it once and serve the bytes.
+    app.assets = StaticAssets(os.path.join(app.root_path, "static"))
+    with app.app_context():
+        app.ui_page = prerender(render_template("index.html", asset_url=app.assets.url))
+
+    @app.get("/summary/stats")
+    def get_summary_stats():
+        stats = app.duration_stats.summary()
+        if request.args.get("include") == "sketch":
+            # Serialized sketches let an aggregator merge stats across workers.
+            stats["sketches"] = app.duration_stats.to_dict()
+        return jsonify(stats), 200
+
+    @app.get("/snapshot")
+    def download_snapshot():
+        fd, path = tempfile.mkstemp(suffix=".snap")
+        os.close(fd)
+        try:
+            snapshot.write_snapshot(path, app.workouts.views())
+            response = send_file(path, mimetype="application/octet-stream",
+                                 as_attachment=True, download_name="aceest.snap")
+        except Exception:
+            os.remove(path)
+            raise
+        response.call_on_close(lambda: os.remove(path))
+        return response
+
     @app.get("/ui")
     def ui():
-        return render_template("index.html")
+        response = app.response_class(app.ui_page.body, mimetype=app.ui_page.mimetype)
+        response.set_etag(app.ui_page.etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
+
+    @app.get("/static/<path:filename>")
+    def serve_static(filename):
+        asset = app.assets.get(filename)
+        if asset is None:
+            abort(404)
+        response = app.response_class(asset.body, mimetype=asset.mimetype)
+        response.set_etag(asset.etag)
+        response.headers["Cache-Control"] = IMMUTABLE
+        return response.make_conditional(request)
 
     return app
 
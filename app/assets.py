@@ -0,0 +1,53 @@
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@dataclass(frozen=True)
+class Asset:
+    body: bytes
+    mimetype: str
+    etag: str
+
+
+def fingerprint(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()[:12]
+
+
+class StaticAssets:
+    """In-memory, content-fingerprinted copies of everything under a static folder.
+
+    ``css/app.css`` is published as ``css/app.<hash>.css``; the hash changes
+    whenever the file does, so the URL can be cached forever.
+    """
+
+    def __init__(self, root: str, url_prefix: str = "/static"):
+        self.url_prefix = url_prefix
+        self.urls: dict[str, str] = {}
+        self.files: dict[str, Asset] = {}
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, root).replace(os.sep, "/")
+                with open(path, "rb") as f:
+                    body = f.read()
+                digest = fingerprint(body)
+                stem, ext = os.path.splitext(name)
+                published = f"{stem}.{digest}{ext}"
+                mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                self.files[published] = Asset(body, mimetype, digest)
+                self.urls[name] = f"{url_prefix}/{published}"
+
+    def url(self, name: str) -> str:
+        return self.urls[name]
+
+    def get(self, published: str) -> Asset | None:
+        return self.files.get(published)
+
+
+def prerender(html: str) -> Asset:
+    body = html.encode("utf-8")
+    return Asset(body, "text/html", fingerprint(body))
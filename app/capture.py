@@ -0,0 +1,101 @@
+import atexit
+import json
+import os
+import random
+import threading
+import time
+from flask import g, request
+
+DEFAULTS = {
+    "CAPTURE_PATH": None,
+    "CAPTURE_SAMPLE_RATE": 1.0,
+    "CAPTURE_MAX_BODY": 65536,
+    "CAPTURE_FLUSH_EVERY": 100,
+}
+
+# Headers that change how the API handles a request and so must be replayed.
+REPLAYED_HEADERS = ("Content-Type", "Idempotency-Key", "Accept")
+
+
+class TrafficRecorder:
+    """Appends one compact JSON line per request to a capture file.
+
+    Keys are kept short because captures get large:
+    ``t`` wall-clock start, ``m`` method, ``p`` path plus query, ``h`` replayed
+    headers, ``b`` request body (omitted if empty), ``bs`` true when the
+    request had a body that was not captured, ``s`` status, ``l`` latency in
+    ms, ``n`` response bytes.
+
+    A body is only captured if it fits ``max_body`` (checked against
+    Content-Length before anything is read) and the view did not consume it
+    as a stream, as imports do; those requests are marked ``bs`` so a
+    replay can leave them out instead of sending them without a body.
+    """
+
+    def __init__(self, path: str, max_body: int, flush_every: int):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_body = max_body
+        self.flush_every = flush_every
+        self._file = open(path, "a", encoding="utf-8")
+        self._pending = 0
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def record(self, started: float, latency_ms: float, response):
+        line = {"t": round(started, 4), "m": request.method, "p": request.full_path.rstrip("?")}
+        headers = {k: request.headers[k] for k in REPLAYED_HEADERS if k in request.headers}
+        if headers:
+            line["h"] = headers
+        length = request.content_length
+        if length or request.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            # Read by the view as a stream (not through get_data), so it is gone.
+            streamed = "stream" in request.__dict__ and getattr(request, "_cached_data", None) is None
+            if length is None or length > self.max_body or streamed:
+                line["bs"] = True
+            else:
+                line["b"] = request.get_data(cache=True).decode("utf-8", "replace")
+        line["s"] = response.status_code
+        line["l"] = round(latency_ms, 3)
+        line["n"] = response.content_length or 0  # 0 for streamed bodies, which are not buffered
+        text = json.dumps(line, separators=(",", ":"), ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(text)
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._file.flush()
+                self._pending = 0
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    path = app.config["CAPTURE_PATH"]
+    app.recorder = None
+    if not path:
+        return
+    # One file per worker process; "{pid}" in the path keeps workers apart.
+    recorder = app.recorder = TrafficRecorder(
+        path.format(pid=os.getpid()), app.config["CAPTURE_MAX_BODY"], app.config["CAPTURE_FLUSH_EVERY"])
+    sample_rate = app.config["CAPTURE_SAMPLE_RATE"]
+
+    @app.before_request
+    def start_capture():
+        if sample_rate >= 1 or random.random() < sample_rate:
+            g.capture_started = (time.time(), time.perf_counter())
+
+    @app.after_request
+    def finish_capture(response):
+        started = g.pop("capture_started", None)
+        if started is not None:
+            recorder.record(started[0], (time.perf_counter() - started[1]) * 1000, response)
+        return response
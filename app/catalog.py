@@ -0,0 +1,59 @@
+"""Exercise catalog, taken from the Workout Plan tab of ACEest_Fitness-V1.2.2.
+
+Keys are the store's categories. Each exercise keeps the prescription the
+desktop app shows next to it.
+"""
+
+WORKOUT_PLAN = {
+    "Warm-up": [
+        ("Light Cardio (Jog/Cycle)", "5 min"),
+        ("Jumping Jacks", "30 reps"),
+        ("Arm Circles", "15 Fwd/Bwd"),
+    ],
+    "Workout": [
+        ("Push-ups", "3 sets of 10-15"),
+        ("Squats", "3 sets of 15-20"),
+        ("Plank", "3 sets of 60 seconds"),
+        ("Lunges", "3 sets of 10/leg"),
+    ],
+    "Cool-down": [
+        ("Slow Walking", ""),
+        ("Static Stretching", "Hold 30s each"),
+        ("Deep Breathing Exercises", ""),
+    ],
+}
+
+# Session lengths the plan gives per category, in minutes.
+PLAN_MINUTES = {
+    "Warm-up": (5, 10),
+    "Workout": (45, 60),
+    "Cool-down": (5, 5),
+}
+
+# The Diet Guide tab of V1.2.2, as (meal, food) per goal.
+DIET_PLANS = {
+    "Weight Loss": [
+        ("Breakfast", "Oatmeal with Berries"),
+        ("Lunch", "Grilled Chicken/Tofu Salad"),
+        ("Dinner", "Vegetable Soup with Lentils"),
+    ],
+    "Muscle Gain": [
+        ("Breakfast", "3 Egg Omelet, Spinach, Whole-wheat Toast"),
+        ("Lunch", "Chicken Breast, Quinoa, and Steamed Veggies"),
+        ("Post-Workout", "Protein Shake, Greek Yogurt"),
+    ],
+    "Endurance": [
+        ("Pre-Workout", "Banana & Peanut Butter"),
+        ("Lunch", "Whole Grain Pasta with Light Sauce"),
+        ("Dinner", "Salmon & Avocado Salad"),
+    ],
+}
+
+GOALS = tuple(DIET_PLANS)
+
+# Plan exercises that suit each goal best; the rest of the plan still counts, at lower weight.
+GOAL_FOCUS = {
+    "Weight Loss": {"Light Cardio (Jog/Cycle)", "Jumping Jacks", "Squats", "Lunges", "Slow Walking"},
+    "Muscle Gain": {"Arm Circles", "Push-ups", "Squats", "Lunges", "Static Stretching"},
+    "Endurance": {"Light Cardio (Jog/Cycle)", "Jumping Jacks", "Plank", "Lunges", "Deep Breathing Exercises"},
+}
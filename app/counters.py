@@ -0,0 +1,111 @@
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process (anonymous) mapping is available.
+    fcntl = None
+
+DEFAULTS = {
+    # A file on tmpfs (e.g. /dev/shm/aceest-summary) shared by every worker
+    # in the pod. None keeps the counters private to this process.
+    "SHARED_COUNTERS_PATH": None,
+}
+
+MAGIC = b"ACEEST01"
+HEADER = struct.Struct("<8sQQ")   # magic, version, number of categories
+SLOT = struct.Struct("<QQ")       # sessions, total minutes (durations are whole minutes)
+
+
+class SharedCounters:
+    """Per-category session counts and minute totals in a shared memory map.
+
+    Every gunicorn worker maps the same file, so all of them read and write
+    one set of counters. Writers take an exclusive ``flock`` and readers a
+    shared one, so a reader never sees half of a batch; both are O(number of
+    categories). ``version`` increases by one on every write.
+    """
+
+    def __init__(self, categories, path: str | None = None):
+        self.categories = list(categories)
+        self.path = path
+        self.size = HEADER.size + SLOT.size * len(self.categories)
+        self._offsets = {c: HEADER.size + SLOT.size * i for i, c in enumerate(self.categories)}
+        # flock excludes other processes, not other threads sharing our descriptor.
+        self._thread_lock = threading.Lock()
+        self._fd = None
+        # Whether this instance laid out the counters, i.e. they started at zero here.
+        self.created = True
+        if path is None:
+            self._map = mmap.mmap(-1, self.size)
+            HEADER.pack_into(self._map, 0, MAGIC, 0, len(self.categories))
+            return
+        if fcntl is None:
+            raise RuntimeError("SHARED_COUNTERS_PATH needs fcntl (POSIX)")
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            # The first worker to get here lays out the file; the rest check it.
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, self.size)
+                self._map = mmap.mmap(self._fd, self.size)
+                HEADER.pack_into(self._map, 0, MAGIC, 0, len(self.categories))
+            else:
+                self.created = False
+                if os.fstat(self._fd).st_size != self.size:
+                    raise ValueError(f"{path} does not match the configured categories")
+                self._map = mmap.mmap(self._fd, self.size)
+                magic, _, count = HEADER.unpack_from(self._map, 0)
+                if magic != MAGIC or count != len(self.categories):
+                    raise ValueError(f"{path} is not a counters file for these categories")
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        with self._thread_lock:
+            if self._fd is None:
+                yield
+                return
+            fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def add(self, category: str, duration: int):
+        self.add_many(((category, {"duration": duration}),))
+
+    def add_many(self, items):
+        totals = {}
+        for category, entry in items:
+            sessions, minutes = totals.get(category, (0, 0))
+            totals[category] = (sessions + 1, minutes + entry["duration"])
+        if not totals:
+            return
+        with self._locked(exclusive=True):
+            for category, (sessions, minutes) in totals.items():
+                offset = self._offsets[category]
+                old_sessions, old_minutes = SLOT.unpack_from(self._map, offset)
+                SLOT.pack_into(self._map, offset, old_sessions + sessions, old_minutes + minutes)
+            magic, version, count = HEADER.unpack_from(self._map, 0)
+            HEADER.pack_into(self._map, 0, magic, version + 1, count)
+
+    def snapshot(self) -> dict:
+        with self._locked(exclusive=False):
+            _, version, _ = HEADER.unpack_from(self._map, 0)
+            slots = {c: SLOT.unpack_from(self._map, offset) for c, offset in self._offsets.items()}
+        return {
+            "version": version,
+            "counts": {c: sessions for c, (sessions, _) in slots.items()},
+            "totals": {c: minutes for c, (_, minutes) in slots.items()},
+        }
+
+    def close(self):
+        self._map.close()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,172 @@
+"""Deterministic synthetic members and workout history for scale testing.
+
+The same seed and options always produce the same rows. Exercises follow
+the V1.2.2 Workout Plan (``app.catalog``), with plan order as popularity
+and a small tail of other exercises. Sessions are a warm-up, one to three
+workouts and a cool-down, with plan-shaped durations, on days spread
+across the requested years.
+
+    python -m app.datagen --rows 1000000 --out workouts.ndjson --members-out members.ndjson
+    python -m app.importer workouts.ndjson --url http://localhost:8000
+"""
+import argparse
+import bisect
+import itertools
+import json
+import random
+import sys
+from datetime import date, timedelta
+from .catalog import GOALS, PLAN_MINUTES, WORKOUT_PLAN
+
+FIRST_NAMES = ("Aarav", "Priya", "Rahul", "Ananya", "Vikram", "Sneha", "Arjun", "Kavya", "Rohan", "Meera",
+               "Alex", "Sam", "Jordan", "Taylor", "Chris", "Maria", "David", "Fatima", "Wei", "Yuki")
+LAST_NAMES = ("Sharma", "Patel", "Iyer", "Reddy", "Nair", "Gupta", "Singh", "Khan", "Das", "Menon",
+              "Smith", "Garcia", "Chen", "Okafor", "Silva", "Muller", "Kim", "Novak", "Haddad", "Ito")
+# Logged alongside the plan, far less often than the plan's own exercises.
+OTHER_EXERCISES = {
+    "Warm-up": ("Skipping", "High Knees", "Dynamic Stretching"),
+    "Workout": ("Deadlift", "Bench Press", "Pull-ups", "Burpees", "Rowing", "Cycling", "Running"),
+    "Cool-down": ("Foam Rolling", "Yoga", "Child's Pose"),
+}
+OTHER_SHARE = 0.1
+
+
+def _exercise_table(category):
+    names = [name for name, _ in WORKOUT_PLAN[category]]
+    # Zipf-like popularity in plan order, then an even share for the tail.
+    weights = [1 / (rank + 1) for rank in range(len(names))]
+    total = sum(weights)
+    weights = [w / total * (1 - OTHER_SHARE) for w in weights]
+    others = OTHER_EXERCISES[category]
+    names += others
+    weights += [OTHER_SHARE / len(others)] * len(others)
+    return names, list(itertools.accumulate(weights))[:-1]
+
+
+def generate_members(count: int, seed: int = 0, start: date = date(2022, 1, 1), days: int = 3 * 365):
+    """Member profiles shaped like V1.3's user info, plus habits used by ``generate``."""
+    rng = random.Random(f"members:{seed}")
+    members = []
+    for i in range(count):
+        gender = rng.choice("MF")
+        height = round(rng.gauss(175 if gender == "M" else 162, 7), 1)
+        bmi = min(max(rng.gauss(24.5, 3.5), 17), 40)
+        members.append({
+            "regn_id": f"ACE{i + 1:06d}",
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "age": rng.randint(18, 70),
+            "gender": gender,
+            "height": height,
+            "weight": round(bmi * (height / 100) ** 2, 1),
+            "goal": rng.choice(GOALS),
+            "weekly_cal_goal": rng.choice((1500, 2000, 2500, 3000)),
+            # Habits: sessions per week, usual start hour, first active day.
+            "sessions_per_week": round(rng.uniform(1, 6), 2),
+            "hour": rng.randint(5, 20),
+            "joined": (start + timedelta(days=int(rng.random() ** 2 * days * 0.66))).isoformat(),
+        })
+    return members
+
+
+def generate(members, seed: int = 0, start: date = date(2022, 1, 1), days: int = 3 * 365, rows: int | None = None):
+    """Yield ``(category, entry)`` day by day, so timestamps arrive roughly in order."""
+    rng = random.Random(f"sessions:{seed}")
+    random_, randint, triangular, pick = rng.random, rng.randint, rng.triangular, bisect.bisect
+    tables = {category: _exercise_table(category) for category in WORKOUT_PLAN}
+    habits = [(m["regn_id"], m["sessions_per_week"] / 7, m["hour"], date.fromisoformat(m["joined"])) for m in members]
+    emitted = 0
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        prefix = day.isoformat()
+        for regn_id, chance, hour, joined in habits:
+            if day < joined or random_() >= chance:
+                continue
+            minute = hour * 60 + randint(0, 59)
+            plan = []
+            if random_() < 0.9:
+                plan.append("Warm-up")
+            plan += ["Workout"] * randint(1, 3)
+            if random_() < 0.8:
+                plan.append("Cool-down")
+            workouts = plan.count("Workout")
+            for category in plan:
+                low, high = PLAN_MINUTES[category]
+                if category == "Workout":
+                    low, high = low / workouts, high / workouts
+                duration = max(1, round(triangular(low * 0.5, high * 1.5, (low + high) / 2)))
+                names, edges = tables[category]
+                yield category, {
+                    "exercise": names[pick(edges, random_())],
+                    "duration": duration,
+                    "timestamp": f"{prefix} {minute // 60 % 24:02d}:{minute % 60:02d}:00",
+                    "member": regn_id,
+                }
+                minute += duration
+                emitted += 1
+                if rows is not None and emitted >= rows:
+                    return
+
+
+def write_ndjson(items, out) -> int:
+    """Write rows in the bulk-import format; returns the number written."""
+    dumps = json.dumps
+    count = 0
+    buffer = []
+    for category, entry in items:
+        buffer.append(dumps({"category": category, "workout": entry["exercise"], "duration": entry["duration"],
+                             "timestamp": entry["timestamp"], "member": entry["member"]}))
+        count += 1
+        if len(buffer) >= 10000:
+            out.write("\n".join(buffer) + "\n")
+            buffer = []
+    if buffer:
+        out.write("\n".join(buffer) + "\n")
+    return count
+
+
+def load_into(app, items, batch_size: int = 5000) -> int:
+    """Stream rows straight into a running app's store and indexes."""
+    count = 0
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            app.record_batch(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        app.record_batch(batch)
+        count += len(batch)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic ACEest dataset.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--members", type=int, default=5000)
+    parser.add_argument("--start", default="2022-01-01", help="first day (ISO date)")
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--rows", type=int, help="stop after this many workout rows")
+    parser.add_argument("--out", default="-", help="workouts NDJSON file ('-' for stdout)")
+    parser.add_argument("--members-out", help="also write member profiles as NDJSON")
+    args = parser.parse_args(argv)
+
+    start = date.fromisoformat(args.start)
+    days = int(args.years * 365)
+    members = generate_members(args.members, args.seed, start, days)
+    if args.members_out:
+        with open(args.members_out, "w", encoding="utf-8") as f:
+            for member in members:
+                f.write(json.dumps(member) + "\n")
+    items = generate(members, args.seed, start, days, args.rows)
+    if args.out == "-":
+        count = write_ndjson(items, sys.stdout)
+    else:
+        with open(args.out, "w", encoding="utf-8", newline="\n") as f:
+            count = write_ndjson(items, f)
+    print(f"Wrote {count} workouts for {len(members)} members", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""Health calculations; the only copy, imported by the V1.3 desktop app too."""
+
+# MET values per category; anything else counts as 5.
+MET_VALUES = {
+    "Warm-up": 3,
+    "Workout": 6,
+    "Cool-down": 2.5
+}
+
+
+def calculate_bmi(weight_kg, height_cm):
+    return weight_kg / ((height_cm/100)**2)
+
+
+def calculate_bmr(weight_kg, height_cm, age, gender):
+    """Mifflin-St Jeor; any gender other than "M" uses the female constant."""
+    if gender == "M":
+        return 10*weight_kg + 6.25*height_cm - 5*age + 5
+    return 10*weight_kg + 6.25*height_cm - 5*age - 161
+
+
+def calories_burned(category, duration, weight_kg=70):
+    met = MET_VALUES.get(category, 5)
+    return (met * 3.5 * weight_kg / 200) * duration
@@ -0,0 +1,138 @@
+import threading
+from datetime import date
+from functools import lru_cache
+
+DEFAULTS = {
+    # Weeks of history /goals/progress returns unless ?weeks= says otherwise.
+    "GOALS_HISTORY_WEEKS": 12,
+}
+
+DEFAULT_WEEKLY_GOAL = 2000
+
+
+@lru_cache(maxsize=8192)
+def iso_week(day: str) -> str:
+    """``"2024-05-01..."`` -> ``"2024-W18"``; cached per calendar day."""
+    year, week, _ = date(int(day[:4]), int(day[5:7]), int(day[8:10])).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class WeeklyGoals:
+    """Per-member and gym-wide totals per ISO week, kept up to date on write.
+
+    Buckets hold minutes per category, not calories, so a profile change
+    re-prices a member's weeks from their current calorie factors without
+    touching entries: O(weeks that member was active). Gym-wide weeks keep
+    calories, minutes, sessions, active members and how many members met
+    their goal, so dashboards read them directly.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.categories = registry.categories
+        self.members: dict[str, dict[str, list]] = {}   # regn_id -> week -> [minutes per category..., sessions]
+        self.gym: dict[str, dict] = {}
+        # Each member's (factors, goal) as last applied to the totals.
+        self.rates: dict[str, tuple[dict | None, int]] = {}
+        self._lock = threading.Lock()
+
+    def _calories(self, factors, bucket) -> float:
+        if factors is None:
+            return 0.0
+        return sum(factors[category] * minutes for category, minutes in zip(self.categories, bucket))
+
+    def _gym_week(self, week):
+        totals = self.gym.get(week)
+        if totals is None:
+            totals = self.gym[week] = {"calories": 0.0, "minutes": 0, "sessions": 0, "members_active": 0, "goals_met": 0}
+        return totals
+
+    def add(self, category: str, entry: dict):
+        self.add_many(((category, entry),))
+
+    def add_many(self, items):
+        index = {category: i for i, category in enumerate(self.categories)}
+        count = len(self.categories)  # the bucket slot counting sessions
+        with self._lock:
+            for category, entry in items:
+                regn_id = entry.get("member")
+                if regn_id is None:
+                    continue
+                week = iso_week(entry["timestamp"][:10])
+                weeks = self.members.setdefault(regn_id, {})
+                bucket = weeks.get(week)
+                totals = self._gym_week(week)
+                if bucket is None:
+                    bucket = weeks[week] = [0] * (count + 1)
+                    totals["members_active"] += 1
+                factors, goal = self.rates.get(regn_id) or self._rates(regn_id)
+                before = self._calories(factors, bucket)
+                bucket[index[category]] += entry["duration"]
+                bucket[count] += 1
+                after = self._calories(factors, bucket)
+                totals["calories"] += after - before
+                totals["minutes"] += entry["duration"]
+                totals["sessions"] += 1
+                if factors is not None and before < goal <= after:
+                    totals["goals_met"] += 1
+
+    def _rates(self, regn_id):
+        profile = self.registry.get(regn_id)
+        goal = profile["weekly_cal_goal"] if profile else DEFAULT_WEEKLY_GOAL
+        rates = self.rates[regn_id] = (self.registry.factors.get(regn_id), goal)
+        return rates
+
+    def refresh(self, regn_id: str):
+        """Re-price a member's weeks after their profile (weight or goal) changed."""
+        with self._lock:
+            old_factors, old_goal = self.rates.get(regn_id) or (None, DEFAULT_WEEKLY_GOAL)
+            new_factors, new_goal = self._rates(regn_id)
+            for week, bucket in self.members.get(regn_id, {}).items():
+                before, after = self._calories(old_factors, bucket), self._calories(new_factors, bucket)
+                totals = self.gym[week]
+                totals["calories"] += after - before
+                totals["goals_met"] += ((new_factors is not None and after >= new_goal)
+                                        - (old_factors is not None and before >= old_goal))
+
+    def _week_row(self, week, bucket, factors, goal):
+        calories = self._calories(factors, bucket)
+        return {
+            "week": week,
+            "calories": round(calories, 1),
+            "minutes": sum(bucket[:-1]),
+            "sessions": bucket[-1],
+            "goal": goal,
+            "remaining": round(max(goal - calories, 0), 1),
+            "percent": round(100 * calories / goal, 1),
+            "met": calories >= goal,
+        }
+
+    def member_progress(self, regn_id: str, current_week: str, history: int) -> dict:
+        """This week and the newest ``history`` weeks before it; O(weeks)."""
+        with self._lock:
+            factors, goal = self.rates.get(regn_id) or self._rates(regn_id)
+            weeks = self.members.get(regn_id, {})
+            empty = [0] * (len(self.categories) + 1)
+            past = sorted((week for week in weeks if week < current_week), reverse=True)[:history]
+            return {
+                "member": regn_id,
+                "goal": goal,
+                "current": self._week_row(current_week, weeks.get(current_week, empty), factors, goal),
+                "history": [self._week_row(week, weeks[week], factors, goal) for week in past],
+            }
+
+    def gym_progress(self, current_week: str, history: int) -> dict:
+        with self._lock:
+            def row(week):
+                totals = self.gym.get(week) or {"calories": 0.0, "minutes": 0, "sessions": 0,
+                                                "members_active": 0, "goals_met": 0}
+                return {"week": week, **totals, "calories": round(totals["calories"], 1)}
+
+            past = sorted((week for week in self.gym if week < current_week), reverse=True)[:history]
+            return {"current": row(current_week), "history": [row(week) for week in past]}
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    app.goals = WeeklyGoals(app.members)
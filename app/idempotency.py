@@ -0,0 +1,86 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULTS = {
+    "IDEMPOTENCY_MAX_KEYS": 100000,
+    "IDEMPOTENCY_TTL_SECONDS": 86400,
+}
+
+MAX_KEY_LENGTH = 255
+
+_PENDING = object()
+
+
+class IdempotencyCache:
+    """Bounded, TTL-evicting map of ``Idempotency-Key`` -> stored response.
+
+    Every key shares one TTL, so insertion order is also expiry order. Expired
+    keys are trimmed from the front on each write, and once the cache is full
+    the oldest key is dropped. Memory stays bounded whatever the traffic.
+    """
+
+    def __init__(self, max_keys: int, ttl: float, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: OrderedDict[str, tuple[float, str, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def begin(self, key: str, fingerprint: str):
+        """Claim ``key`` for a new request.
+
+        Returns ``("new", None)`` when the caller should do the work,
+        ``("replay", response)`` for a completed retry, ``("conflict", None)``
+        when the key was used with a different payload and
+        ``("in_progress", None)`` while the first request is still running.
+        """
+        now = self.clock()
+        with self._lock:
+            self._expire(now)
+            found = self._entries.get(key)
+            if found is None:
+                self._entries[key] = (now + self.ttl, fingerprint, _PENDING)
+                if len(self._entries) > self.max_keys:
+                    self._entries.popitem(last=False)
+                return "new", None
+            _, stored_fingerprint, response = found
+            if stored_fingerprint != fingerprint:
+                return "conflict", None
+            if response is _PENDING:
+                return "in_progress", None
+            return "replay", response
+
+    def complete(self, key: str, response):
+        with self._lock:
+            found = self._entries.get(key)
+            if found is not None:
+                self._entries[key] = (found[0], found[1], response)
+
+    def abandon(self, key: str):
+        with self._lock:
+            found = self._entries.get(key)
+            if found is not None and found[2] is _PENDING:
+                del self._entries[key]
+
+    def _expire(self, now: float):
+        entries = self._entries
+        while entries:
+            key, (expires, _, _) = next(iter(entries.items()))
+            if expires > now:
+                break
+            entries.popitem(last=False)
+
+
+def fingerprint(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    app.idempotency = IdempotencyCache(app.config["IDEMPOTENCY_MAX_KEYS"], app.config["IDEMPOTENCY_TTL_SECONDS"])
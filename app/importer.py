@@ -0,0 +1,162 @@
+"""Bulk import of workouts from CSV or NDJSON.
+
+Rows are parsed from the upload stream as they arrive and validated exactly
+like ``POST /workouts`` (plus an optional ``timestamp`` for backfills).
+Accepted rows are written in batches, so memory stays flat with file size.
+
+CSV needs a header row with ``category``, ``workout`` (or ``exercise``),
+``duration`` and optionally ``timestamp``. NDJSON holds one JSON object per
+line with the same keys.
+
+    python -m app.importer history.csv --url http://localhost:8000
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from dataclasses import dataclass, field
+from .validation import ValidationError, parse_workout
+
+DEFAULTS = {
+    "IMPORT_BATCH_SIZE": 5000,
+    "IMPORT_MAX_ERRORS": 1000,
+}
+
+MIMETYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/jsonlines": "ndjson",
+}
+
+INVALID_UTF8 = "Row is not valid UTF-8"
+
+
+@dataclass
+class ImportReport:
+    accepted: int = 0
+    rejected: int = 0
+    errors: list = field(default_factory=list)
+
+    def as_dict(self):
+        return {
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "errors_truncated": self.rejected > len(self.errors),
+        }
+
+
+def detect_format(mimetype: str | None, override: str | None = None) -> str | None:
+    if override in ("csv", "ndjson"):
+        return override
+    return MIMETYPES.get(mimetype or "")
+
+
+def iter_rows(stream, fmt: str):
+    """Yield ``(row_number, row)`` pairs; ``row`` is an error string for unparsable lines."""
+    undecodable = []
+    lines = _decoded_lines(stream, undecodable)
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            while undecodable:
+                yield undecodable.pop(0), INVALID_UTF8
+            # Line numbers count the header as row 1, matching spreadsheet line numbers.
+            yield reader.line_num, row
+        while undecodable:
+            yield undecodable.pop(0), INVALID_UTF8
+        return
+    for number, line in enumerate(lines, 1):
+        if undecodable:
+            yield undecodable.pop(), INVALID_UTF8
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield number, "Invalid JSON"
+            continue
+        yield number, row if isinstance(row, dict) else "Row must be a JSON object"
+
+
+def _decoded_lines(stream, undecodable: list):
+    """Decode the upload one line at a time, so a bad byte costs its row rather than the import.
+
+    Undecodable line numbers are appended to ``undecodable`` and the line is
+    passed on as blank.
+    """
+    if isinstance(stream, io.RawIOBase):
+        stream = io.BufferedReader(stream)
+    for number, raw in enumerate(stream, 1):
+        try:
+            yield raw.decode("utf-8-sig" if number == 1 else "utf-8")
+        except UnicodeDecodeError:
+            undecodable.append(number)
+            yield "\n"
+
+
+def _clean(row: dict) -> dict:
+    # An empty CSV cell means "not given", and exported files say "exercise".
+    if not row.get("category"):
+        row.pop("category", None)
+    if "workout" not in row and "exercise" in row:
+        row["workout"] = row["exercise"]
+    return row
+
+
+def import_rows(rows, categories, write_batch, batch_size: int = 5000, max_errors: int = 1000) -> ImportReport:
+    report = ImportReport()
+    batch = []
+    for number, row in rows:
+        try:
+            if isinstance(row, str):
+                raise ValidationError(row)
+            batch.append(parse_workout(_clean(row), categories, allow_timestamp=True, strict_duration=True))
+        except ValidationError as e:
+            report.rejected += 1
+            if len(report.errors) < max_errors:
+                report.errors.append({"row": number, "error": str(e)})
+            continue
+        if len(batch) >= batch_size:
+            write_batch(batch)
+            report.accepted += len(batch)
+            batch = []
+    if batch:
+        write_batch(batch)
+        report.accepted += len(batch)
+    return report
+
+
+def main(argv=None):
+    import requests
+
+    parser = argparse.ArgumentParser(description="Stream a CSV or NDJSON file into the ACEest API.")
+    parser.add_argument("file")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--format", choices=("csv", "ndjson"), help="default: from the file extension")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.file.lower().endswith(".csv") else "ndjson")
+    content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    with open(args.file, "rb") as f:
+        # requests streams file objects instead of reading them into memory.
+        response = requests.post(f"{args.url.rstrip('/')}/workouts/import", data=f,
+                                 headers={"Content-Type": content_type}, timeout=None)
+    if response.status_code != 200:
+        print(f"Import failed ({response.status_code}): {response.text}", file=sys.stderr)
+        return 1
+    report = response.json()
+    print(f"Accepted {report['accepted']} rows, rejected {report['rejected']}")
+    for error in report["errors"]:
+        print(f"  row {error['row']}: {error['error']}")
+    if report["errors_truncated"]:
+        print(f"  ... {report['rejected'] - len(report['errors'])} more errors not shown")
+    return 0 if not report["rejected"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,400 @@
+"""Group commit for writes: concurrent requests share one log write and one fsync.
+
+Writers hand their entries to ``GroupCommitQueue.submit`` and block. One
+committer thread per worker takes everything queued, up to
+``INGEST_MAX_BATCH`` entries. It waits at most ``INGEST_MAX_WAIT_MS`` for
+more to arrive, then appends the batch to the write-ahead log with a single
+``write`` and ``fsync`` and applies it to the store. Only then are the
+writers released. A request is acknowledged exactly when its entries are
+durable, as with one fsync per request, but a burst of N requests costs a
+handful of fsyncs instead of N.
+
+A batch is committed once it is in the log: a replay applies it even if
+applying it in this process failed. ``checkpoint`` folds the log into the
+snapshot at ``SNAPSHOT_PATH`` and cuts it from the log, so the log holds
+only what the snapshot does not and stays small.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from itertools import chain
+from . import snapshot
+
+try:
+    import fcntl
+except ImportError:  # Windows: the API runs, but without a write-ahead log.
+    fcntl = None
+
+DEFAULTS = {
+    # Route API writes through the queue. Implied by INGEST_WAL_PATH.
+    "INGEST_GROUP_COMMIT": False,
+    # Append-only NDJSON log, replayed into the store at startup.
+    "INGEST_WAL_PATH": None,
+    "INGEST_FSYNC": True,
+    "INGEST_MAX_BATCH": 500,
+    "INGEST_MAX_WAIT_MS": 1,
+}
+
+
+class WriteAheadLogError(ValueError):
+    pass
+
+
+CHECKPOINT = b'{"checkpoint"'
+
+
+class WriteAheadLog:
+    """NDJSON entries appended a batch at a time, with one fsync per batch.
+
+    Besides entries, the log may hold a checkpoint line, ``{"checkpoint":
+    offset, "snapshot": [size, mtime_ns]}``: everything before ``offset`` is
+    in that snapshot. It only counts while that exact file is the snapshot,
+    so a crash halfway through a checkpoint leaves a log that still replays
+    in full.
+    """
+
+    def __init__(self, path: str, fsync: bool = True):
+        if fcntl is None:
+            raise RuntimeError("INGEST_WAL_PATH needs fcntl file locking (POSIX)")
+        self.path = path
+        self.fsync = fsync
+        self._fd = None
+
+    def open(self) -> int:
+        """Open the log for appending and cut a torn last line; returns the end of the complete lines.
+
+        A torn last line (a crash mid-write) was never acknowledged; it is
+        cut off so new batches start on a clean line.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        # Other workers may already be appending; the lock keeps the cut
+        # from racing their writes. Everything before ``end`` is then final.
+        with self._locked():
+            end = _clean_end(self._fd)
+            if end < os.fstat(self._fd).st_size:
+                os.ftruncate(self._fd, end)
+        return end
+
+    def replay(self, loaded_snapshot=None):
+        """Yield ``(category, entry)`` not yet in the snapshot, then keep the log open for appending.
+
+        ``loaded_snapshot`` is the ``Snapshot.identity`` of the snapshot the
+        store was loaded from, if any. A line that is not a complete record
+        before the end of the log raises ``WriteAheadLogError`` rather than
+        silently dropping an acknowledged write.
+        """
+        end = self.open()
+        yield from self._records(self._checkpointed(end, loaded_snapshot), end)
+
+    def _lines(self, start: int, end: int):
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if offset >= end:
+                    break
+                yield offset, line
+                offset += len(line)
+
+    def _checkpointed(self, end: int, loaded_snapshot) -> int:
+        """Offset where the entries not in ``loaded_snapshot`` start."""
+        start = 0
+        if loaded_snapshot is None:
+            return start
+        for offset, line in self._lines(0, end):
+            if line.startswith(CHECKPOINT):
+                record = self._decode(offset, line)
+                if tuple(record["snapshot"]) == tuple(loaded_snapshot):
+                    start = record["checkpoint"]
+        return start
+
+    def _records(self, start: int, end: int):
+        for offset, line in self._lines(start, end):
+            if line.startswith(CHECKPOINT) or not line.strip():
+                continue
+            record = self._decode(offset, line)
+            if not isinstance(record.get("category"), str):
+                raise WriteAheadLogError(f"{self.path}: record at byte {offset} has no category")
+            yield record.pop("category"), record
+
+    def _decode(self, offset: int, line: bytes) -> dict:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            raise WriteAheadLogError(f"{self.path}: corrupt record at byte {offset}; fix or truncate the log there")
+        return record
+
+    @contextmanager
+    def _locked(self):
+        while True:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                current = os.stat(self.path).st_ino == os.fstat(self._fd).st_ino
+            except FileNotFoundError:
+                current = False
+            if current:
+                break
+            # A checkpoint replaced the log file; follow it.
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def append(self, items):
+        data = "".join(json.dumps({"category": category, **entry}, separators=(",", ":")) + "\n"
+                       for category, entry in items).encode("utf-8")
+        self._write(data)
+
+    def _write(self, data: bytes):
+        # One locked write per batch, so batches from several workers never
+        # interleave. The fsync is inside the lock too: if it fails, the batch
+        # is cut off again before anyone else appends after it.
+        with self._locked():
+            start = os.lseek(self._fd, 0, os.SEEK_END)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(self._fd, view):]
+                if self.fsync:
+                    os.fsync(self._fd)
+            except BaseException:
+                # The batch was never acknowledged; a replay must not apply it.
+                os.ftruncate(self._fd, start)
+                raise
+
+    def truncate_before(self, offset: int):
+        """Replace the log with its lines from ``offset`` on, leaving out checkpoint lines.
+
+        The new file is renamed over the old one while its lock is held;
+        writers notice the new file the next time they take the lock.
+        """
+        with self._locked():
+            rest = self.path + ".rest"
+            with open(rest, "wb") as out:
+                for _, line in self._lines(offset, os.fstat(self._fd).st_size):
+                    if not line.startswith(CHECKPOINT):
+                        out.write(line)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(rest, self.path)
+            _fsync_directory(self.path)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def _clean_end(fd) -> int:
+    """Offset just past the last newline in the file."""
+    end = os.fstat(fd).st_size
+    while end > 0:
+        start = max(0, end - 65536)
+        newline = os.pread(fd, end - start, start).rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        end = start
+    return 0
+
+
+class _Waiter:
+    __slots__ = ("items", "done", "error")
+
+    def __init__(self, items):
+        self.items = items
+        self.done = threading.Event()
+        self.error = None
+
+
+class GroupCommitQueue:
+    """Coalesces concurrent ``submit`` calls into batches committed by one thread.
+
+    ``on_commit(elapsed_ms, entries)`` is called after each committed batch
+    with the time spent logging (fsync included) and applying it.
+    """
+
+    def __init__(self, apply, wal: WriteAheadLog | None = None, max_batch: int = 500, max_wait_ms: float = 1,
+                 logger=None, on_commit=None):
+        self.apply = apply
+        self.wal = wal
+        self.logger = logger
+        self.on_commit = on_commit
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.entries = 0
+        self._pending: deque[_Waiter] = deque()
+        self._pending_entries = 0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, items):
+        """Queue ``items`` and return once they are committed; re-raises a failed commit."""
+        items = list(items)
+        for _, entry in items:
+            # Ids are fixed before logging so a replay recreates the same entries.
+            entry.setdefault("id", uuid.uuid4().hex)
+        waiter = _Waiter(items)
+        with self._cond:
+            if self._thread is None:
+                # Started on first use, so each forked worker gets its own committer.
+                self._thread = threading.Thread(target=self._run, name="aceest-group-commit", daemon=True)
+                self._thread.start()
+            self._pending.append(waiter)
+            self._pending_entries += len(items)
+            self._cond.notify()
+        waiter.done.wait()
+        if waiter.error is not None:
+            raise waiter.error
+
+    def _next_batch(self) -> list[_Waiter]:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = time.monotonic() + self.max_wait
+            while self._pending_entries < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, size = [], 0
+            while self._pending and (not batch or size + len(self._pending[0].items) <= self.max_batch):
+                waiter = self._pending.popleft()
+                batch.append(waiter)
+                size += len(waiter.items)
+            self._pending_entries -= size
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            items = [item for waiter in batch for item in waiter.items]
+            started = time.perf_counter()
+            try:
+                if self.wal is not None:
+                    self.wal.append(items)
+            except Exception as exc:
+                for waiter in batch:
+                    waiter.error = exc
+            else:
+                try:
+                    self.apply(items)
+                except Exception as exc:
+                    if self.wal is None:
+                        for waiter in batch:
+                            waiter.error = exc
+                    # Once logged, the batch is committed: a replay applies it,
+                    # so the writers are not told it failed.
+                    elif self.logger is not None:
+                        self.logger.exception("Applying a logged batch of %d entries failed", len(items))
+                self.batches += 1
+                self.entries += len(items)
+                if self.on_commit is not None:
+                    self.on_commit((time.perf_counter() - started) * 1000, len(items))
+            for waiter in batch:
+                waiter.done.set()
+
+
+def init_app(app, apply, replay, claim, loaded_snapshot=None, on_commit=None):
+    """Replay the log through ``replay``, then set ``app.ingest`` to a queue committing with ``apply``.
+
+    ``app.ingest`` is None when group commit is off. ``loaded_snapshot`` is
+    the identity of the snapshot loaded just before; entries a checkpoint
+    folded into it are not replayed. ``claim`` filters out replayed ids the
+    store already holds. ``on_commit`` is passed to the queue.
+    """
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    path = app.config["INGEST_WAL_PATH"]
+    wal = None
+    if path:
+        wal = WriteAheadLog(path, app.config["INGEST_FSYNC"])
+        batch = []
+        for item in wal.replay(loaded_snapshot):
+            batch.append(item)
+            if len(batch) >= app.config["IMPORT_BATCH_SIZE"]:
+                _replay_batch(batch, replay, claim)
+                batch = []
+        _replay_batch(batch, replay, claim)
+    if wal is None and not app.config["INGEST_GROUP_COMMIT"]:
+        app.ingest = None
+        return
+    app.ingest = GroupCommitQueue(apply, wal, app.config["INGEST_MAX_BATCH"], app.config["INGEST_MAX_WAIT_MS"],
+                                  app.logger, on_commit)
+
+
+def checkpoint(wal_path: str, snapshot_path: str) -> tuple[int, int]:
+    """Fold the log into the snapshot and cut it from the log; returns ``(records, folded)``.
+
+    Safe while workers are appending: the snapshot is rebuilt from the old
+    snapshot and the complete lines of the log, then the log is replaced by
+    whatever was appended meanwhile. Each step leaves a state a restart
+    replays correctly: the checkpoint line is written before the new
+    snapshot is moved into place and only counts once it is.
+    """
+    if fcntl is None:
+        raise RuntimeError("checkpoint needs fcntl file locking (POSIX)")
+    os.makedirs(os.path.dirname(os.path.abspath(snapshot_path)), exist_ok=True)
+    with open(snapshot_path + ".lock", "w") as lock:
+        # One checkpoint at a time.
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        wal = WriteAheadLog(wal_path)
+        try:
+            end = wal.open()
+            previous = snapshot.Snapshot(snapshot_path) if os.path.exists(snapshot_path) else None
+            try:
+                start = wal._checkpointed(end, previous and previous.identity)
+                folded, seen = {}, set()
+                for category, entry in wal._records(start, end):
+                    if entry["id"] not in seen:
+                        seen.add(entry["id"])
+                        folded.setdefault(category, []).append(entry)
+                store = {category: (entry for _, entry in previous.iter(category))
+                         for category in (previous.categories if previous else ())}
+                for category, entries in folded.items():
+                    store[category] = chain(store.get(category, ()), entries)
+                following = snapshot_path + ".next"
+                records = snapshot.write_snapshot(following, store)
+            finally:
+                if previous is not None:
+                    previous.close()
+            with open(following, "rb") as f:
+                os.fsync(f.fileno())
+            stat = os.stat(following)
+            wal._write(json.dumps({"checkpoint": end, "snapshot": [stat.st_size, stat.st_mtime_ns]},
+                                  separators=(",", ":")).encode("utf-8") + b"\n")
+            os.replace(following, snapshot_path)
+            _fsync_directory(snapshot_path)
+            wal.truncate_before(end)
+        finally:
+            wal.close()
+    return records, len(seen)
+
+
+def _fsync_directory(path: str):
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _replay_batch(batch, replay, claim):
+    fresh = claim(entry["id"] for _, entry in batch)
+    kept = []
+    for category, entry in batch:
+        if entry["id"] in fresh:
+            fresh.discard(entry["id"])
+            kept.append((category, entry))
+    if kept:
+        replay(kept)
@@ -0,0 +1,130 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, request
+
+DEFAULTS = {
+    "LOG_ACCESS_ENABLED": True,
+    "LOG_LEVEL": "INFO",
+    "LOG_QUEUE_SIZE": 10000,
+    # Fraction of requests logged per route; 5xx responses are always logged.
+    "LOG_SAMPLE_RATES": {"/health": 0.01, "/ready": 0.01},
+}
+
+ACCESS_LOGGER = "aceest.access"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; structured fields come from ``extra={"fields": {...}}``."""
+
+    def format(self, record):
+        line = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            line.update(fields)
+        if record.exc_text:
+            line["exc"] = record.exc_text
+        return json.dumps(line, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Hands records to the writer thread and never blocks the request thread.
+
+    When the queue is full the record is counted and dropped: under overload,
+    losing log lines is better than adding latency to every request.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Only what must happen on the calling thread: resolve %-args and
+        # render any traceback. JSON encoding happens on the writer thread.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler = None
+_lock = threading.Lock()
+
+
+def queue_handler(max_size: int) -> DroppingQueueHandler:
+    """The process-wide queue handler, with its background writer started on first use."""
+    global _handler
+    with _lock:
+        if _handler is None:
+            log_queue = queue.Queue(max_size)
+            stream = logging.StreamHandler(sys.stdout)
+            stream.setFormatter(JsonFormatter())
+            listener = QueueListener(log_queue, stream, respect_handler_level=False)
+            listener.start()
+            atexit.register(listener.stop)
+            _handler = DroppingQueueHandler(log_queue)
+        return _handler
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    handler = queue_handler(app.config["LOG_QUEUE_SIZE"])
+    level = app.config["LOG_LEVEL"]
+    app.logger.handlers = [handler]
+    app.logger.setLevel(level)
+    app.logger.propagate = False
+    access = logging.getLogger(ACCESS_LOGGER)
+    access.handlers = [handler]
+    access.setLevel(logging.INFO)
+    access.propagate = False
+    if not app.config["LOG_ACCESS_ENABLED"]:
+        return
+    sample_rates = app.config["LOG_SAMPLE_RATES"]
+
+    @app.before_request
+    def start_timer():
+        g.log_started = time.perf_counter()
+
+    @app.after_request
+    def log_request(response):
+        started = g.pop("log_started", None)
+        if started is None:
+            return response
+        route = request.url_rule.rule if request.url_rule is not None else None
+        rate = sample_rates.get(route, 1.0)
+        if response.status_code < 500 and rate < 1 and random.random() >= rate:
+            return response
+        access.info("request", extra={"fields": {
+            "method": request.method,
+            "route": route,
+            "path": request.path,
+            "status": response.status_code,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+            "request_bytes": request.content_length or 0,
+            # Streamed bodies have no length yet; calculate_content_length() would buffer them.
+            "response_bytes": response.content_length or 0,
+            "client": request.remote_addr,
+            "sample_rate": rate,
+        }})
+        return response
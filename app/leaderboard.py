@@ -0,0 +1,118 @@
+import bisect
+import heapq
+import threading
+from .search import normalize
+
+METRICS = ("frequency", "minutes", "longest")
+OVERALL = "all"
+
+
+class MonotonicTopK:
+    """Exact top-``size`` ranking over scores that only ever increase.
+
+    A key can only enter or climb the ranking when its own score grows, so
+    checking that one key at write time keeps the list exact without rescans:
+    O(size) per write in the worst case, O(1) when the score is below the
+    floor, and O(k) to read.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.scores: dict[str, float] = {}
+        self.keys: list[str] = []
+        self.floor = 0
+
+    def _rank(self, key):
+        return (-self.scores[key], key)
+
+    def add(self, key: str, amount: float):
+        score = self.scores.get(key, 0) + amount
+        self.scores[key] = score
+        keys = self.keys
+        if len(keys) >= self.size and score < self.floor:
+            return
+        if key in keys:
+            keys.remove(key)
+        elif len(keys) >= self.size and self._rank(key) >= self._rank(keys[-1]):
+            return
+        bisect.insort(keys, key, key=self._rank)
+        del keys[self.size:]
+        if len(keys) >= self.size:
+            self.floor = self.scores[keys[-1]]
+
+    def top(self, k: int):
+        return [(key, self.scores[key]) for key in self.keys[:k]]
+
+
+class LongestSessions:
+    """The ``size`` longest single sessions, kept sorted longest first."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.sessions: list[tuple] = []  # (-duration, seq, session)
+        self.seq = 0
+
+    def add(self, session: dict):
+        self.seq += 1
+        item = (-session["duration"], self.seq, session)
+        if len(self.sessions) >= self.size and item >= self.sessions[-1]:
+            return
+        bisect.insort(self.sessions, item)
+        del self.sessions[self.size:]
+
+    def top(self, k: int):
+        return [session for _, _, session in self.sessions[:k]]
+
+
+class Leaderboard:
+    """Write-time rankings of exercises per category and overall."""
+
+    def __init__(self, categories, size: int = 100):
+        self.size = size
+        scopes = [*categories, OVERALL]
+        self.frequency = {scope: MonotonicTopK(size) for scope in scopes}
+        self.minutes = {scope: MonotonicTopK(size) for scope in scopes}
+        self.longest = {scope: LongestSessions(size) for scope in scopes}
+        self.display: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def scopes(self):
+        return list(self.frequency)
+
+    def add(self, category: str, entry: dict):
+        self.add_many(((category, entry),))
+
+    def add_many(self, items):
+        """Apply a batch; scores are summed per exercise first, then ranked once."""
+        sessions, minutes, by_category = {}, {}, {}
+        for category, entry in items:
+            key = normalize(entry["exercise"])
+            if not key:
+                continue
+            if key not in self.display:
+                self.display[key] = entry["exercise"]
+            for scope in (category, OVERALL):
+                sessions[scope, key] = sessions.get((scope, key), 0) + 1
+                minutes[scope, key] = minutes.get((scope, key), 0) + entry["duration"]
+            by_category.setdefault(category, []).append(entry)
+        with self._lock:
+            for (scope, key), count in sessions.items():
+                self.frequency[scope].add(key, count)
+                self.minutes[scope].add(key, minutes[scope, key])
+            for category, entries in by_category.items():
+                # Only a category's own `size` longest sessions can enter its
+                # list, and the overall list draws from those same candidates.
+                for entry in heapq.nlargest(self.size, entries, key=lambda e: e["duration"]):
+                    session = {"exercise": entry["exercise"], "duration": entry["duration"],
+                               "timestamp": entry["timestamp"], "category": category}
+                    self.longest[category].add(session)
+                    self.longest[OVERALL].add(session)
+
+    def top(self, metric: str, scope: str = OVERALL, k: int = 10) -> list[dict]:
+        with self._lock:
+            if metric == "longest":
+                return self.longest[scope].top(k)
+            ranking = self.frequency[scope] if metric == "frequency" else self.minutes[scope]
+            field = "sessions" if metric == "frequency" else "minutes"
+            return [{"exercise": self.display[key], field: score} for key, score in ranking.top(k)]
@@ -0,0 +1,84 @@
+import threading
+from .fitness import MET_VALUES, calculate_bmi, calculate_bmr
+
+
+def calorie_factors(weight_kg: float, categories) -> dict[str, float]:
+    """kcal per minute for each category: V1.3's ``calories_burned`` without the duration."""
+    return {category: MET_VALUES.get(category, 5) * 3.5 * weight_kg / 200 for category in categories}
+
+
+class MemberRegistry:
+    """Member profiles with their derived metrics, and each member's entries.
+
+    BMI, BMR and the per-category calorie factors are computed once when a
+    profile is saved, so tagging a workout with its calories is one
+    multiplication. Entries are indexed by member, which makes recalculating
+    after a weight change proportional to that member's own history.
+
+    Entries sealed to disk by tiered retention leave the index (``forget``)
+    and keep the calories they were written with.
+    """
+
+    def __init__(self, categories):
+        self.categories = tuple(categories)
+        self.profiles: dict[str, dict] = {}
+        self.factors: dict[str, dict[str, float]] = {}
+        self.entries: dict[str, dict[int, tuple[str, dict]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def get(self, regn_id: str) -> dict | None:
+        return self.profiles.get(regn_id)
+
+    def save(self, profile: dict) -> tuple[dict, bool, int]:
+        """Store a validated profile; returns ``(profile, created, entries recalculated)``."""
+        regn_id = profile["regn_id"]
+        weight, height = profile["weight"], profile["height"]
+        profile = {
+            **profile,
+            "bmi": round(calculate_bmi(weight, height), 1),
+            "bmr": round(calculate_bmr(weight, height, profile["age"], profile["gender"])),
+        }
+        with self._lock:
+            previous = self.profiles.get(regn_id)
+            self.profiles[regn_id] = profile
+            recalculated = 0
+            if previous is None or previous["weight"] != weight:
+                factors = self.factors[regn_id] = calorie_factors(weight, self.categories)
+                for category, entry in self.entries.get(regn_id, {}).values():
+                    entry["calories"] = round(factors[category] * entry["duration"], 1)
+                    recalculated += 1
+        return profile, previous is None, recalculated
+
+    def attach(self, category: str, entry: dict):
+        self.attach_many(((category, entry),))
+
+    def attach_many(self, items):
+        """Index member entries and tag them with calories when the member has a profile."""
+        with self._lock:
+            for category, entry in items:
+                regn_id = entry.get("member")
+                if regn_id is None:
+                    continue
+                self.entries.setdefault(regn_id, {})[id(entry)] = (category, entry)
+                factors = self.factors.get(regn_id)
+                if factors is not None:
+                    entry["calories"] = round(factors[category] * entry["duration"], 1)
+
+    def forget(self, category: str, entries):
+        """Drop entries that have left memory from the index."""
+        with self._lock:
+            for entry in entries:
+                regn_id = entry.get("member")
+                if regn_id is not None:
+                    indexed = self.entries.get(regn_id)
+                    if indexed is not None:
+                        indexed.pop(id(entry), None)
+
+
+def init_app(app):
+    app.members = MemberRegistry(app.workouts)
+    for log in app.workouts.values():
+        log.on_seal = app.members.forget
@@ -0,0 +1,191 @@
+import atexit
+import cProfile
+import hmac
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from flask import g, request
+
+DEFAULTS = {
+    "PROFILE_SAMPLE_RATE": 0.0,
+    "PROFILE_TOKEN": None,
+    "PROFILE_DIR": "profiles",
+    "PROFILE_FORMAT": "folded",
+    "PROFILE_INTERVAL_MS": 1.0,
+    "PROFILE_FLUSH_EVERY": 20,
+}
+
+PROFILE_HEADER = "X-Profile"
+
+# Python 3.12+ allows one cProfile at a time per interpreter (enable() raises
+# otherwise), and gthread workers serve requests on threads of one interpreter.
+_cprofile_lock = threading.Lock()
+
+
+def route_key(method: str, rule: str) -> str:
+    return method + "".join(ch if ch.isalnum() else "_" for ch in rule).rstrip("_")
+
+
+def collapse(frame) -> str:
+    """Render a frame's stack root-first in Brendan Gregg's folded format."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Samples the stacks of profiled request threads on a background thread.
+
+    The sampler only wakes while at least one request is being profiled; the
+    request thread itself pays for two dict updates, not for tracing.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.active: dict[int, str] = {}
+        self.stacks: dict[str, Counter] = defaultdict(Counter)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def start(self, route: str):
+        with self._lock:
+            self.active[threading.get_ident()] = route
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="aceest-profiler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def stop(self):
+        with self._lock:
+            self.active.pop(threading.get_ident(), None)
+
+    def _run(self):
+        while True:
+            if not self.active:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, route in self.active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        self.stacks[route][collapse(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+    def write(self, directory: str):
+        with self._lock:
+            snapshot = {route: dict(stacks) for route, stacks in self.stacks.items()}
+        for route, stacks in snapshot.items():
+            path = os.path.join(directory, f"{route}.{os.getpid()}.folded")
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                for stack, samples in stacks.items():
+                    f.write(f"{stack} {samples}\n")
+            os.replace(path + ".tmp", path)
+
+
+class RequestProfiler:
+    """Aggregates profiles of sampled requests per route and writes them to disk.
+
+    ``folded`` output (one ``stack count`` line per distinct stack) feeds
+    flamegraph.pl, speedscope or inferno directly; ``pstats`` output opens
+    with ``python -m pstats`` or snakeviz. Only one request is under cProfile
+    at a time; with ``pstats``, a request arriving while another is profiled
+    is sampled into folded stacks instead.
+    """
+
+    def __init__(self, directory: str, fmt: str, interval_ms: float, flush_every: int):
+        if fmt not in ("folded", "pstats"):
+            raise ValueError("PROFILE_FORMAT must be 'folded' or 'pstats'")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.format = fmt
+        self.flush_every = flush_every
+        self.sampler = StackSampler(interval_ms / 1000)
+        self.stats: dict[str, pstats.Stats] = {}
+        self.profiled = 0
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def begin(self, route: str):
+        if self.format == "pstats" and _cprofile_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                return route, profile
+            except ValueError:
+                # Another tool (a debugger, coverage) holds the profiling hook.
+                _cprofile_lock.release()
+        self.sampler.start(route)
+        return route, None
+
+    def end(self, handle):
+        route, profile = handle
+        if profile is None:
+            self.sampler.stop()
+        else:
+            profile.disable()
+            _cprofile_lock.release()
+            with self._lock:
+                if route in self.stats:
+                    self.stats[route].add(profile)
+                else:
+                    self.stats[route] = pstats.Stats(profile)
+        with self._lock:
+            self.profiled += 1
+            due = self.profiled % self.flush_every == 0
+        if due:
+            self.flush()
+
+    def flush(self):
+        self.sampler.write(self.directory)
+        with self._lock:
+            for route, stats in self.stats.items():
+                stats.dump_stats(os.path.join(self.directory, f"{route}.{os.getpid()}.pstats"))
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    rate = app.config["PROFILE_SAMPLE_RATE"]
+    token = app.config["PROFILE_TOKEN"]
+    app.profiler = None
+    # Nothing is registered unless profiling is configured, so the default
+    # request path is unchanged.
+    if rate <= 0 and not token:
+        return
+    profiler = app.profiler = RequestProfiler(
+        app.config["PROFILE_DIR"], app.config["PROFILE_FORMAT"],
+        app.config["PROFILE_INTERVAL_MS"], app.config["PROFILE_FLUSH_EVERY"])
+
+    def wanted():
+        supplied = request.headers.get(PROFILE_HEADER)
+        if supplied is not None and token:
+            return hmac.compare_digest(supplied.encode(), token.encode())
+        return rate > 0 and random.random() < rate
+
+    @app.before_request
+    def start_profile():
+        if request.url_rule is not None and wanted():
+            g.profile = profiler.begin(route_key(request.method, request.url_rule.rule))
+
+    @app.after_request
+    def mark_profiled(response):
+        if "profile" in g:
+            response.headers["X-Profiled"] = "1"
+        return response
+
+    @app.teardown_request
+    def finish_profile(exc):
+        handle = g.pop("profile", None)
+        if handle is not None:
+            profiler.end(handle)
@@ -0,0 +1,138 @@
+import math
+import threading
+import time
+from collections import deque
+from flask import g, request
+from .admission import queued_ms
+
+DEFAULTS = {
+    # Threads per worker; entrypoint.sh passes GUNICORN_THREADS through.
+    "READY_WORKER_THREADS": 4,
+    # Thresholds; set any of them to None to drop that check.
+    "READY_MAX_BUSY_THREADS": None,
+    "READY_MAX_QUEUE_DEPTH": 8,
+    "READY_MAX_QUEUE_MS": 500,
+    "READY_MAX_P99_MS": 1000,
+    "READY_MAX_WRITE_P99_MS": 50,
+    # Latency checks look at samples from the last READY_WINDOW_SECONDS and
+    # only apply once READY_MIN_SAMPLES of them exist.
+    "READY_WINDOW_SECONDS": 30,
+    "READY_WINDOW_SIZE": 2048,
+    "READY_MIN_SAMPLES": 20,
+}
+
+# Probe traffic says nothing about saturation and is not measured.
+PROBE_PATHS = ("/health", "/ready")
+
+
+class LatencyWindow:
+    """The most recent ``size`` samples, of which only the last ``seconds`` count.
+
+    Old samples age out, so a pod that failed readiness and stopped getting
+    traffic recovers instead of being judged on its last bad burst forever.
+    """
+
+    def __init__(self, size: int, seconds: float, clock=time.monotonic):
+        self.samples = deque(maxlen=size)  # (when, value)
+        self.seconds = seconds
+        self.clock = clock
+
+    def add(self, value: float):
+        self.samples.append((self.clock(), value))
+
+    def recent(self) -> list[float]:
+        cutoff = self.clock() - self.seconds
+        return [value for when, value in list(self.samples) if when >= cutoff]
+
+
+def p99(values: list[float]) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(0.99 * len(ordered)) - 1)]
+
+
+class Readiness:
+    """Saturation signals for one worker and the policy that turns them into ready/not ready."""
+
+    def __init__(self, config, clock=time.monotonic):
+        self.config = config
+        self.threads = config["READY_WORKER_THREADS"]
+        size, seconds = config["READY_WINDOW_SIZE"], config["READY_WINDOW_SECONDS"]
+        self.latency = LatencyWindow(size, seconds, clock)
+        self.queue_wait = LatencyWindow(size, seconds, clock)
+        self.writes = LatencyWindow(size, seconds, clock)
+        self.inflight = 0
+        # Set by use_worker() when the server exposes its own queue; None otherwise.
+        self.backlog = None
+        self._lock = threading.Lock()
+
+    def use_worker(self, threads: int, backlog):
+        """Adopt the server's real thread count and a ``backlog()`` of requests waiting for a thread."""
+        self.threads = threads
+        self.backlog = backlog
+
+    def started(self):
+        with self._lock:
+            self.inflight += 1
+
+    def finished(self, elapsed_ms: float):
+        with self._lock:
+            self.inflight -= 1
+        self.latency.add(elapsed_ms)
+
+    def record_write(self, elapsed_ms: float, entries: int = 1):
+        # Bulk imports are normalised per entry so they compare with single writes.
+        self.writes.add(elapsed_ms / max(entries, 1))
+
+    def _percentile(self, window: LatencyWindow):
+        values = window.recent()
+        if len(values) < self.config["READY_MIN_SAMPLES"]:
+            return None
+        return round(p99(values), 3)
+
+    def check(self) -> tuple[bool, dict]:
+        signals = {
+            "busy_threads": min(self.inflight, self.threads),
+            "worker_threads": self.threads,
+            # Requests waiting for a thread never reach Flask, so in-flight
+            # counts cannot show them; only the server's own queue can.
+            "queue_depth": self.backlog() if self.backlog is not None else None,
+            "queue_wait_p99_ms": self._percentile(self.queue_wait),
+            "latency_p99_ms": self._percentile(self.latency),
+            "write_p99_ms": self._percentile(self.writes),
+        }
+        limits = {
+            "busy_threads": self.config["READY_MAX_BUSY_THREADS"],
+            "queue_depth": self.config["READY_MAX_QUEUE_DEPTH"],
+            "queue_wait_p99_ms": self.config["READY_MAX_QUEUE_MS"],
+            "latency_p99_ms": self.config["READY_MAX_P99_MS"],
+            "write_p99_ms": self.config["READY_MAX_WRITE_P99_MS"],
+        }
+        failing = sorted(
+            name for name, limit in limits.items()
+            if limit is not None and signals[name] is not None and signals[name] > limit
+        )
+        return not failing, {"signals": signals, "limits": limits, "failing": failing}
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    app.readiness = readiness = Readiness(app.config)
+
+    @app.before_request
+    def track_start():
+        if request.path in PROBE_PATHS:
+            return
+        g.ready_started = time.perf_counter()
+        readiness.started()
+        waited = queued_ms()
+        if waited is not None:
+            readiness.queue_wait.add(waited)
+
+    @app.teardown_request
+    def track_finish(exc):
+        started = g.pop("ready_started", None)
+        if started is not None:
+            readiness.finished((time.perf_counter() - started) * 1000)
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import threading
+from datetime import date
+from .catalog import DIET_PLANS, GOAL_FOCUS, GOALS, PLAN_MINUTES, WORKOUT_PLAN
+from .search import normalize
+from .streaks import day_number
+
+DEFAULTS = {
+    # Days of history that count as "recent" when scoring.
+    "RECOMMEND_WINDOW_DAYS": 14,
+    "RECOMMEND_PER_CATEGORY": 3,
+}
+
+# An exercise done this many days ago (or never) is fully due again.
+ROTATION_DAYS = 7
+
+
+class CatalogIndex:
+    """The V1.2.2 plan, indexed once by goal and category.
+
+    ``by_goal[goal][category]`` holds ``(exercise, detail, weight)`` with
+    the goal's focus exercises weighted double; ``None`` is the unweighted
+    plan for members without a goal.
+    """
+
+    def __init__(self):
+        self.by_goal = {
+            goal: {
+                category: [(name, detail, 2.0 if goal and name in GOAL_FOCUS[goal] else 1.0)
+                           for name, detail in exercises]
+                for category, exercises in WORKOUT_PLAN.items()
+            }
+            for goal in (None, *GOALS)
+        }
+        self.names = {normalize(name): name for exercises in WORKOUT_PLAN.values() for name, _ in exercises}
+
+
+class MemberHistory:
+    __slots__ = ("last_done", "minutes")
+
+    def __init__(self):
+        self.last_done: dict[str, int] = {}             # catalog exercise -> latest day done
+        self.minutes: dict[str, dict[int, int]] = {}    # category -> day -> minutes, recent days only
+
+
+class Recommender:
+    """Per-member workout and diet recommendations, cached until the member changes.
+
+    Writes update a small per-member history (last day each catalog exercise
+    was done, recent minutes per category) and drop that member's cached
+    answer. A read is a cache hit unless the member has new data, a new
+    profile or the day has turned; a miss scores the handful of catalog
+    exercises from that history, never from the store.
+    """
+
+    def __init__(self, registry, window_days: int = 14, per_category: int = 3, today=date.today):
+        self.registry = registry
+        self.window_days = window_days
+        self.per_category = per_category
+        self.today = today
+        self.catalog = CatalogIndex()
+        self.history: dict[str, MemberHistory] = {}
+        self._cache: dict[tuple, tuple[int, str, str]] = {}   # (member, goal) -> (day, body, etag)
+        self._lock = threading.Lock()
+
+    def add(self, category: str, entry: dict):
+        self.add_many(((category, entry),))
+
+    def add_many(self, items):
+        oldest = self.today().toordinal() - self.window_days
+        names = self.catalog.names
+        with self._lock:
+            for category, entry in items:
+                regn_id = entry.get("member")
+                if regn_id is None:
+                    continue
+                history = self.history.get(regn_id)
+                if history is None:
+                    history = self.history[regn_id] = MemberHistory()
+                day = day_number(entry["timestamp"][:10])
+                name = names.get(normalize(entry["exercise"]))
+                if name is not None and day > history.last_done.get(name, day - 1):
+                    history.last_done[name] = day
+                if day > oldest:
+                    days = history.minutes.setdefault(category, {})
+                    days[day] = days.get(day, 0) + entry["duration"]
+                    if len(days) > 2 * self.window_days:
+                        for old in [d for d in days if d <= oldest]:
+                            del days[old]
+                self._forget(regn_id)
+
+    def invalidate(self, regn_id: str):
+        with self._lock:
+            self._forget(regn_id)
+
+    def _forget(self, regn_id):
+        for goal in (None, *GOALS):
+            self._cache.pop((regn_id, goal), None)
+
+    def recommend(self, regn_id: str | None, goal: str | None = None) -> tuple[str, str]:
+        """``(body, etag)`` of the JSON recommendation; ``goal`` overrides the profile's."""
+        profile = self.registry.get(regn_id) if regn_id else None
+        goal = goal or (profile or {}).get("goal")
+        key = (regn_id, goal)
+        today = self.today().toordinal()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == today:
+                return cached[1], cached[2]
+            history = self.history.get(regn_id) if regn_id else None
+            body = json.dumps(self._score(regn_id, goal, history or MemberHistory(), today), separators=(",", ":"))
+            etag = hashlib.sha256(body.encode("utf-8")).hexdigest()[:16]
+            # Unknown ids are not cached, so arbitrary query strings cannot grow the cache.
+            if regn_id is None or history is not None or profile is not None:
+                self._cache[key] = (today, body, etag)
+            return body, etag
+
+    def _score(self, regn_id, goal, history, today):
+        oldest = today - self.window_days
+        categories, shortfall = {}, {}
+        for category, exercises in self.catalog.by_goal[goal].items():
+            low, high = PLAN_MINUTES[category]
+            recent = sum(minutes for day, minutes in history.minutes.get(category, {}).items() if oldest < day <= today)
+            ranked = []
+            for order, (name, detail, weight) in enumerate(exercises):
+                last = history.last_done.get(name)
+                days_ago = None if last is None else max(today - last, 0)
+                due = 1.0 if days_ago is None else min(days_ago, ROTATION_DAYS) / ROTATION_DAYS
+                ranked.append((-weight * due, order, {"exercise": name, "detail": detail,
+                                                      "score": round(weight * due, 2), "last_done_days_ago": days_ago}))
+            ranked.sort(key=lambda item: item[:2])
+            # Expected minutes for the window if the member trains every other day.
+            target = (low + high) / 2 * self.window_days / 2
+            shortfall[category] = recent / target
+            categories[category] = {
+                "suggested_minutes": [low, high],
+                "recent_minutes": recent,
+                "exercises": [item[2] for item in ranked[:self.per_category]],
+            }
+        return {
+            "member": regn_id,
+            "goal": goal,
+            "window_days": self.window_days,
+            "focus": min(shortfall, key=shortfall.get),
+            "categories": categories,
+            "diet": [{"meal": meal, "food": food} for meal, food in DIET_PLANS.get(goal, ())],
+        }
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    app.recommender = Recommender(app.members, app.config["RECOMMEND_WINDOW_DAYS"],
+                                  app.config["RECOMMEND_PER_CATEGORY"])
@@ -0,0 +1,178 @@
+"""Replay captured traffic against one or two builds and compare them.
+
+    python -m app.replay captures/traffic-*.ndjson --target http://localhost:8000
+    python -m app.replay captures/*.ndjson --target http://localhost:8001 \\
+        --baseline http://localhost:8000 --speed 10
+
+Captures come from running the API with ``ACEEST_CAPTURE_PATH`` set.
+``--speed 1`` keeps the recorded pacing, ``--speed 10`` compresses it tenfold
+and ``--speed 0`` sends requests as fast as the workers allow.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import requests
+from requests.adapters import HTTPAdapter
+
+
+@dataclass
+class Result:
+    route: str
+    status: int          # 0 when the request never got a response
+    latency_ms: float
+    recorded_status: int | None
+
+
+@dataclass
+class RouteStats:
+    latencies: list = field(default_factory=list)
+    errors: int = 0
+    mismatches: int = 0
+
+    @property
+    def count(self):
+        return len(self.latencies)
+
+
+def load_capture(paths):
+    """Merge one or more capture files (one per worker) into start-time order.
+
+    Records are written as requests complete, so even a single file is only
+    roughly ordered; a slow request lands after faster ones that started later.
+    """
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    records.sort(key=lambda r: r["t"])
+    return records
+
+
+def route_of(record):
+    return f"{record['m']} {record['p'].split('?', 1)[0]}"
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Replayer:
+    def __init__(self, target: str, concurrency: int = 32, timeout: float = 30.0):
+        self.target = target.rstrip("/")
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self._local = threading.local()
+
+    def session(self):
+        # One keep-alive session per worker thread; requests.Session is not thread-safe.
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        return session
+
+    def send(self, record) -> Result:
+        body = record.get("b")
+        started = time.perf_counter()
+        try:
+            response = self.session().request(
+                record["m"], self.target + record["p"], headers=record.get("h"),
+                data=body.encode("utf-8") if body is not None else None, timeout=self.timeout)
+            status = response.status_code
+        except requests.RequestException:
+            status = 0
+        return Result(route_of(record), status, (time.perf_counter() - started) * 1000, record.get("s"))
+
+    def run(self, records, speed: float = 1.0):
+        if not records:
+            return []
+        t0 = records[0]["t"]
+        wall0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = []
+            for record in records:
+                if speed > 0:
+                    delay = (record["t"] - t0) / speed - (time.perf_counter() - wall0)
+                    if delay > 0:
+                        time.sleep(delay)
+                futures.append(pool.submit(self.send, record))
+            return [f.result() for f in futures]
+
+
+def summarize(results):
+    stats = defaultdict(RouteStats)
+    for result in results:
+        for key in (result.route, "ALL"):
+            route = stats[key]
+            route.latencies.append(result.latency_ms)
+            if result.status == 0 or result.status >= 500:
+                route.errors += 1
+            if result.recorded_status is not None and result.status != result.recorded_status:
+                route.mismatches += 1
+    for route in stats.values():
+        route.latencies.sort()
+    return dict(stats)
+
+
+def format_report(name, stats):
+    lines = [f"== {name}", f"{'route':<32}{'count':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'errors':>8}{'status!=rec':>13}"]
+    for route in sorted(stats, key=lambda r: (r == "ALL", r)):
+        s = stats[route]
+        lines.append(f"{route:<32}{s.count:>8}{percentile(s.latencies, 50):>10.2f}{percentile(s.latencies, 90):>10.2f}"
+                     f"{percentile(s.latencies, 99):>10.2f}{s.errors:>8}{s.mismatches:>13}")
+    return "\n".join(lines)
+
+
+def format_diff(baseline, candidate):
+    lines = ["== candidate vs baseline", f"{'route':<32}{'p50 delta':>12}{'p99 delta':>12}{'errors delta':>14}"]
+    for route in sorted(set(baseline) | set(candidate), key=lambda r: (r == "ALL", r)):
+        b, c = baseline.get(route, RouteStats()), candidate.get(route, RouteStats())
+
+        def pct(q):
+            before, after = percentile(b.latencies, q), percentile(c.latencies, q)
+            return f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+        lines.append(f"{route:<32}{pct(50):>12}{pct(99):>12}{c.errors - b.errors:>+14d}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay captured ACEest traffic against local builds.")
+    parser.add_argument("captures", nargs="+", help="capture files written by ACEEST_CAPTURE_PATH")
+    parser.add_argument("--target", required=True, help="base URL of the build under test")
+    parser.add_argument("--baseline", help="base URL of a second build to compare against")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression factor; 0 = no pacing")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args(argv)
+
+    records = load_capture(args.captures)
+    print(f"Loaded {len(records)} requests from {len(args.captures)} file(s)")
+    skipped = sum(1 for record in records if record.get("bs"))
+    if skipped:
+        # Without their body these would be different requests and show false diffs.
+        records = [record for record in records if not record.get("bs")]
+        print(f"Skipping {skipped} requests whose body was not captured (streamed or over CAPTURE_MAX_BODY)")
+    if not records:
+        print("Nothing to replay", file=sys.stderr)
+        return 1
+    candidate = summarize(Replayer(args.target, args.concurrency, args.timeout).run(records, args.speed))
+    print(format_report(args.target, candidate))
+    if args.baseline:
+        # Builds run one after the other so they do not compete for the same CPU.
+        baseline = summarize(Replayer(args.baseline, args.concurrency, args.timeout).run(records, args.speed))
+        print(format_report(args.baseline, baseline))
+        print(format_diff(baseline, candidate))
+    return 1 if candidate["ALL"].errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
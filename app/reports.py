@@ -0,0 +1,264 @@
+"""Weekly PDF reports for every member, rendered on all cores.
+
+    python -m app.reports --members members.ndjson --workouts workouts.ndjson --out reports
+    python -m app.reports ... --week 2024-W18 --workers 8
+
+Inputs are NDJSON: member profiles as written by ``app.datagen --members-out``
+(``regn_id``, ``name``, ``age``, ``gender``, ``height``, ``weight``) and
+workouts in the bulk-import format with a ``member`` field. The week defaults
+to the last complete ISO week.
+
+The workouts file is read once and the week's rows are split into shard
+files by member. Each worker process then takes one shard at a time, so no
+process holds more than a shard's members and their week. Reports are
+written to ``OUT/<week>/<regn_id>.pdf`` through a temporary file, so a
+report that exists is complete. After a crash, run the same command again:
+finished shards are reused and members that already have a report are
+skipped.
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from types import SimpleNamespace
+from .fitness import calculate_bmi, calculate_bmr, calories_burned
+
+ROWS_PER_PAGE = 38
+SAFE_ID = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def parse_week(value: str | None, today: date | None = None) -> tuple[str, date]:
+    """``("2024-W18", monday)``; ``None`` means the last complete ISO week."""
+    if value is None:
+        today = today or date.today()
+        monday = today - timedelta(days=today.weekday() + 7)
+    else:
+        match = re.fullmatch(r"(\d{4})-W(\d{1,2})", value)
+        if not match:
+            raise ValueError(f"week must look like 2024-W18, got {value!r}")
+        monday = date.fromisocalendar(int(match[1]), int(match[2]), 1)
+    year, week, _ = monday.isocalendar()
+    return f"{year}-W{week:02d}", monday
+
+
+def report_path(out_dir: str, regn_id: str) -> str:
+    return os.path.join(out_dir, SAFE_ID.sub("_", regn_id) + ".pdf")
+
+
+def shard_of(regn_id: str, shards: int) -> int:
+    # crc32 rather than hash() so shards stay stable across runs.
+    return zlib.crc32(regn_id.encode("utf-8")) % shards
+
+
+def partition(members_path, workouts_path, spool, out_dir, monday, shards) -> int:
+    """Split the week's rows into per-shard spool files; returns the members to render.
+
+    Members with a finished report are left out. The spool is written under
+    a temporary name and renamed when complete, so a restart either reuses
+    a whole spool or starts it again.
+    """
+    if os.path.exists(os.path.join(spool, "complete")):
+        with open(os.path.join(spool, "complete"), encoding="utf-8") as f:
+            return json.load(f)["members"]
+    partial = spool + ".partial"
+    shutil.rmtree(partial, ignore_errors=True)
+    os.makedirs(partial)
+    member_files = [open(os.path.join(partial, f"members-{k}.ndjson"), "w", encoding="utf-8") for k in range(shards)]
+    workout_files = [open(os.path.join(partial, f"workouts-{k}.ndjson"), "w", encoding="utf-8") for k in range(shards)]
+    wanted = set()
+    try:
+        with open(members_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                regn_id = json.loads(line)["regn_id"]
+                if regn_id in wanted or os.path.exists(report_path(out_dir, regn_id)):
+                    continue
+                wanted.add(regn_id)
+                member_files[shard_of(regn_id, shards)].write(line if line.endswith("\n") else line + "\n")
+        # Timestamps start "YYYY-MM-DD", so the week is a string range.
+        since, until = monday.isoformat(), (monday + timedelta(days=7)).isoformat()
+        with open(workouts_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                member = row.get("member")
+                if member in wanted and since <= row.get("timestamp", "") < until:
+                    workout_files[shard_of(member, shards)].write(line if line.endswith("\n") else line + "\n")
+    finally:
+        for f in member_files + workout_files:
+            f.close()
+    with open(os.path.join(partial, "complete"), "w", encoding="utf-8") as f:
+        json.dump({"members": len(wanted), "shards": shards}, f)
+    os.replace(partial, spool)
+    return len(wanted)
+
+
+_reportlab = None
+_reportlab_lock = threading.Lock()
+
+
+def reportlab_api():
+    """ReportLab's canvas, page size, table and colours, imported on first use.
+
+    ReportLab is slow to import and only needed to render, so the desktop app
+    calls this on its pre-warm thread to load exactly what ``draw_report`` uses.
+    """
+    global _reportlab
+    if _reportlab is None:
+        with _reportlab_lock:
+            if _reportlab is None:
+                from reportlab.pdfgen import canvas as pdf_canvas
+                from reportlab.lib.pagesizes import A4
+                from reportlab.platypus import Table, TableStyle
+                from reportlab.lib import colors
+                _reportlab = SimpleNamespace(pdf_canvas=pdf_canvas, A4=A4, Table=Table, TableStyle=TableStyle,
+                                             colors=colors)
+    return _reportlab
+
+
+TABLE_HEADER = ["Category", "Exercise", "Duration(min)", "Calories(kcal)", "Date"]
+
+
+def draw_report(filename: str, title: str, lines: list, table_rows: list, progress=None) -> None:
+    """Write a weekly report PDF: a title, summary lines and the workouts table.
+
+    This is the one layout for weekly reports, used here and by the V1.3
+    desktop export. The table continues over as many pages as it needs.
+    ``progress(fraction, message)`` is called before each page.
+    """
+    rl = reportlab_api()
+    c = rl.pdf_canvas.Canvas(filename, pagesize=rl.A4); page_width, page_height = rl.A4
+    style = rl.TableStyle([("BACKGROUND", (0, 0), (-1, 0), rl.colors.lightblue),
+                           ("GRID", (0, 0), (-1, -1), 0.5, rl.colors.black)])
+    pages = [table_rows[i:i + ROWS_PER_PAGE] for i in range(0, len(table_rows), ROWS_PER_PAGE)] or [[]]
+    for number, page in enumerate(pages):
+        if progress:
+            progress(number / len(pages), f"Laying out page {number + 1}/{len(pages)}")
+        y = page_height - 50
+        if number == 0:
+            c.setFont("Helvetica-Bold", 16); c.drawString(50, y, title)
+            c.setFont("Helvetica", 11)
+            for line in lines:
+                y -= 20
+                c.drawString(50, y - 10, line)
+            y -= 30
+        table = rl.Table([TABLE_HEADER] + page, colWidths=[80, 150, 80, 80, 80])
+        table.setStyle(style)
+        _, table_height = table.wrapOn(c, page_width - 100, y)
+        table.drawOn(c, 50, y - table_height)
+        c.showPage()
+    c.save()
+
+
+def render_report(filename: str, week: str, member: dict, rows: list) -> None:
+    """Write one member's weekly PDF, laid out like the desktop export."""
+    weight, height = member["weight"], member["height"]
+    bmi = calculate_bmi(weight, height)
+    bmr = calculate_bmr(weight, height, member["age"], member["gender"])
+    table_rows = []
+    total_minutes = total_calories = 0
+    for row in sorted(rows, key=lambda r: r["timestamp"]):
+        duration = int(row["duration"])
+        calories = calories_burned(row["category"], duration, weight)
+        total_minutes += duration
+        total_calories += calories
+        table_rows.append([row["category"], row.get("workout") or row.get("exercise", ""), str(duration),
+                           f"{calories:.1f}", row["timestamp"].split()[0]])
+
+    temporary = filename + ".tmp"
+    draw_report(temporary, f"Weekly Fitness Report - {member['name']} ({week})", [
+        f"Regn-ID: {member['regn_id']} | Age: {member['age']} | Gender: {member['gender']}",
+        f"Height: {height} cm | Weight: {weight} kg | BMI: {bmi:.1f} | BMR: {bmr:.0f} kcal/day",
+        f"Sessions: {len(table_rows)} | Minutes: {total_minutes} | Calories: {total_calories:.0f} kcal",
+    ], table_rows)
+    os.replace(temporary, filename)
+
+
+def render_shard(spool: str, shard: int, out_dir: str, week: str) -> tuple[int, list]:
+    """Render every report in one shard; returns ``(rendered, errors)``."""
+    members = {}
+    with open(os.path.join(spool, f"members-{shard}.ndjson"), encoding="utf-8") as f:
+        for line in f:
+            member = json.loads(line)
+            members[member["regn_id"]] = member
+    rows = {regn_id: [] for regn_id in members}
+    with open(os.path.join(spool, f"workouts-{shard}.ndjson"), encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            rows[row["member"]].append(row)
+    rendered, errors = 0, []
+    for regn_id, member in members.items():
+        filename = report_path(out_dir, regn_id)
+        if os.path.exists(filename):
+            continue
+        try:
+            render_report(filename, week, member, rows.pop(regn_id))
+            rendered += 1
+        except Exception as exc:
+            errors.append(f"{regn_id}: {exc}")
+    return rendered, errors
+
+
+def run(members_path, workouts_path, out, week=None, workers=None, shards=None, progress=None) -> tuple[int, list]:
+    """Render the week's missing reports; returns ``(rendered, errors)``."""
+    week, monday = parse_week(week)
+    workers = workers or os.cpu_count() or 1
+    out_dir = os.path.join(out, week)
+    spool = os.path.join(out, f".spool-{week}")
+    os.makedirs(out_dir, exist_ok=True)
+    if os.path.exists(os.path.join(spool, "complete")):
+        with open(os.path.join(spool, "complete"), encoding="utf-8") as f:
+            shards = json.load(f)["shards"]
+    # Several shards per worker keep every core busy until the end.
+    shards = shards or workers * 8
+    pending = partition(members_path, workouts_path, spool, out_dir, monday, shards)
+    rendered, errors = 0, []
+    if not pending:
+        shutil.rmtree(spool, ignore_errors=True)
+        return rendered, errors
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_shard, spool, shard, out_dir, week) for shard in range(shards)]
+        for future in as_completed(futures):
+            done, failed = future.result()
+            rendered += done
+            errors += failed
+            if progress:
+                progress(rendered, pending)
+    if not errors:
+        shutil.rmtree(spool, ignore_errors=True)
+    return rendered, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render weekly PDF reports for every member.")
+    parser.add_argument("--members", required=True, help="member profiles (NDJSON)")
+    parser.add_argument("--workouts", required=True, help="workouts with a 'member' field (NDJSON)")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--week", help="ISO week such as 2024-W18 (default: last complete week)")
+    parser.add_argument("--workers", type=int, help="processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    rendered, errors = run(args.members, args.workouts, args.out, args.week, args.workers,
+                           progress=lambda done, total: print(f"\r{done}/{total} reports", end="", file=sys.stderr))
+    elapsed = time.perf_counter() - started
+    print(f"\nRendered {rendered} reports in {elapsed:.1f}s ({rendered / max(elapsed, 1e-9):.0f}/s)", file=sys.stderr)
+    for error in errors[:20]:
+        print(f"  {error}", file=sys.stderr)
+    if errors:
+        print(f"{len(errors)} reports failed; run again to retry them", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+import atexit
+import bisect
+import gzip
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+
+DEFAULTS = {
+    # Parent directory for sealed segments. Each worker spills into its own
+    # subdirectory, removed at exit. None keeps all history in memory.
+    "RETENTION_DIR": None,
+    "RETENTION_HOT_LIMIT": 50000,
+    "RETENTION_SEGMENT_SIZE": 10000,
+}
+
+def slug(category: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", category.lower()).strip("-")
+
+
+@dataclass(frozen=True)
+class Segment:
+    path: str
+    seq: int
+    count: int
+    last_version: int = 0
+
+    def __iter__(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+
+@dataclass(frozen=True)
+class LogView:
+    """A log as of one moment: its sealed segments and a copy of the hot list.
+
+    Iterating streams the segments one line at a time, so a reader holds at
+    most the hot set in memory however much history is sealed.
+    """
+    segments: tuple
+    hot: list
+
+    def __len__(self):
+        return sum(segment.count for segment in self.segments) + len(self.hot)
+
+    def __iter__(self):
+        for segment in self.segments:
+            yield from segment
+        yield from self.hot
+
+
+def _version(entry: dict) -> int:
+    return entry.get("version", 0)
+
+
+def _last_version(segment: Segment) -> int:
+    return segment.last_version
+
+
+class CategoryLog:
+    """One category's sessions, oldest first: sealed segments, then the hot list.
+
+    Only the newest ``hot_limit`` sessions stay in memory. Older ones are
+    written out ``segment_size`` at a time as gzip-compressed NDJSON files
+    that are never modified again, so reads can stream them without locks.
+    Writes only append; a ``Sealer`` thread does the compression and file
+    I/O, so requests never wait on it unless it falls a whole hot set behind.
+    """
+
+    def __init__(self, category: str, directory: str | None, hot_limit: int, segment_size: int, sealer=None):
+        self.category = category
+        self.directory = directory
+        self.hot_limit = hot_limit
+        self.segment_size = min(segment_size, hot_limit) or 1
+        self.hot: list[dict] = []
+        self.segments: list[Segment] = []
+        # Called as on_seal(category, entries) once entries are on disk.
+        self.on_seal = None
+        # Without a sealer (e.g. a log used on its own), writers seal inline.
+        self.sealer = sealer
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)
+
+    @property
+    def cold_count(self) -> int:
+        return sum(segment.count for segment in self.segments)
+
+    def __len__(self):
+        with self._lock:
+            return self.cold_count + len(self.hot)
+
+    def view(self) -> LogView:
+        # Snapshot under the lock; the immutable segments are read outside it.
+        with self._lock:
+            return LogView(tuple(self.segments), list(self.hot))
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def after_version(self, version: int, limit: int) -> list[dict]:
+        """Up to ``limit`` entries with a sync version above ``version``, oldest first.
+
+        Relies on the store being in version order (``record`` stamps and
+        appends under one lock), so both tiers are binary-searched and at
+        most one segment is read up to the start point.
+        """
+        with self._lock:
+            segments = self.segments[bisect.bisect_right(self.segments, version, key=_last_version):]
+            start = bisect.bisect_right(self.hot, version, key=_version)
+            hot = self.hot[start:start + limit]
+        found = []
+        for segment in segments:
+            for entry in segment:
+                if entry.get("version", 0) > version:
+                    found.append(entry)
+                    if len(found) == limit:
+                        return found
+        return found + hot[:limit - len(found)]
+
+    def append(self, entry: dict):
+        self.extend((entry,))
+
+    def extend(self, entries):
+        with self._lock:
+            self.hot.extend(entries)
+            overflow = self.directory is not None and len(self.hot) > self.hot_limit
+            # Backpressure: only a sealer a whole hot set behind makes writers wait.
+            sealer = self.sealer
+            while overflow and sealer is not None and len(self.hot) > 2 * self.hot_limit and not sealer.failing:
+                sealer.request(self)
+                self._drained.wait(1)
+        if overflow:
+            if self.sealer is None:
+                self.seal_overflow()
+            else:
+                self.sealer.request(self)
+
+    def seal_overflow(self):
+        """Seal the oldest hot entries until the hot list is back under ``hot_limit``.
+
+        Only one thread seals a given log, so the prefix it writes cannot
+        change underneath it; writers keep appending meanwhile.
+        """
+        while True:
+            with self._lock:
+                if self.directory is None or len(self.hot) <= self.hot_limit:
+                    return
+                sealed = self.hot[:self.segment_size]
+                seq = len(self.segments)
+            path = os.path.join(self.directory, f"{slug(self.category)}-{seq:06d}.ndjson.gz")
+            with gzip.open(path + ".tmp", "wt", encoding="utf-8", compresslevel=6) as f:
+                for entry in sealed:
+                    f.write(json.dumps(entry, separators=(",", ":"), ensure_ascii=False))
+                    f.write("\n")
+            os.replace(path + ".tmp", path)
+            with self._lock:
+                self.segments.append(Segment(path, seq, len(sealed), sealed[-1].get("version", 0)))
+                del self.hot[:len(sealed)]
+                self._drained.notify_all()
+            if self.on_seal is not None:
+                self.on_seal(self.category, sealed)
+
+
+class Sealer:
+    """One background thread per worker that seals overflowing logs."""
+
+    def __init__(self, logger=None):
+        self.logger = logger
+        # Set while sealing fails (e.g. a full disk), so writers stop waiting on it.
+        self.failing = False
+        self._pending: dict[CategoryLog, None] = {}
+        self._busy = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def request(self, log: CategoryLog):
+        with self._cond:
+            if self._thread is None:
+                # Started on first use, so each forked worker gets its own sealer.
+                self._thread = threading.Thread(target=self._run, name="aceest-sealer", daemon=True)
+                self._thread.start()
+            self._pending[log] = None
+            self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every requested log is sealed; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                log = next(iter(self._pending))
+                del self._pending[log]
+                self._busy = True
+            try:
+                log.seal_overflow()
+                self.failing = False
+            except Exception:
+                # The entries stay hot; the next write to this log retries.
+                self.failing = True
+                if self.logger is not None:
+                    self.logger.exception("Sealing %s failed", log.category)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+
+class TieredStore(dict):
+    """``category -> CategoryLog``; a drop-in for the old dict of lists."""
+
+    def __init__(self, categories, directory: str | None = None, hot_limit: int = 50000, segment_size: int = 10000,
+                 logger=None):
+        self.sealer = Sealer(logger)
+        super().__init__((c, CategoryLog(c, directory, hot_limit, segment_size, self.sealer)) for c in categories)
+        self.directory = directory
+
+    def views(self) -> dict[str, LogView]:
+        """A consistent view of every category, for streaming reads."""
+        return {category: log.view() for category, log in self.items()}
+
+    def as_dict(self) -> dict[str, list[dict]]:
+        """Every session per category across both tiers, fully loaded; prefer ``views()`` in request paths."""
+        return {category: list(log) for category, log in self.items()}
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait for background sealing to catch up."""
+        return self.sealer.flush(timeout)
+
+    def stats(self) -> dict:
+        return {
+            category: {"hot": len(log.hot), "cold": log.cold_count, "segments": len(log.segments)}
+            for category, log in self.items()
+        }
+
+
+def init_app(app, categories):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    directory = app.config["RETENTION_DIR"]
+    if directory is not None:
+        # Segments hold this worker's spilled history, like the hot lists
+        # they extend; a private directory keeps workers from colliding.
+        os.makedirs(directory, exist_ok=True)
+        directory = tempfile.mkdtemp(prefix=f"aceest-{os.getpid()}-", dir=directory)
+        atexit.register(shutil.rmtree, directory, True)
+    app.workouts = TieredStore(categories, directory, app.config["RETENTION_HOT_LIMIT"],
+                               app.config["RETENTION_SEGMENT_SIZE"], app.logger)
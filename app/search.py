@@ -0,0 +1,168 @@
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+from collections import deque
+from functools import lru_cache
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+# Trie nodes matching more names than this keep a ranked top list up to date
+# at write time, so short, broad prefixes ("p", "pu") stay cheap to serve.
+TOP_THRESHOLD = 256
+TOP_SIZE = 32
+
+
+@lru_cache(maxsize=65536)
+def normalize(text: str) -> str:
+    """Fold case and accents and collapse punctuation: "Push-Ups (3x10)" -> "push ups 3x10"."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(_NON_WORD.sub(" ", text.casefold()).split())
+
+
+class _TrieNode:
+    __slots__ = ("children", "names", "top")
+
+    def __init__(self):
+        self.children = {}
+        self.names = set()
+        self.top = None
+
+
+class _TopList:
+    __slots__ = ("keys", "floor")
+
+    def __init__(self, keys: list, floor: int):
+        self.keys = keys
+        # Count of the last name once the list is full; anything below cannot enter.
+        self.floor = floor
+
+
+class _NameStats:
+    __slots__ = ("display", "count", "recent", "nodes")
+
+    def __init__(self, display: str, recent: int):
+        self.display = display
+        self.count = 0
+        self.recent = deque(maxlen=recent)
+        self.nodes = []
+
+
+class ExerciseIndex:
+    """Inverted index plus token prefix trie over normalized exercise names.
+
+    Entries are grouped by normalized name, so lookups scale with the number
+    of distinct exercises, not with the number of logged sessions. Each name
+    keeps its session count and its most recent sessions; the bounded deque
+    keeps memory flat however many sessions are indexed.
+    """
+
+    def __init__(self, recent_per_name: int = 20):
+        self.recent_per_name = recent_per_name
+        self._names: dict[str, _NameStats] = {}
+        self._tokens: dict[str, set[str]] = {}
+        self._trie = _TrieNode()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, category: str, entry: dict):
+        self.add_many(((category, entry),))
+
+    def add_many(self, items):
+        """Index ``(category, entry)`` pairs; a batch re-ranks each name once."""
+        grouped = {}
+        for category, entry in items:
+            key = normalize(entry["exercise"])
+            if key:
+                grouped.setdefault(key, []).append((category, entry))
+        with self._lock:
+            for key, group in grouped.items():
+                stats = self._names.get(key)
+                if stats is None:
+                    stats = self._names[key] = _NameStats(group[0][1]["exercise"], self.recent_per_name)
+                    self._index_name(key, stats)
+                stats.count += len(group)
+                stats.recent.extend(group)
+                count = stats.count
+                for node in stats.nodes:
+                    top = node.top
+                    if top is not None and count >= top.floor:
+                        self._promote(top, key)
+
+    def _rank(self, key: str):
+        return (-self._names[key].count, key)
+
+    def _promote(self, top: _TopList, key: str):
+        # Counts only grow, so a name can only enter or climb a top list when
+        # its own count changes; keeping the list exact needs no rescans.
+        keys = top.keys
+        if key in keys:
+            keys.remove(key)
+        elif len(keys) >= TOP_SIZE and self._rank(key) >= self._rank(keys[-1]):
+            return
+        bisect.insort(keys, key, key=self._rank)
+        del keys[TOP_SIZE:]
+        if len(keys) >= TOP_SIZE:
+            top.floor = self._names[keys[-1]].count
+
+    def _index_name(self, key: str, stats: _NameStats):
+        for token in set(key.split()):
+            self._tokens.setdefault(token, set()).add(key)
+            node = self._trie
+            for ch in token:
+                node = node.children.setdefault(ch, _TrieNode())
+                if key in node.names:
+                    continue
+                node.names.add(key)
+                stats.nodes.append(node)
+                if node.top is None and len(node.names) > TOP_THRESHOLD:
+                    keys = self._top(node.names, TOP_SIZE)
+                    node.top = _TopList(keys, self._names[keys[-1]].count)
+
+    def _prefix_node(self, prefix: str):
+        node = self._trie
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def _match(self, tokens: list[str]):
+        # Every complete word must match exactly; the last word may be partial.
+        node = self._prefix_node(tokens[-1])
+        candidates = [self._tokens.get(t, set()) for t in tokens[:-1]]
+        candidates.append(node.names if node else set())
+        if len(candidates) == 1:
+            return candidates[0]
+        return set.intersection(*sorted(candidates, key=len))
+
+    def _top(self, keys, limit):
+        return heapq.nsmallest(limit, keys, key=self._rank)
+
+    def _ranked(self, query: str, limit: int) -> list[str]:
+        tokens = normalize(query).split()
+        if not tokens:
+            return []
+        if len(tokens) == 1 and limit <= TOP_SIZE:
+            node = self._prefix_node(tokens[0])
+            if node is not None and node.top is not None:
+                return node.top.keys[:limit]
+        return self._top(self._match(tokens), limit)
+
+    def suggest(self, query: str, limit: int = 10) -> list[dict]:
+        with self._lock:
+            return [{"exercise": self._names[k].display, "count": self._names[k].count}
+                    for k in self._ranked(query, limit)]
+
+    def search(self, query: str, limit: int = 10, entries: int = 5) -> list[dict]:
+        with self._lock:
+            results = []
+            for k in self._ranked(query, limit):
+                stats = self._names[k]
+                recent = [{**entry, "category": category} for category, entry in list(stats.recent)[-entries:]][::-1] if entries else []
+                results.append({"exercise": stats.display, "count": stats.count, "recent": recent})
+            return results
@@ -0,0 +1,229 @@
+import math
+import threading
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _k(q: float, compression: float) -> float:
+    return compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+
+def _k_inverse(k: float, compression: float) -> float:
+    return (math.sin(k * 2 * math.pi / compression) + 1) / 2
+
+
+class DurationSketch:
+    """Mergeable streaming summary: count, mean, variance, min, max and quantiles.
+
+    Up to ``exact_limit`` values are kept verbatim and quantiles are exact.
+    Beyond that the values fold into a merging t-digest whose size is bounded
+    by ``compression`` (memory is O(compression) regardless of how many values
+    are added), with the usual t-digest accuracy: tightest at the tails.
+    Moments use Welford's update and Chan's formula to merge, so they stay
+    exact in both modes.
+    """
+
+    def __init__(self, compression: float = 100, exact_limit: int = 1000):
+        self.compression = compression
+        self.exact_limit = exact_limit
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.values: list[float] | None = []     # exact mode
+        self.centroids: list[list[float]] = []   # [mean, weight], sorted by mean
+        self.buffer: list[float] = []
+
+    @property
+    def exact(self) -> bool:
+        return self.values is not None
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if self.values is not None:
+            self.values.append(value)
+            if len(self.values) > self.exact_limit:
+                self.buffer, self.values = self.values, None
+                self._compress()
+            return
+        self.buffer.append(value)
+        if len(self.buffer) >= self.compression * 5:
+            self._compress()
+
+    def extend(self, values):
+        """Add many values at once: batch moments merged with Chan's formula."""
+        values = list(values)
+        if not values:
+            return
+        n = len(values)
+        mean = sum(values) / n
+        m2 = sum((v - mean) ** 2 for v in values)
+        total = self.count + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+        self.min = min(self.min, min(values))
+        self.max = max(self.max, max(values))
+        if self.values is not None:
+            self.values.extend(values)
+            if len(self.values) <= self.exact_limit:
+                return
+            self.buffer, self.values = self.values, None
+        else:
+            self.buffer.extend(values)
+        if len(self.buffer) >= self.compression * 5:
+            self._compress()
+
+    def merge(self, other: "DurationSketch"):
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if self.values is not None and other.values is not None and len(self.values) + len(other.values) <= self.exact_limit:
+            self.values.extend(other.values)
+            return
+        if self.values is not None:
+            self.buffer, self.values = self.values, None
+        self.buffer.extend(other.values if other.values is not None else other.buffer)
+        if other.values is None:
+            self.centroids.extend([c[:] for c in other.centroids])
+            self.centroids.sort(key=lambda c: c[0])
+        self._compress()
+
+    def _compress(self):
+        points = self.centroids + [[v, 1.0] for v in self.buffer]
+        self.buffer = []
+        if not points:
+            return
+        points.sort(key=lambda c: c[0])
+        total = sum(w for _, w in points)
+        merged = [points[0][:]]
+        seen = 0.0
+        limit = total * _k_inverse(_k(0.0, self.compression) + 1, self.compression)
+        for mean, weight in points[1:]:
+            current = merged[-1]
+            if seen + current[1] + weight <= limit:
+                current[0] += (mean - current[0]) * weight / (current[1] + weight)
+                current[1] += weight
+            else:
+                seen += current[1]
+                limit = total * _k_inverse(_k(seen / total, self.compression) + 1, self.compression)
+                merged.append([mean, weight])
+        self.centroids = merged
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        if self.values is not None:
+            # Sorting in place keeps repeated reads close to O(n).
+            self.values.sort()
+            ordered = self.values
+            position = q * (len(ordered) - 1)
+            lower = math.floor(position)
+            upper = min(lower + 1, len(ordered) - 1)
+            return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+        if self.buffer:
+            self._compress()
+        centroids = self.centroids
+        if len(centroids) == 1:
+            return centroids[0][0]
+        target = q * self.count
+        # Each centroid's mass is centred on its mean; interpolate between
+        # neighbouring centres and clamp to the observed min and max.
+        cumulative = 0.0
+        previous_mean, previous_center = self.min, 0.0
+        for mean, weight in centroids:
+            center = cumulative + weight / 2
+            if target < center:
+                span = center - previous_center
+                fraction = (target - previous_center) / span if span else 0.0
+                return previous_mean + (mean - previous_mean) * fraction
+            previous_mean, previous_center = mean, center
+            cumulative += weight
+        span = self.count - previous_center
+        fraction = (target - previous_center) / span if span else 0.0
+        return previous_mean + (self.max - previous_mean) * fraction
+
+    def summary(self) -> dict:
+        result = {
+            "count": self.count,
+            "mean": round(self.mean, 3) if self.count else None,
+            "variance": round(self.variance, 3) if self.count else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "exact": self.exact,
+        }
+        for q in QUANTILES:
+            value = self.quantile(q)
+            result[f"p{round(q * 100)}"] = round(value, 3) if value is not None else None
+        return result
+
+    def to_dict(self) -> dict:
+        if self.buffer:
+            self._compress()
+        return {
+            "compression": self.compression, "exact_limit": self.exact_limit,
+            "count": self.count, "mean": self.mean, "m2": self.m2,
+            "min": self.min if self.count else None, "max": self.max if self.count else None,
+            "values": self.values, "centroids": self.centroids,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DurationSketch":
+        sketch = cls(data["compression"], data["exact_limit"])
+        sketch.count, sketch.mean, sketch.m2 = data["count"], data["mean"], data["m2"]
+        if data["count"]:
+            sketch.min, sketch.max = data["min"], data["max"]
+        sketch.values = data["values"]
+        sketch.centroids = [list(c) for c in data["centroids"]]
+        return sketch
+
+
+class DurationStats:
+    """One sketch per category plus an overall one, updated on every write."""
+
+    def __init__(self, categories, **sketch_options):
+        self.sketches = {category: DurationSketch(**sketch_options) for category in categories}
+        self.overall = DurationSketch(**sketch_options)
+        self._lock = threading.Lock()
+
+    def add(self, category: str, duration: float):
+        with self._lock:
+            self.sketches[category].add(duration)
+            self.overall.add(duration)
+
+    def add_many(self, items):
+        grouped = {category: [] for category in self.sketches}
+        for category, entry in items:
+            grouped[category].append(entry["duration"])
+        with self._lock:
+            for category, durations in grouped.items():
+                self.sketches[category].extend(durations)
+                self.overall.extend(durations)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "by_category": {category: sketch.summary() for category, sketch in self.sketches.items()},
+                "overall": self.overall.summary(),
+            }
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {category: sketch.to_dict() for category, sketch in self.sketches.items()}
@@ -0,0 +1,349 @@
+"""Compact binary snapshots of the workout store.
+
+Layout (little-endian, format version 2)::
+
+    header     magic, version, record size, counts and section offsets
+    categories one (name string, first record, record count) row per category
+    records    fixed-width rows, grouped by category and sorted by time
+    strings    u64 offsets (count + 1) followed by the UTF-8 bytes
+
+Exercise names, entry ids and member ids live once in the string table and records refer
+to them by index. Because every record has the same width and each
+category's records are sorted by time, a reader can seek to a category and
+binary-search a time range straight off a memory map, without parsing the
+rest of the file. Read-only maps share page-cache pages between processes.
+
+    python -m app.snapshot fetch http://localhost:8000 store.snap
+    python -m app.snapshot info store.snap
+    python -m app.snapshot export store.snap --category Workout --since 2024-01-01 > workouts.ndjson
+    python -m app.snapshot checkpoint store.snap --wal workouts.ndjson
+"""
+import argparse
+import bisect
+import heapq
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from datetime import datetime, timezone
+from functools import lru_cache
+from .validation import TIMESTAMP_FORMAT
+
+DEFAULTS = {
+    # Loaded into the store at startup when the file exists.
+    "SNAPSHOT_PATH": None,
+}
+
+MAGIC = b"ACESNAP\0"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sHHIQQQQQ")
+# magic, format version, record size, category count, record count,
+# categories offset, records offset, strings offset, string count
+CATEGORY = struct.Struct("<IQQ")     # name string, first record, record count
+RECORD = struct.Struct("<qQIIII")    # timestamp (epoch s), version, duration, exercise, id and member strings
+# Version 1 files have no member column; the reader still accepts them.
+RECORDS = {1: struct.Struct("<qQIII"), FORMAT_VERSION: RECORD}
+OFFSET = struct.Struct("<Q")
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def to_epoch(timestamp: str) -> int:
+    return int(datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc).timestamp())
+
+
+def from_epoch(seconds: int) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+class _StringTable:
+    """Strings in index order, spooled to temporary files as they are added.
+
+    Only strings that repeat (exercise names, member ids, categories) are
+    kept in memory for deduplication; entry ids are unique and go straight
+    to the spool.
+    """
+
+    def __init__(self):
+        self.index: dict[str, int] = {}
+        self.count = 0
+        self.size = 0
+        self.offsets = tempfile.TemporaryFile()
+        self.blob = tempfile.TemporaryFile()
+        self.offsets.write(OFFSET.pack(0))
+
+    def add(self, text: str) -> int:
+        data = text.encode("utf-8")
+        self.blob.write(data)
+        self.size += len(data)
+        self.offsets.write(OFFSET.pack(self.size))
+        self.count += 1
+        return self.count - 1
+
+    def intern(self, text: str) -> int:
+        index = self.index.get(text)
+        if index is None:
+            index = self.index[text] = self.add(text)
+        return index
+
+    def copy_to(self, f):
+        for spool in (self.offsets, self.blob):
+            spool.seek(0)
+            shutil.copyfileobj(spool, f, 1 << 20)
+
+    def close(self):
+        self.offsets.close()
+        self.blob.close()
+
+
+def _read_run(fd: int, offset: int, count: int, block: int = 4096):
+    """Records of one sorted run in a spill file, read a block at a time."""
+    size = RECORD.size
+    end = offset + count * size
+    while offset < end:
+        data = os.pread(fd, min(block * size, end - offset), offset)
+        offset += len(data)
+        yield from RECORD.iter_unpack(data)
+
+
+def write_snapshot(path: str, store, run_size: int = 100000) -> int:
+    """Write ``{category: iterable of entries}`` to ``path`` atomically; returns the record count.
+
+    Rows are packed and written as they are produced. A category larger than
+    ``run_size`` is sorted in runs spilled to a temporary file and merged
+    back, so peak memory is one run plus the distinct names, not the store.
+    """
+    strings = _StringTable()
+    categories = []
+    total = 0
+    pack = RECORD.pack
+    try:
+        with open(path + ".tmp", "w+b") as f, tempfile.TemporaryFile() as spill:
+            names = list(store)
+            records_offset = HEADER.size + CATEGORY.size * len(names)
+            f.seek(records_offset)
+            for category in names:
+                runs, run = [], []
+                spill.seek(0)
+                spill.truncate()
+                for e in store[category]:
+                    entry_id = e.get("id")
+                    run.append((to_epoch(e["timestamp"]), e.get("version", 0), e["duration"],
+                                strings.intern(e["exercise"]),
+                                strings.add(entry_id) if entry_id else strings.intern(""),
+                                strings.intern(e.get("member", ""))))
+                    if len(run) >= run_size:
+                        run.sort()
+                        runs.append((spill.tell(), len(run)))
+                        spill.write(b"".join(pack(*row) for row in run))
+                        run = []
+                run.sort()
+                if runs:
+                    runs.append((spill.tell(), len(run)))
+                    spill.write(b"".join(pack(*row) for row in run))
+                    spill.flush()
+                    rows = heapq.merge(*(_read_run(spill.fileno(), offset, count) for offset, count in runs))
+                else:
+                    rows = run
+                count = 0
+                buffer = bytearray()
+                for row in rows:
+                    buffer += pack(*row)
+                    count += 1
+                    if len(buffer) >= 1 << 20:
+                        f.write(buffer)
+                        buffer.clear()
+                f.write(buffer)
+                categories.append((strings.intern(category), total, count))
+                total += count
+            strings_offset = f.tell()
+            strings.copy_to(f)
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size, len(categories), total,
+                                HEADER.size, records_offset, strings_offset, strings.count))
+            for row in categories:
+                f.write(CATEGORY.pack(*row))
+    finally:
+        strings.close()
+    os.replace(path + ".tmp", path)
+    return total
+
+
+class _Timestamps:
+    """Sequence view over one category's record timestamps, for bisect."""
+
+    def __init__(self, snapshot, first, count):
+        self.snapshot, self.first, self.count = snapshot, first, count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        snapshot = self.snapshot
+        return struct.unpack_from("<q", snapshot._map, snapshot._records + (self.first + i) * snapshot._record.size)[0]
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file.
+
+    Nothing is decoded up front: records are unpacked as they are iterated
+    and strings are decoded on first use.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            stat = os.fstat(f.fileno())
+        # Tells this file apart from a later one at the same path (see ingest.checkpoint).
+        self.identity = (stat.st_size, stat.st_mtime_ns)
+        if len(self._map) < HEADER.size:
+            raise SnapshotError(f"{path} is not an ACEest snapshot")
+        (magic, version, record_size, category_count, self.record_count, categories_offset,
+         self._records, self._strings, self.string_count) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path} is not an ACEest snapshot")
+        self._record = RECORDS.get(version)
+        if self._record is None or record_size != self._record.size:
+            raise SnapshotError(f"{path} uses snapshot format {version}; this reader supports up to {FORMAT_VERSION}")
+        self._blob = self._strings + OFFSET.size * (self.string_count + 1)
+        size = len(self._map)
+        # Every section must fit, in order, before anything is read from it.
+        if not (HEADER.size <= categories_offset
+                and categories_offset + CATEGORY.size * category_count <= self._records
+                and self._records + record_size * self.record_count <= self._strings
+                and self._blob <= size):
+            raise SnapshotError(f"{path} is truncated or corrupt")
+        self._blob_size = OFFSET.unpack_from(self._map, self._blob - OFFSET.size)[0]
+        if self._blob + self._blob_size > size:
+            raise SnapshotError(f"{path} is truncated or corrupt")
+        self.categories: dict[str, tuple[int, int]] = {}
+        for i in range(category_count):
+            name, first, count = CATEGORY.unpack_from(self._map, categories_offset + i * CATEGORY.size)
+            if first + count > self.record_count:
+                raise SnapshotError(f"{path} is truncated or corrupt")
+            self.categories[self.string(name)] = (first, count)
+        self.string = lru_cache(maxsize=65536)(self.string)
+
+    def __len__(self):
+        return self.record_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._map.close()
+
+    def string(self, index: int) -> str:
+        if not 0 <= index < self.string_count:
+            raise SnapshotError(f"{self.path} refers to string {index} of {self.string_count}")
+        start, end = struct.unpack_from("<QQ", self._map, self._strings + index * OFFSET.size)
+        if not start <= end <= self._blob_size:
+            raise SnapshotError(f"{self.path} has a corrupt string table")
+        return self._map[self._blob + start:self._blob + end].decode("utf-8")
+
+    def _range(self, category: str, since: str | None, until: str | None) -> tuple[int, int]:
+        first, count = self.categories[category]
+        times = _Timestamps(self, first, count)
+        lo = bisect.bisect_left(times, to_epoch(since)) if since else 0
+        hi = bisect.bisect_left(times, to_epoch(until)) if until else count
+        return first + lo, first + max(lo, hi)
+
+    def count(self, category: str | None = None, since: str | None = None, until: str | None = None) -> int:
+        """Records matching the filters, found by binary search alone."""
+        names = [category] if category else list(self.categories)
+        return sum(hi - lo for lo, hi in (self._range(name, since, until) for name in names))
+
+    def iter(self, category: str | None = None, since: str | None = None, until: str | None = None):
+        """Yield ``(category, entry)`` in category then time order; ``until`` is exclusive."""
+        names = [category] if category else list(self.categories)
+        unpack, size = self._record.unpack_from, self._record.size
+        for name in names:
+            lo, hi = self._range(name, since, until)
+            for offset in range(self._records + lo * size, self._records + hi * size, size):
+                seconds, version, duration, exercise, entry_id, *member = unpack(self._map, offset)
+                entry = {"exercise": self.string(exercise), "duration": duration, "timestamp": from_epoch(seconds)}
+                entry_id = self.string(entry_id)
+                if entry_id:
+                    entry["id"] = entry_id
+                if version:
+                    entry["version"] = version
+                if member and self.string(member[0]):
+                    entry["member"] = self.string(member[0])
+                yield name, entry
+
+    def __iter__(self):
+        return self.iter()
+
+
+def load(path: str, write_batch, batch_size: int = 5000) -> tuple[int, int]:
+    """Feed a snapshot's records to ``write_batch`` in batches; returns the file's ``identity``."""
+    with Snapshot(path) as snapshot:
+        batch = []
+        for item in snapshot:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                write_batch(batch)
+                batch = []
+        if batch:
+            write_batch(batch)
+        return snapshot.identity
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create and read ACEest binary snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    fetch = commands.add_parser("fetch", help="download a snapshot from a running API")
+    fetch.add_argument("url")
+    fetch.add_argument("output")
+    info = commands.add_parser("info", help="show counts per category")
+    info.add_argument("file")
+    export = commands.add_parser("export", help="write records as NDJSON (importable with app.importer)")
+    export.add_argument("file")
+    export.add_argument("--category")
+    export.add_argument("--since", help="ISO date/time, inclusive")
+    export.add_argument("--until", help="ISO date/time, exclusive")
+    checkpoint = commands.add_parser("checkpoint", help="fold a write-ahead log into the snapshot and trim the log")
+    checkpoint.add_argument("file", help="the snapshot (ACEEST_SNAPSHOT_PATH)")
+    checkpoint.add_argument("--wal", required=True, help="the write-ahead log (ACEEST_INGEST_WAL_PATH)")
+    args = parser.parse_args(argv)
+
+    if args.command == "checkpoint":
+        from .ingest import checkpoint as fold
+
+        records, folded = fold(args.wal, args.file)
+        print(f"{args.file}: {records} records ({folded} from {args.wal})")
+        return 0
+
+    if args.command == "fetch":
+        import requests
+
+        with requests.get(f"{args.url.rstrip('/')}/snapshot", stream=True, timeout=None) as response:
+            response.raise_for_status()
+            with open(args.output + ".part", "wb") as f:
+                for chunk in response.iter_content(1 << 20):
+                    f.write(chunk)
+        os.replace(args.output + ".part", args.output)
+        args.file = args.output
+    with Snapshot(args.file) as snapshot:
+        if args.command == "export":
+            out = sys.stdout
+            for category, entry in snapshot.iter(args.category, args.since, args.until):
+                out.write(json.dumps({"category": category, "workout": entry.pop("exercise"), **entry}) + "\n")
+            return 0
+        print(f"{snapshot.path}: {len(snapshot)} records, {snapshot.string_count} strings")
+        for category, (_, count) in snapshot.categories.items():
+            print(f"  {category}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+// Same-origin: the page is served by the API it talks to, so relative
+// URLs work behind any Service or ingress without extra hops.
+const API_BASE = '';
+
+function showAlert(message, type) {
+    const alert = document.getElementById('alert');
+    alert.textContent = message;
+    alert.className = `alert ${type}`;
+    alert.style.display = 'block';
+    setTimeout(() => {
+        alert.style.display = 'none';
+    }, 3000);
+}
+
+async function loadWorkouts() {
+    try {
+        const [workoutsRes, summaryRes] = await Promise.all([
+            fetch(`${API_BASE}/workouts`),
+            fetch(`${API_BASE}/summary`)
+        ]);
+
+        const workoutsData = await workoutsRes.json();
+        const summaryData = await summaryRes.json();
+
+        document.getElementById('totalWorkouts').textContent = workoutsData.count;
+        document.getElementById('totalMinutes').textContent = summaryData.total_time;
+
+        const workoutsList = document.getElementById('workoutsList');
+        const categories = ['Warm-up', 'Workout', 'Cool-down'];
+
+        let html = '';
+        categories.forEach(category => {
+            const sessions = workoutsData.by_category[category] || [];
+            html += `
+                <div class="category-section">
+                    <h3>${category}</h3>
+            `;
+
+            if (sessions.length === 0) {
+                html += '<div class="empty-state">No sessions recorded</div>';
+            } else {
+                sessions.forEach(session => {
+                    html += `
+                        <div class="workout-item">
+                            <div class="workout-info">
+                                <div class="workout-name">${session.exercise}</div>
+                                <div class="workout-meta">${session.timestamp}</div>
+                            </div>
+                            <div class="workout-badge">${session.duration} min</div>
+                        </div>
+                    `;
+                });
+            }
+
+            html += '</div>';
+        });
+
+        workoutsList.innerHTML = html;
+
+        // Show motivation
+        const motivationBox = document.getElementById('motivationBox');
+        if (summaryData.total_time > 0) {
+            motivationBox.textContent = summaryData.motivation;
+            motivationBox.style.display = 'block';
+        } else {
+            motivationBox.style.display = 'none';
+        }
+
+    } catch (error) {
+        showAlert('Failed to load workouts. Make sure the API is running.', 'error');
+    }
+}
+
+document.getElementById('workoutForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const category = document.getElementById('category').value;
+    const workout = document.getElementById('workout').value.trim();
+    const duration = parseInt(document.getElementById('duration').value);
+
+    try {
+        const response = await fetch(`${API_BASE}/workouts`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ category, workout, duration })
+        });
+
+        const data = await response.json();
+
+        if (response.ok) {
+            showAlert(`Session "${workout}" added to ${category}!`, 'success');
+            document.getElementById('workoutForm').reset();
+            document.getElementById('category').value = 'Workout';
+            loadWorkouts();
+        } else {
+            showAlert(data.error || 'Failed to add session', 'error');
+        }
+    } catch (error) {
+        showAlert('Failed to connect to API. Make sure it\'s running.', 'error');
+    }
+});
+
+loadWorkouts();
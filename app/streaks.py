@@ -0,0 +1,118 @@
+import threading
+from datetime import date
+from functools import lru_cache
+
+WINDOW_DAYS = 30
+
+
+@lru_cache(maxsize=8192)
+def day_number(day: str) -> int:
+    """``"2024-05-01..."`` -> proleptic ordinal of that calendar day."""
+    return date(int(day[:4]), int(day[5:7]), int(day[8:10])).toordinal()
+
+
+class ActiveDays:
+    """One member's active days, grouped into runs of consecutive days.
+
+    Runs are kept in a union-find keyed by day: adding a day joins it to the
+    runs ending the day before and starting the day after, so a write costs
+    near O(1) whether it is today's session or a backfill from last year,
+    and the longest run only ever grows.
+    """
+
+    __slots__ = ("parent", "span", "longest")
+
+    def __init__(self):
+        self.parent: dict[int, int] = {}
+        self.span: dict[int, tuple[int, int]] = {}  # root -> (first day, last day)
+        self.longest = 0
+
+    def __contains__(self, day: int):
+        return day in self.parent
+
+    def find(self, day: int) -> int:
+        parent = self.parent
+        root = day
+        while parent[root] != root:
+            root = parent[root]
+        while parent[day] != root:
+            parent[day], day = root, parent[day]
+        return root
+
+    def _union(self, a: int, b: int):
+        a, b = self.find(a), self.find(b)
+        (first_a, last_a), (first_b, last_b) = self.span.pop(a), self.span.pop(b)
+        self.parent[b] = a
+        span = self.span[a] = (min(first_a, first_b), max(last_a, last_b))
+        self.longest = max(self.longest, span[1] - span[0] + 1)
+
+    def add(self, day: int):
+        if day in self.parent:
+            return
+        self.parent[day] = day
+        self.span[day] = (day, day)
+        self.longest = max(self.longest, 1)
+        if day - 1 in self.parent:
+            self._union(day - 1, day)
+        if day + 1 in self.parent:
+            self._union(day, day + 1)
+
+    def current(self, today: int) -> int:
+        """Days in the run through today, or through yesterday if today is not logged yet."""
+        for day in (today, today - 1):
+            if day in self.parent:
+                first, _ = self.span[self.find(day)]
+                return day - first + 1
+        return 0
+
+    def active_in_window(self, today: int, days: int = WINDOW_DAYS) -> int:
+        return sum(1 for day in range(today - days + 1, today + 1) if day in self.parent)
+
+
+class StreakTracker:
+    """Current streak, longest streak and recent active days for every member."""
+
+    def __init__(self, today=date.today):
+        self.today = today
+        self.members: dict[str, ActiveDays] = {}
+        self._lock = threading.Lock()
+
+    def add(self, category: str, entry: dict):
+        self.add_many(((category, entry),))
+
+    def add_many(self, items):
+        with self._lock:
+            for _, entry in items:
+                regn_id = entry.get("member")
+                if regn_id is None:
+                    continue
+                days = self.members.get(regn_id)
+                if days is None:
+                    days = self.members[regn_id] = ActiveDays()
+                days.add(day_number(entry["timestamp"][:10]))
+
+    def _row(self, regn_id, days, today):
+        return {
+            "member": regn_id,
+            "current_streak": days.current(today),
+            "longest_streak": days.longest,
+            "active_days_30": days.active_in_window(today),
+        }
+
+    def get(self, regn_id: str) -> dict | None:
+        today = self.today().toordinal()
+        with self._lock:
+            days = self.members.get(regn_id)
+            return None if days is None else self._row(regn_id, days, today)
+
+    def all(self) -> list[dict]:
+        """Every member, longest current streak first."""
+        today = self.today().toordinal()
+        with self._lock:
+            rows = [self._row(regn_id, days, today) for regn_id, days in self.members.items()]
+        rows.sort(key=lambda row: (-row["current_streak"], -row["longest_streak"], row["member"]))
+        return rows
+
+
+def init_app(app):
+    app.streaks = StreakTracker()
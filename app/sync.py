@@ -0,0 +1,126 @@
+import bisect
+import heapq
+import threading
+import uuid
+
+DEFAULTS = {
+    "SYNC_LOG_LIMIT": 100000,
+    "SYNC_MAX_IDS": 1000000,
+    "SYNC_PAGE_SIZE": 1000,
+    "SYNC_MAX_PUSH": 5000,
+}
+
+MAX_ID_LENGTH = 64
+
+
+class SyncLog:
+    """Entry ids, a store-wide version counter and a log of recent changes.
+
+    Every write is stamped with the next ``version``, so "what changed since
+    version N" is a binary search over the log. Only the newest ``limit``
+    changes are kept; older ``since`` values return ``None`` and the caller
+    reads the store instead. Known ids (up to ``max_ids``, oldest forgotten
+    first) let pushed entries be deduplicated by id.
+
+    Versions restart when the process does; ``epoch`` tells clients that
+    their last version belongs to another run and a full pull is due.
+    """
+
+    def __init__(self, limit: int = 100000, max_ids: int = 1000000):
+        self.epoch = uuid.uuid4().hex
+        self.limit = limit
+        self.max_ids = max_ids
+        self.version = 0
+        self.changes: list[tuple[int, str, dict]] = []  # (version, category, entry)
+        self.ids: dict[str, int | None] = {}
+        self._lock = threading.Lock()
+
+    def _remember(self, entry_id: str, version: int | None):
+        self.ids[entry_id] = version
+        if len(self.ids) > self.max_ids:
+            del self.ids[next(iter(self.ids))]
+
+    def claim(self, entry_ids) -> set[str]:
+        """Reserve ids not seen before; the rest are duplicates of stored entries."""
+        claimed = set()
+        with self._lock:
+            for entry_id in entry_ids:
+                if entry_id not in self.ids:
+                    self._remember(entry_id, None)
+                    claimed.add(entry_id)
+        return claimed
+
+    def release(self, entry_ids):
+        """Forget claimed ids that were never stamped, e.g. after a failed write."""
+        with self._lock:
+            for entry_id in entry_ids:
+                if entry_id in self.ids and self.ids[entry_id] is None:
+                    del self.ids[entry_id]
+
+    def stamp(self, category: str, entry: dict):
+        self.stamp_many(((category, entry),))
+
+    def stamp_many(self, items):
+        with self._lock:
+            for category, entry in items:
+                if "id" not in entry:
+                    entry["id"] = uuid.uuid4().hex
+                self.version += 1
+                entry["version"] = self.version
+                self._remember(entry["id"], self.version)
+                self.changes.append((self.version, category, entry))
+            # Trim in chunks so the list is not shifted on every write.
+            if len(self.changes) > self.limit * 1.25:
+                del self.changes[:len(self.changes) - self.limit]
+
+    def since(self, version: int, limit: int):
+        """``(changes, more, upto)`` after ``version``, or ``None`` if the log no longer reaches back that far.
+
+        ``upto`` is the version the caller should ask from next time.
+        """
+        with self._lock:
+            floor = self.floor()
+            if version < floor:
+                return None
+            start = bisect.bisect_right(self.changes, version, key=lambda change: change[0])
+            page = self.changes[start:start + limit]
+            more = start + limit < len(self.changes)
+            upto = page[-1][0] if more else self.version
+            return [(category, entry) for _, category, entry in page], more, upto
+
+    def floor(self) -> int:
+        """Every change after this version is still in the log."""
+        return self.changes[0][0] - 1 if self.changes else self.version
+
+
+def changes_since(sync_log: SyncLog, store, version: int, limit: int):
+    """Like ``SyncLog.since`` but falls back to the store for versions the log no longer holds.
+
+    Each category is kept in version order, so a page costs a binary search
+    per category and a merge of at most ``limit + 1`` entries from each,
+    not a scan of the whole store: a fresh client's full pull stays linear.
+    """
+    found = sync_log.since(version, limit)
+    if found is not None:
+        return found
+    # The page stops at the log's floor, so anything written meanwhile is
+    # picked up from the log on the next call rather than possibly missed here.
+    floor = sync_log.floor()
+    runs = [[(entry["version"], category, entry) for entry in log.after_version(version, limit + 1)]
+            for category, log in store.items()]
+    older = []
+    for change in heapq.merge(*runs):
+        if change[0] > floor or len(older) > limit:
+            break
+        older.append(change)
+    page = older[:limit]
+    upto = page[-1][0] if len(older) > limit else floor
+    # Changes after the floor are still to come, from the log.
+    more = len(older) > limit or sync_log.version > floor
+    return [(category, entry) for _, category, entry in page], more, upto
+
+
+def init_app(app):
+    for key, value in DEFAULTS.items():
+        app.config.setdefault(key, value)
+    app.sync_log = SyncLog(app.config["SYNC_LOG_LIMIT"], app.config["SYNC_MAX_IDS"])
@@ -0,0 +1,111 @@
+from datetime import datetime
+from .catalog import GOALS
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+MAX_MEMBER_ID_LENGTH = 64
+
+
+class ValidationError(ValueError):
+    pass
+
+
+def parse_timestamp(value) -> str:
+    """Accept ISO-8601 date/times and return them in the store's format."""
+    if not isinstance(value, str):
+        raise ValidationError(f"Field 'timestamp' must look like {TIMESTAMP_FORMAT.replace('%', '')}")
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValidationError("Field 'timestamp' must be an ISO-8601 date or date-time") from None
+    # The common case is already in store format; skip re-formatting it.
+    if len(value) == 19 and value[10] == " ":
+        return value
+    return parsed.strftime(TIMESTAMP_FORMAT)
+
+
+def parse_workout(data, categories, allow_timestamp=False, strict_duration=False):
+    """Validate a workout payload and build its store entry.
+
+    Returns ``(category, entry)`` or raises ValidationError with the message
+    the API reports. Only bulk imports may carry their own timestamp.
+    ``duration`` goes through ``int()``, as it always has on the API;
+    ``strict_duration`` (used by imports) also rejects booleans and
+    fractional minutes.
+    """
+    category = data.get("category", "Workout")  # Default to "Workout"
+    workout = data.get("workout")
+    duration = data.get("duration")
+
+    if not isinstance(category, str) or category not in categories:
+        raise ValidationError("Invalid category. Must be: Warm-up, Workout, or Cool-down")
+
+    if workout is not None and not isinstance(workout, str):
+        raise ValidationError("Field 'workout' must be a string")
+    workout = (workout or "").strip()
+    if not workout:
+        raise ValidationError("Field 'workout' is required")
+
+    try:
+        # int() would also take True or 7.9; neither is a number of minutes.
+        if strict_duration and (isinstance(duration, bool) or isinstance(duration, float) and not duration.is_integer()):
+            raise ValueError
+        duration = int(duration)
+        if duration <= 0:
+            raise ValueError
+    except (TypeError, ValueError, OverflowError):
+        raise ValidationError("Field 'duration' must be a positive integer (minutes)") from None
+
+    timestamp = data.get("timestamp") if allow_timestamp else None
+    entry = {
+        "exercise": workout,
+        "duration": duration,
+        "timestamp": parse_timestamp(timestamp) if timestamp else datetime.now().strftime(TIMESTAMP_FORMAT)
+    }
+    member = data.get("member")
+    if member not in (None, ""):
+        entry["member"] = parse_member_id(member)
+    return category, entry
+
+
+def parse_member_id(value) -> str:
+    if not isinstance(value, str) or not 0 < len(value.strip()) <= MAX_MEMBER_ID_LENGTH:
+        raise ValidationError(f"Field 'member' must be a registration id of 1-{MAX_MEMBER_ID_LENGTH} characters")
+    return value.strip()
+
+
+def _number(field, value, low, high, integer=False):
+    try:
+        if isinstance(value, bool):
+            raise ValueError
+        value = int(value) if integer else float(value)
+        if not low <= value <= high:
+            raise ValueError
+    except (TypeError, ValueError):
+        kind = "an integer" if integer else "a number"
+        raise ValidationError(f"Field '{field}' must be {kind} between {low} and {high}") from None
+    return value
+
+
+def parse_profile(data, regn_id):
+    """Validate a member profile payload (the V1.3 user info fields)."""
+    name = data.get("name")
+    name = name.strip() if isinstance(name, str) else ""
+    if not name:
+        raise ValidationError("Field 'name' is required")
+    gender = data.get("gender")
+    if gender not in ("M", "F"):
+        raise ValidationError("Field 'gender' must be M or F")
+    goal = data.get("goal")
+    if goal is not None and goal not in GOALS:
+        raise ValidationError(f"Field 'goal' must be one of: {', '.join(GOALS)}")
+    return {
+        "regn_id": parse_member_id(regn_id),
+        "name": name,
+        "age": _number("age", data.get("age"), 1, 120, integer=True),
+        "gender": gender,
+        "height": _number("height", data.get("height"), 50, 272),
+        "weight": _number("weight", data.get("weight"), 20, 635),
+        # V1.3's default weekly calorie goal.
+        "weekly_cal_goal": _number("weekly_cal_goal", data.get("weekly_cal_goal", 2000), 1, 100000, integer=True),
+        "goal": goal,
+    }
@@ -0,0 +1,136 @@
+"""Hot-path benchmarks with a stored baseline.
+
+    pytest benchmarks                              # compare against baseline.json
+    pytest benchmarks --bench-sizes 1000,100000    # quicker run
+    pytest benchmarks --update-baseline            # record new baseline timings
+    pytest benchmarks --enforce --baseline agent.json   # CI: fail on regressions
+
+Each benchmark's median round is compared with its baseline median. It fails
+the run when it is more than ``--max-regression`` (default 25%) slower and
+the gap is larger than the spread (interquartile range) of either run and
+than ``--noise-floor``, so one noisy round or a sub-microsecond drift
+cannot fail a build. Baselines are machine-specific: record
+them on the runner that compares. The gate is enforced when the baseline was
+recorded on this machine or ``--enforce`` is given; otherwise the comparison
+is reported only. Pass ``--benchmark-disable-gc`` to keep collector pauses
+out of the timings.
+"""
+import json
+import os
+import platform
+import sys
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from app import datagen  # noqa: E402
+from app.app import create_app  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("aceest benchmarks")
+    group.addoption("--bench-sizes", default="1000,100000,1000000", help="store sizes to seed (comma separated)")
+    group.addoption("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    group.addoption("--update-baseline", action="store_true", help="write this run's median times as the baseline")
+    group.addoption("--max-regression", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    group.addoption("--noise-floor", type=float, default=5.0,
+                    help="slowdowns smaller than this many microseconds never fail (sub-microsecond timings drift between runs)")
+    group.addoption("--enforce", action="store_true", help="fail on regressions even if the baseline names another machine")
+
+
+def pytest_configure(config):
+    config._aceest_results = {}
+    config._aceest_report = []
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption("--bench-sizes").split(",")]
+        metafunc.parametrize("size", sizes, scope="session", ids=lambda size: f"{size}")
+
+
+def seed(app, size):
+    # About 1,400 rows per member over three years, so this always reaches ``size``.
+    members = datagen.generate_members(max(10, size // 1000))
+    datagen.load_into(app, datagen.generate(members, rows=size))
+
+
+def seeded_app(size):
+    app = create_app({"TESTING": True, "RATELIMIT_ENABLED": False, "LOG_ACCESS_ENABLED": False})
+    seed(app, size)
+    return app
+
+
+@pytest.fixture(scope="session")
+def seeded(size):
+    """Read benchmarks only: the store stays exactly ``size`` entries."""
+    return seeded_app(size)
+
+
+@pytest.fixture(scope="session")
+def writable(size):
+    """A separate store for write benchmarks, so their entries never reach ``seeded``."""
+    return seeded_app(size)
+
+
+@pytest.fixture(autouse=True)
+def _collect_medians(request, benchmark):
+    yield
+    if benchmark.stats is not None:
+        stats = benchmark.stats.stats
+        request.config._aceest_results[request.node.name] = (stats.median, stats.iqr)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    results = config._aceest_results
+    if not results:
+        return
+    path = config.getoption("--baseline")
+    baseline, machine = {"medians": {}, "iqr": {}}, None
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        baseline, machine = {key: data.get(key, {}) for key in baseline}, data.get("machine")
+    if config.getoption("--update-baseline"):
+        for name, (median, iqr) in results.items():
+            baseline["medians"][name], baseline["iqr"][name] = median, iqr
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"machine": platform.platform(), "python": platform.python_version(),
+                       **{key: dict(sorted(values.items())) for key, values in baseline.items()}}, f, indent=2)
+            f.write("\n")
+        config._aceest_report.append(f"baseline updated: {path}")
+        return
+    # Timings from another machine say little; show them but do not fail unless asked to.
+    enforce = config.getoption("--enforce") or machine == platform.platform()
+    if not enforce:
+        config._aceest_report.append(f"baseline recorded on {machine}; comparison is informational only")
+    limit = config.getoption("--max-regression")
+    floor = config.getoption("--noise-floor") / 1e6
+    failed = False
+    for name, (median, iqr) in sorted(results.items()):
+        base = baseline["medians"].get(name)
+        if base is None:
+            config._aceest_report.append(f"{'NEW':10} {name:45} {median * 1e6:12.1f} us")
+            continue
+        noise = max(iqr, baseline["iqr"].get(name, 0.0), floor)
+        change = median / base - 1
+        regressed = median > base * (1 + limit) + noise
+        failed |= enforce and regressed
+        config._aceest_report.append(
+            f"{'REGRESSED' if regressed else 'ok':10} {name:45} {median * 1e6:12.1f} us  "
+            f"(baseline {base * 1e6:.1f} us, {change:+.1%}, noise {noise * 1e6:.1f} us)")
+    if failed:
+        config._aceest_report.append(f"median slowdown above {limit:.0%} of baseline plus noise")
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if config._aceest_report:
+        terminalreporter.section("baseline comparison")
+        for line in config._aceest_report:
+            terminalreporter.write_line(line)
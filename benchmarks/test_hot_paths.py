@@ -0,0 +1,60 @@
+import importlib.util
+import os
+import pytest
+from conftest import ROOT
+
+
+def measure(benchmark, size, fn, *args):
+    # Enough rounds for a stable median: many on small stores, where a call
+    # takes milliseconds, and a handful on large ones, where it takes seconds.
+    rounds = 7 if size >= 100000 else 50
+    return benchmark.pedantic(fn, args=args, rounds=rounds, iterations=1, warmup_rounds=1)
+
+
+@pytest.fixture(scope="module")
+def desktop():
+    spec = importlib.util.spec_from_file_location("aceest_v13", os.path.join(ROOT, "ACEest_Fitness-V1.3.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_add_workout(benchmark, writable, size):
+    client = writable.test_client()
+    # Fixed rounds, so the store grows by the same amount on every machine.
+    rv = benchmark.pedantic(client.post, args=("/workouts",),
+                            kwargs={"json": {"category": "Workout", "workout": "Squats", "duration": 30}},
+                            rounds=200, iterations=1, warmup_rounds=5)
+    assert rv.status_code == 201
+
+
+def read_all(client, path):
+    # Bodies stream; read them in full so the whole response is timed.
+    rv = client.get(path)
+    rv.get_data()
+    return rv
+
+
+def test_list_workouts(benchmark, seeded, size):
+    assert measure(benchmark, size, read_all, seeded.test_client(), "/workouts").status_code == 200
+
+
+def test_get_summary(benchmark, seeded, size):
+    assert measure(benchmark, size, read_all, seeded.test_client(), "/summary").status_code == 200
+
+
+def test_json_serialization(benchmark, seeded, size):
+    assert sum(len(view) for view in seeded.workouts.views().values()) == size
+    data = seeded.workouts.as_dict()
+    assert measure(benchmark, size, seeded.json.dumps, data)
+
+
+def test_calories(benchmark, desktop):
+    assert benchmark(desktop.calories_burned, "Workout", 45, 72.5) > 0
+
+
+def test_bmi_bmr(benchmark, desktop):
+    def profile():
+        return desktop.calculate_bmi(72.5, 178), desktop.calculate_bmr(72.5, 178, 34, "M")
+    bmi, bmr = benchmark(profile)
+    assert 22 < bmi < 23 and bmr > 1600
@@ -7,7 +7,16 @@ echo "Workers: ${GUNICORN_WORKERS:-2}"
 echo "Threads: ${GUNICORN_THREADS:-4}"
 echo "Port: ${PORT:-8000}"
 
-# Start Gunicorn
+# Summary counters live in a tmpfs file that all workers map. Start each
+# container from zero; workers recycled by --max-requests keep the totals.
+export ACEEST_SHARED_COUNTERS_PATH="${ACEEST_SHARED_COUNTERS_PATH:-/dev/shm/aceest-summary}"
+rm -f "$ACEEST_SHARED_COUNTERS_PATH"
+
+# /ready compares busy requests with the threads each worker really has.
+export ACEEST_READY_WORKER_THREADS="${GUNICORN_THREADS:-4}"
+
+# Start Gunicorn. Access logs are written by the app as JSON from a
+# background thread (app/jsonlog.py), so gunicorn's own access log is off.
 exec gunicorn \
     --bind 0.0.0.0:${PORT:-8000} \
     --workers ${GUNICORN_WORKERS:-2} \
@@ -16,9 +25,7 @@ exec gunicorn \
     --keepalive ${GUNICORN_KEEPALIVE:-5} \
     --max-requests ${GUNICORN_MAX_REQUESTS:-1000} \
     --max-requests-jitter ${GUNICORN_MAX_REQUESTS_JITTER:-50} \
-    --access-logfile - \
     --error-logfile - \
     --log-level info \
-    --capture-output \
     --enable-stdio-inheritance \
     "app.app:create_app()"
\ No newline at end of file
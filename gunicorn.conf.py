@@ -0,0 +1,9 @@
+# Loaded by gunicorn from the working directory; command-line flags still win.
+
+
+def post_worker_init(worker):
+    # Give admission control and /ready the worker's real thread pool and queue.
+    from app.admission import gthread_backlog
+    backlog = gthread_backlog(worker)
+    worker.wsgi.admission.use_worker(worker.cfg.threads, backlog)
+    worker.wsgi.readiness.use_worker(worker.cfg.threads, backlog)
@@ -1,3 +1,11 @@
 import os, sys
 # ensure repository root is on sys.path so "import app" works in tests
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
+from app.app import create_app
+
+@pytest.fixture()
+def client():
+    app = create_app({"TESTING": True})
+    with app.test_client() as client:
+        yield client
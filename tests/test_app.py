@@ -1,13 +1,6 @@
 import json
-import pytest
 from app.app import create_app
 
-@pytest.fixture()
-def client():
-    app = create_app({"TESTING": True})
-    with app.test_client() as client:
-        yield client
-
 def test_health_ok(client):
     rv = client.get("/health")
     assert rv.status_code == 200
@@ -54,3 +47,93 @@ def test_validation_errors(client):
     
     rv = client.post("/workouts", json={"workout": "X", "duration": "abc"})
     assert rv.status_code == 400
+
+def test_ui_is_prerendered_with_etag(client):
+    rv = client.get("/ui")
+    assert rv.status_code == 200
+    assert rv.headers["ETag"]
+    assert b"localhost:8000" not in rv.data
+
+    rv = client.get("/ui", headers={"If-None-Match": rv.headers["ETag"]})
+    assert rv.status_code == 304
+    assert rv.data == b""
+
+def test_static_assets_are_fingerprinted_and_immutable(client):
+    html = client.get("/ui").get_data(as_text=True)
+    for name in ("css/app.css", "js/app.js"):
+        url = client.application.assets.url(name)
+        assert url in html
+        rv = client.get(url)
+        assert rv.status_code == 200
+        assert "immutable" in rv.headers["Cache-Control"]
+    assert client.get("/static/css/app.css").status_code == 404
+
+def test_rate_limit_returns_429_with_retry_after():
+    app = create_app({"TESTING": True, "RATELIMIT_CLIENT_WRITE_RATE": 0.5, "RATELIMIT_CLIENT_WRITE_BURST": 2})
+    client = app.test_client()
+    payload = {"workout": "Rowing", "duration": 10}
+    assert client.post("/workouts", json=payload).status_code == 201
+    assert client.post("/workouts", json=payload).status_code == 201
+    rv = client.post("/workouts", json=payload)
+    assert rv.status_code == 429
+    assert int(rv.headers["Retry-After"]) >= 1
+    # Reads have their own bucket and probes are never throttled.
+    assert client.get("/workouts").status_code == 200
+    assert client.get("/health").status_code == 200
+
+def test_load_shedding_returns_503():
+    app = create_app({"TESTING": True, "SHED_MAX_INFLIGHT": 0})
+    client = app.test_client()
+    rv = client.get("/summary")
+    assert rv.status_code == 503
+    assert rv.headers["Retry-After"] == "1"
+    assert client.get("/health").status_code == 200
+
+def test_load_shedding_on_upstream_queue_time():
+    import time
+    app = create_app({"TESTING": True, "SHED_MAX_QUEUE_MS": 100})
+    client = app.test_client()
+    stale = f"t={int((time.time() - 5) * 1000)}"
+    assert client.get("/summary", headers={"X-Request-Start": stale}).status_code == 503
+    assert client.get("/summary").status_code == 200
+
+def test_load_shedding_on_worker_backlog():
+    from collections import deque
+    from types import SimpleNamespace
+    from app.admission import gthread_backlog
+    app = create_app({"TESTING": True, "SHED_MAX_BACKLOG": 2})
+    # A gthread worker with 4 threads and 7 accepted connections: 3 are waiting.
+    worker = SimpleNamespace(futures=deque(range(7)), cfg=SimpleNamespace(threads=4))
+    app.admission.use_worker(worker.cfg.threads, gthread_backlog(worker))
+    client = app.test_client()
+    assert client.get("/summary").status_code == 503
+    worker.futures.pop()
+    assert client.get("/summary").status_code == 200
+    assert gthread_backlog(SimpleNamespace(cfg=SimpleNamespace(threads=1))) is None
+
+def test_idempotency_key_replays_original_response(client):
+    payload = {"workout": "Cycling", "duration": 20}
+    headers = {"Idempotency-Key": "abc-123"}
+    first = client.post("/workouts", json=payload, headers=headers)
+    assert first.status_code == 201
+    retry = client.post("/workouts", json=payload, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.get_json() == first.get_json()
+    assert client.get("/workouts").get_json()["count"] == 1
+
+    rv = client.post("/workouts", json={"workout": "Cycling", "duration": 25}, headers=headers)
+    assert rv.status_code == 422
+
+def test_idempotency_key_not_kept_for_failed_requests(client):
+    headers = {"Idempotency-Key": "retry-me"}
+    assert client.post("/workouts", json={"workout": "Rowing"}, headers=headers).status_code == 400
+    assert client.post("/workouts", json={"workout": "Rowing"}, headers=headers).status_code == 400
+    rv = client.post("/workouts", json={"workout": "Rowing", "duration": 5}, headers=headers)
+    assert rv.status_code == 201
+
+
+def test_api_durations_still_coerced_with_int(client):
+    # Only imports reject booleans and fractional minutes; the API keeps its int() behaviour.
+    assert client.post("/workouts", json={"workout": "Run", "duration": 7.9}).get_json()["entry"]["duration"] == 7
+    assert client.post("/workouts", json={"workout": "Run", "duration": True}).get_json()["entry"]["duration"] == 1
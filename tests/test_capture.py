@@ -0,0 +1,65 @@
+import threading
+from werkzeug.serving import make_server
+from app.app import create_app
+from app import replay
+
+
+def test_record_then_replay(tmp_path):
+    path = tmp_path / "traffic-{pid}.ndjson"
+    app = create_app({"TESTING": True, "CAPTURE_PATH": str(path), "CAPTURE_FLUSH_EVERY": 1})
+    client = app.test_client()
+    client.post("/workouts", json={"workout": "Running", "duration": 30}, headers={"Idempotency-Key": "k1"})
+    client.get("/workouts?category=Workout")
+    client.post("/workouts", json={"workout": ""})
+    app.recorder.close()
+
+    [capture_file] = tmp_path.iterdir()
+    records = replay.load_capture([capture_file])
+    assert [(r["m"], r["p"], r["s"]) for r in records] == [
+        ("POST", "/workouts", 201), ("GET", "/workouts?category=Workout", 200), ("POST", "/workouts", 400)]
+    assert records[0]["h"]["Idempotency-Key"] == "k1"
+    assert "b" not in records[1]
+
+    server = make_server("127.0.0.1", 0, create_app({"TESTING": True}), threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        results = replay.Replayer(f"http://127.0.0.1:{server.port}", concurrency=1).run(records, speed=0)
+    finally:
+        server.shutdown()
+    stats = replay.summarize(results)
+    assert stats["ALL"].count == 3
+    assert stats["ALL"].errors == 0
+    assert stats["ALL"].mismatches == 0
+    assert "POST /workouts" in replay.format_report("local", stats)
+    assert "ALL" in replay.format_diff(stats, stats)
+
+
+def test_capture_sorted_by_start_time(tmp_path):
+    # Written in completion order: the slow request that started first comes last.
+    path = tmp_path / "traffic-1.ndjson"
+    path.write_text('{"t": 2.0, "m": "GET", "p": "/a"}\n{"t": 1.0, "m": "GET", "p": "/slow"}\n')
+    other = tmp_path / "traffic-2.ndjson"
+    other.write_text('{"t": 1.5, "m": "GET", "p": "/b"}\n')
+    assert [r["p"] for r in replay.load_capture([path, other])] == ["/slow", "/b", "/a"]
+
+    empty = tmp_path / "traffic-3.ndjson"
+    empty.write_text("")
+    assert replay.main([str(empty), "--target", "http://127.0.0.1:9"]) == 1
+
+
+def test_uncaptured_bodies_are_marked_and_not_replayed(tmp_path, capsys):
+    path = tmp_path / "traffic.ndjson"
+    app = create_app({"TESTING": True, "CAPTURE_PATH": str(path), "CAPTURE_FLUSH_EVERY": 1, "CAPTURE_MAX_BODY": 64})
+    client = app.test_client()
+    client.post("/workouts", json={"workout": "Running", "duration": 30})
+    client.post("/workouts", json={"workout": "Running" * 20, "duration": 30})
+    client.post("/workouts/import?format=ndjson", content_type="application/x-ndjson",
+                data='{"workout": "Row", "duration": 3}\n')
+    app.recorder.close()
+
+    records = replay.load_capture([path])
+    assert ["b" in r for r in records] == [True, False, False]
+    assert [r.get("bs", False) for r in records] == [False, True, True]
+    assert replay.main([str(path), "--target", "http://127.0.0.1:9", "--timeout", "0.5"]) == 1
+    assert "Skipping 2 requests" in capsys.readouterr().out
@@ -0,0 +1,46 @@
+import multiprocessing
+import pytest
+from app.app import create_app
+from app.counters import SharedCounters
+
+CATEGORIES = ["Warm-up", "Workout", "Cool-down"]
+
+
+def _hammer(path, n):
+    counters = SharedCounters(CATEGORIES, path)
+    for _ in range(n):
+        counters.add("Workout", 2)
+
+
+def test_workers_share_one_set_of_counters(tmp_path):
+    path = str(tmp_path / "summary")
+    first = create_app({"TESTING": True, "SHARED_COUNTERS_PATH": path}).test_client()
+    second = create_app({"TESTING": True, "SHARED_COUNTERS_PATH": path}).test_client()
+    first.post("/workouts", json={"category": "Warm-up", "workout": "Jog", "duration": 10})
+    second.post("/workouts", json={"workout": "Squats", "duration": 25})
+    a, b = first.get("/summary").get_json(), second.get("/summary").get_json()
+    for summary in (a, b):
+        assert summary["total_time"] == 35
+        assert summary["counts"] == {"Warm-up": 1, "Workout": 1, "Cool-down": 0}
+        assert summary["version"] == 2
+
+
+def test_concurrent_processes_do_not_lose_updates(tmp_path):
+    path = str(tmp_path / "summary")
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_hammer, args=(path, 500)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    snapshot = SharedCounters(CATEGORIES, path).snapshot()
+    assert snapshot["counts"]["Workout"] == 2000
+    assert snapshot["totals"]["Workout"] == 4000
+    assert snapshot["version"] == 2000
+
+
+def test_rejects_file_for_other_categories(tmp_path):
+    path = str(tmp_path / "summary")
+    SharedCounters(CATEGORIES, path).add("Workout", 5)
+    with pytest.raises(ValueError):
+        SharedCounters(["Workout"], path)
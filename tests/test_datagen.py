@@ -0,0 +1,41 @@
+import io
+import json
+from collections import Counter
+from app import datagen
+from app.app import create_app
+from app.catalog import WORKOUT_PLAN
+from app.importer import import_rows
+
+
+def test_same_seed_same_rows():
+    first = list(datagen.generate(datagen.generate_members(20, seed=3), seed=3, rows=2000))
+    again = list(datagen.generate(datagen.generate_members(20, seed=3), seed=3, rows=2000))
+    other = list(datagen.generate(datagen.generate_members(20, seed=4), seed=4, rows=2000))
+    assert len(first) == 2000 and first == again and first != other
+
+
+def test_rows_follow_the_plan():
+    members = datagen.generate_members(50)
+    assert len({m["regn_id"] for m in members}) == 50
+    rows = list(datagen.generate(members, rows=20000))
+    names = Counter(entry["exercise"] for category, entry in rows if category == "Workout")
+    plan = [name for name, _ in WORKOUT_PLAN["Workout"]]
+    # Plan exercises dominate, most popular first; other exercises are a small tail.
+    assert [name for name, _ in names.most_common(len(plan))] == plan
+    assert sum(names[name] for name in plan) > 0.8 * sum(names.values())
+    assert all(1 <= entry["duration"] <= 90 for _, entry in rows)
+    times = [entry["timestamp"] for _, entry in rows]
+    assert times[0].startswith("2022-") and times == sorted(times, key=lambda t: t[:10])
+
+
+def test_output_imports_and_loads():
+    members = datagen.generate_members(5, seed=1)
+    out = io.StringIO()
+    assert datagen.write_ndjson(datagen.generate(members, seed=1, rows=500), out) == 500
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    report = import_rows(enumerate(rows, 1), WORKOUT_PLAN, lambda batch: None)
+    assert report.accepted == 500 and not report.errors
+
+    app = create_app({"TESTING": True})
+    assert datagen.load_into(app, datagen.generate(members, seed=1, rows=500), batch_size=64) == 500
+    assert app.test_client().get("/summary").get_json()["total_time"] == sum(row["duration"] for row in rows)
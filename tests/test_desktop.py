@@ -0,0 +1,169 @@
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+import pytest
+from werkzeug.serving import make_server
+from app.app import create_app
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+@pytest.fixture(scope="module")
+def desktop():
+    spec = importlib.util.spec_from_file_location("aceest_v13", os.path.join(ROOT, "ACEest_Fitness-V1.3.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeMaster:
+    """Stands in for a Tk root: collects after() callbacks so tests can pump them."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+
+    def pump(self):
+        callbacks, self.pending = self.pending, []
+        for callback in callbacks:
+            callback()
+
+
+def wait_for(master, predicate, attempts=200):
+    for _ in range(attempts):
+        master.pump()
+        if predicate():
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("condition not reached")
+
+
+def test_executor_delivers_results_and_progress_on_poll(desktop):
+    master = FakeMaster()
+    executor = desktop.TaskExecutor(master)
+    seen = []
+
+    def job(task, n):
+        task.report(0.5, "halfway")
+        return n * 2
+
+    executor.submit(job, 21, on_done=lambda r: seen.append(("done", r)),
+                    on_progress=lambda f, m: seen.append(("progress", f, m)))
+    wait_for(master, lambda: ("done", 42) in seen)
+    assert seen == [("progress", 0.5, "halfway"), ("done", 42)]
+    executor.shutdown()
+
+
+def test_executor_cancellation(desktop):
+    master = FakeMaster()
+    executor = desktop.TaskExecutor(master)
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def job(task):
+        started.set()
+        release.wait(2)
+        task.report(1.0)
+        return "unreachable"
+
+    task = executor.submit(job, on_done=errors.append, on_error=errors.append)
+    started.wait(2)
+    task.cancel()
+    release.set()
+    wait_for(master, lambda: errors)
+    assert isinstance(errors[0], desktop.TaskCancelled)
+    executor.shutdown()
+
+
+def test_heavy_dependencies_load_lazily():
+    script = (
+        "import importlib.util, sys\n"
+        f"spec = importlib.util.spec_from_file_location('m', {os.path.join(ROOT, 'ACEest_Fitness-V1.3.py')!r})\n"
+        "m = importlib.util.module_from_spec(spec); spec.loader.exec_module(m)\n"
+        "assert 'matplotlib' not in sys.modules and 'reportlab' not in sys.modules\n"
+        "m.prewarm_dependencies().join()\n"
+        "assert 'matplotlib.figure' in sys.modules and 'reportlab.platypus' in sys.modules\n"
+        "print(m.STARTUP.report())\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert "pre-warm finished" in result.stdout
+
+
+def test_sync_client_exchanges_deltas(desktop):
+    server = make_server("127.0.0.1", 0, create_app({"TESTING": True}), threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.port}"
+        laptop, phone = desktop.SyncClient(url), desktop.SyncClient(url)
+        for minutes in (10, 20):
+            laptop.track("Workout", {"exercise": "Run", "duration": minutes, "timestamp": "2024-05-01 07:30:00"})
+        assert laptop.sync() == []
+        assert laptop.pending_count() == 0
+
+        phone.track("Cool-down", {"exercise": "Stretch", "duration": 5, "timestamp": "2024-05-01 08:00:00"})
+        received = phone.sync()
+        assert sorted(entry["duration"] for _, entry in received) == [10, 20]
+        assert [(category, entry["exercise"]) for category, entry in laptop.sync()] == [("Cool-down", "Stretch")]
+        assert laptop.sync() == [] and laptop.version == phone.version == 3
+    finally:
+        server.shutdown()
+
+
+def test_superseded_chart_result_is_dropped(desktop):
+    app = desktop.FitnessTrackerApp.__new__(desktop.FitnessTrackerApp)
+    master = FakeMaster()
+    executor = desktop.TaskExecutor(master)
+    stale = executor.submit(lambda task: b"")
+    app.chart_task = current = executor.submit(lambda task: b"")
+    # The stale render finished before cancel(); it must neither draw nor clear the newer task.
+    app.show_progress_chart(stale, b"", 10)
+    assert app.chart_task is current
+    executor.shutdown()
+
+
+def test_desktop_shares_formulas_and_report_layout(desktop, tmp_path):
+    from app import fitness
+
+    assert desktop.calories_burned is fitness.calories_burned and desktop.calculate_bmr is fitness.calculate_bmr
+    master = FakeMaster()
+    executor = desktop.TaskExecutor(master)
+    user_info = {"name": "Ada", "regn_id": "ACE001", "age": 34, "gender": "F", "height": 170, "weight": 60,
+                 "bmi": fitness.calculate_bmi(60, 170), "bmr": fitness.calculate_bmr(60, 170, 34, "F")}
+    rows = [("Workout", {"exercise": "Run", "duration": 30, "calories": 189.0, "timestamp": f"2024-05-0{1 + i % 7} 07:00:00"})
+            for i in range(100)]
+    done, progress = [], []
+    executor.submit(desktop.build_weekly_report_pdf, str(tmp_path / "ada.pdf"), user_info, rows,
+                    on_done=done.append, on_error=done.append, on_progress=lambda f, m: progress.append(m))
+    wait_for(master, lambda: done)
+    assert done == [str(tmp_path / "ada.pdf")]
+    # 100 rows span several pages rather than running off the first one.
+    assert (tmp_path / "ada.pdf").read_bytes().count(b"/Type /Page\n") == 3
+    assert progress[-1] == "Laying out page 3/3"
+    executor.shutdown()
+
+
+def test_new_epoch_pulls_without_reuploading(desktop):
+    servers = [make_server("127.0.0.1", 0, create_app({"TESTING": True}), threaded=True) for _ in range(2)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        first, second = (f"http://127.0.0.1:{server.port}" for server in servers)
+        client = desktop.SyncClient(first)
+        client.track("Workout", {"exercise": "Run", "duration": 10, "timestamp": "2024-05-01 07:30:00"})
+        assert client.sync() == [] and client.pending_count() == 0
+        # Another worker: a different epoch and its own sessions.
+        other = desktop.SyncClient(second)
+        other.track("Workout", {"exercise": "Row", "duration": 5, "timestamp": "2024-05-01 08:00:00"})
+        other.sync()
+        client.base_url = second
+        assert [entry["exercise"] for _, entry in client.sync()] == ["Row"]
+        assert len(servers[1].app.workouts["Workout"].view()) == 1
+    finally:
+        for server in servers:
+            server.shutdown()
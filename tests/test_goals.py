@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+from app.goals import iso_week
+
+PROFILE = {"name": "Asha Rao", "age": 30, "gender": "F", "height": 165, "weight": 60, "weekly_cal_goal": 300}
+
+
+def log(client, member, duration, day, category="Workout"):
+    rv = client.post("/workouts/import?format=ndjson", data=(
+        f'{{"member": "{member}", "category": "{category}", "workout": "Run", "duration": {duration}, '
+        f'"timestamp": "{day} 07:00:00"}}\n'), content_type="application/x-ndjson")
+    assert rv.get_json()["accepted"] == 1
+
+
+def test_iso_week():
+    assert iso_week("2024-05-01") == "2024-W18"
+    assert iso_week("2021-01-03 10:00:00") == "2020-W53"
+
+
+def test_member_progress_by_week(client):
+    client.put("/members/ACE001", json=PROFILE)
+    today = date.today()
+    log(client, "ACE001", 30, today)                       # 189 kcal this week
+    log(client, "ACE001", 40, today - timedelta(days=14))  # 252 kcal
+    log(client, "ACE001", 20, today - timedelta(days=14), "Warm-up")  # backfill into the same week: +63
+
+    body = client.get("/goals/progress?member=ACE001").get_json()
+    assert body["goal"] == 300
+    current = body["current"]
+    assert current["week"] == iso_week(today.isoformat())
+    assert (current["calories"], current["minutes"], current["remaining"], current["met"]) == (189.0, 30, 111.0, False)
+    [past] = body["history"]
+    assert (past["calories"], past["minutes"], past["sessions"], past["met"]) == (315.0, 60, 2, True)
+
+    # Raising the goal and the weight re-prices every week without a rescan.
+    client.put("/members/ACE001", json={**PROFILE, "weight": 40, "weekly_cal_goal": 250})
+    body = client.get("/goals/progress?member=ACE001&weeks=0").get_json()
+    assert body["current"]["calories"] == 126.0 and body["history"] == []
+    assert client.get("/goals/progress?member=nobody").status_code == 404
+    assert client.get("/goals/progress?weeks=-1").status_code == 400
+
+
+def test_gym_dashboard(client):
+    today = date.today()
+    for regn_id, weight in (("A", 60), ("B", 100)):
+        client.put(f"/members/{regn_id}", json={**PROFILE, "weight": weight})
+        log(client, regn_id, 30, today)
+    log(client, "C", 10, today)  # no profile yet: counted, but no calories
+
+    current = client.get("/goals/progress").get_json()["current"]
+    assert (current["members_active"], current["goals_met"], current["sessions"], current["minutes"]) == (3, 1, 3, 70)
+    assert current["calories"] == 189.0 + 315.0
+
+    client.put("/members/C", json={**PROFILE, "weight": 100, "weekly_cal_goal": 100})
+    current = client.get("/goals/progress").get_json()["current"]
+    assert (current["goals_met"], current["calories"]) == (2, 189.0 + 315.0 + 105.0)
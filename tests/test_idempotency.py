@@ -0,0 +1,38 @@
+from app.idempotency import IdempotencyCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_is_bounded():
+    cache = IdempotencyCache(max_keys=3, ttl=60)
+    for i in range(10):
+        assert cache.begin(f"k{i}", "fp") == ("new", None)
+        cache.complete(f"k{i}", {"n": i})
+    assert len(cache) == 3
+    assert cache.begin("k9", "fp") == ("replay", {"n": 9})
+    assert cache.begin("k0", "fp") == ("new", None)
+
+
+def test_cache_expires_keys():
+    clock = FakeClock()
+    cache = IdempotencyCache(max_keys=100, ttl=10, clock=clock)
+    cache.begin("a", "fp"); cache.complete("a", {"ok": True})
+    clock.now = 5
+    assert cache.begin("a", "fp") == ("replay", {"ok": True})
+    clock.now = 11
+    assert cache.begin("b", "fp") == ("new", None)
+    assert len(cache) == 1
+    assert cache.begin("a", "fp") == ("new", None)
+
+
+def test_pending_key_reports_in_progress():
+    cache = IdempotencyCache(max_keys=10, ttl=10)
+    cache.begin("a", "fp")
+    assert cache.begin("a", "fp") == ("in_progress", None)
+    assert cache.begin("a", "other") == ("conflict", None)
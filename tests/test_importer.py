@@ -0,0 +1,72 @@
+import io
+import json
+from app.app import create_app
+from app import importer
+
+
+def test_csv_import_with_row_errors(client):
+    body = (
+        "category,workout,duration,timestamp\n"
+        "Workout,Running,30,2024-03-01 07:30:00\n"
+        "Warm-up,Jumping Jacks,5,\n"
+        "Yoga,Sun Salutation,20,\n"
+        ",Squats,abc,\n"
+        "Cool-down,Stretching,10,2024-03-01T08:15\n"
+    )
+    rv = client.post("/workouts/import", data=body, content_type="text/csv")
+    assert rv.status_code == 200
+    report = rv.get_json()
+    assert report["accepted"] == 3
+    assert report["rejected"] == 2
+    assert [e["row"] for e in report["errors"]] == [4, 5]
+    assert "Invalid category" in report["errors"][0]["error"]
+
+    workouts = client.get("/workouts").get_json()
+    assert workouts["count"] == 3
+    assert workouts["by_category"]["Workout"][0]["timestamp"] == "2024-03-01 07:30:00"
+    assert workouts["by_category"]["Cool-down"][0]["timestamp"] == "2024-03-01 08:15:00"
+
+
+def test_ndjson_import_batches_writes():
+    app = create_app({"TESTING": True, "IMPORT_BATCH_SIZE": 2, "IMPORT_MAX_ERRORS": 1})
+    client = app.test_client()
+    lines = [json.dumps({"workout": f"Row {i}", "duration": i + 1}) for i in range(5)]
+    lines += ["not json", "[1, 2]", json.dumps({"exercise": "Plank", "duration": 3})]
+    rv = client.post("/workouts/import", data="\n".join(lines), content_type="application/x-ndjson")
+    report = rv.get_json()
+    assert report["accepted"] == 6
+    assert report["rejected"] == 2
+    assert report["errors"] == [{"row": 6, "error": "Invalid JSON"}]
+    assert report["errors_truncated"] is True
+    assert client.get("/leaderboard?by=frequency&k=100").get_json()["leaders"][0]["sessions"] == 1
+
+
+def test_import_rejects_unknown_content_type(client):
+    assert client.post("/workouts/import", data="x", content_type="text/plain").status_code == 415
+
+
+def test_import_rows_writes_in_batches():
+    batches = []
+    rows = importer.iter_rows(io.BytesIO(b"workout,duration\n" + b"Run,10\n" * 7), "csv")
+    report = importer.import_rows(rows, {"Workout": []}, batches.append, batch_size=3)
+    assert report.accepted == 7
+    assert [len(b) for b in batches] == [3, 3, 1]
+
+
+def test_malformed_rows_are_reported_not_fatal(client):
+    lines = [b'{"workout": 5, "duration": 10}', b'{"workout": "Run", "category": ["x"], "duration": 10}',
+             b'{"workout": "Run", "duration": true}', b'{"workout": "Caf\xe9", "duration": 10}',
+             b'{"workout": "Row", "duration": 10}']
+    rv = client.post("/workouts/import", data=b"\n".join(lines), content_type="application/x-ndjson")
+    assert rv.status_code == 200
+    report = rv.get_json()
+    assert report["accepted"] == 1
+    assert [(e["row"], e["error"]) for e in report["errors"]] == [
+        (1, "Field 'workout' must be a string"),
+        (2, "Invalid category. Must be: Warm-up, Workout, or Cool-down"),
+        (3, "Field 'duration' must be a positive integer (minutes)"),
+        (4, importer.INVALID_UTF8)]
+
+    csv_body = b"workout,duration\nRun,10\nCaf\xe9,5\nRow,15\n"
+    report = client.post("/workouts/import", data=csv_body, content_type="text/csv").get_json()
+    assert report["accepted"] == 2 and report["errors"] == [{"row": 3, "error": importer.INVALID_UTF8}]
@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+import pytest
+from app import ingest, snapshot
+from app.app import create_app
+from app.ingest import GroupCommitQueue, WriteAheadLog, WriteAheadLogError, checkpoint
+
+
+def test_concurrent_submits_share_commits():
+    committed = []
+
+    def apply(items):
+        time.sleep(0.02)  # a slow fsync or transaction
+        committed.append(len(items))
+
+    queue = GroupCommitQueue(apply, max_batch=8, max_wait_ms=5)
+    threads = [threading.Thread(target=queue.submit, args=([("Workout", {"n": i})],)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert sum(committed) == queue.entries == 20
+    assert queue.batches == len(committed) < 20 and max(committed) <= 8
+
+
+def test_failed_commit_reaches_every_writer():
+    def apply(items):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        GroupCommitQueue(apply).submit([("Workout", {})])
+
+
+def test_log_replayed_on_restart(tmp_path):
+    path = tmp_path / "wal" / "workouts.ndjson"
+    config = {"TESTING": True, "INGEST_WAL_PATH": str(path)}
+    client = create_app(config).test_client()
+    posted = [client.post("/workouts", json={"workout": "Run", "duration": minutes}).get_json()["entry"]
+              for minutes in (10, 20)]
+    rv = client.post("/workouts/import?format=ndjson", content_type="application/x-ndjson",
+                     data='{"workout": "Row", "duration": 30, "member": "A", "timestamp": "2024-01-01T06:00:00"}\n')
+    assert rv.get_json()["accepted"] == 1
+
+    with open(path, "ab") as f:
+        f.write(b'{"category": "Workout", "work')  # torn by a crash, never acknowledged
+    restarted = create_app(config).test_client()
+    workouts = restarted.get("/workouts").get_json()["workouts"]
+    assert [(w["exercise"], w["duration"]) for w in workouts] == [("Run", 10), ("Run", 20), ("Row", 30)]
+    assert [w["id"] for w in workouts[:2]] == [e["id"] for e in posted]
+    assert restarted.get("/summary").get_json()["total_time"] == 60
+    assert path.read_bytes().endswith(b"}\n")
+
+
+def test_missing_fcntl_only_fails_with_a_wal(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "fcntl", None)
+    assert create_app({"TESTING": True, "INGEST_GROUP_COMMIT": True}).test_client().get("/health").status_code == 200
+    with pytest.raises(RuntimeError, match="INGEST_WAL_PATH"):
+        create_app({"TESTING": True, "INGEST_WAL_PATH": str(tmp_path / "workouts.ndjson")})
+
+
+def test_commit_latency_reaches_readiness(tmp_path, monkeypatch):
+    app = create_app({"TESTING": True, "INGEST_WAL_PATH": str(tmp_path / "workouts.ndjson"), "READY_MIN_SAMPLES": 1})
+    fsync = os.fsync
+
+    def slow_fsync(fd):
+        time.sleep(0.02)
+        fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", slow_fsync)
+    client = app.test_client()
+    for minutes in (10, 20):
+        client.post("/workouts", json={"workout": "Run", "duration": minutes})
+    # One sample per commit, fsync included, not a second one from applying it.
+    assert len(app.readiness.writes.recent()) == app.ingest.batches == 2
+    assert client.get("/ready").get_json()["signals"]["write_p99_ms"] >= 20
+
+
+def test_failed_append_is_cut_off_and_corrupt_lines_stop_replay(tmp_path, monkeypatch):
+    path = tmp_path / "workouts.ndjson"
+    wal = WriteAheadLog(str(path))
+    list(wal.replay())
+    wal.append([("Workout", {"id": "a", "exercise": "Run"})])
+    size = path.stat().st_size
+
+    def fail(fd):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "fsync", fail)
+    with pytest.raises(OSError):
+        wal.append([("Workout", {"id": "b", "exercise": "Row"})])
+    monkeypatch.undo()
+    assert path.stat().st_size == size
+    wal.close()
+
+    with open(path, "ab") as f:
+        f.write(b'{"category": "Wor\n{"category": "Workout", "id": "c"}\n')
+    with pytest.raises(WriteAheadLogError, match=f"byte {size}"):
+        list(WriteAheadLog(str(path)).replay())
+
+
+def test_logged_batch_counts_as_committed_when_apply_fails(tmp_path):
+    def apply(items):
+        raise RuntimeError("index out of sync")
+
+    wal = WriteAheadLog(str(tmp_path / "workouts.ndjson"))
+    list(wal.replay())
+    GroupCommitQueue(apply, wal).submit([("Workout", {"exercise": "Run"})])
+    assert [category for category, _ in WriteAheadLog(wal.path).replay()] == ["Workout"]
+
+
+def test_failed_push_releases_claimed_ids(tmp_path, monkeypatch):
+    client = create_app({"TESTING": True, "INGEST_WAL_PATH": str(tmp_path / "workouts.ndjson")}).test_client()
+    change = {"id": "a", "category": "Workout", "workout": "Run", "duration": 10}
+
+    def fail(fd):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "fsync", fail)
+    with pytest.raises(OSError):
+        client.post("/sync", json={"changes": [change]})
+    monkeypatch.undo()
+    assert client.post("/sync", json={"changes": [change]}).get_json()["applied"] == ["a"]
+
+
+def test_checkpoint_folds_the_log_into_the_snapshot(tmp_path):
+    wal, snap = tmp_path / "workouts.ndjson", tmp_path / "store.snap"
+    # Fewer remembered ids than entries: replay cannot rely on them to skip what the snapshot holds.
+    config = {"TESTING": True, "INGEST_WAL_PATH": str(wal), "SNAPSHOT_PATH": str(snap), "SYNC_MAX_IDS": 2}
+    client = create_app(config).test_client()
+    for minutes in (10, 20, 30):
+        client.post("/workouts", json={"workout": "Run", "duration": minutes})
+    assert snapshot.main(["checkpoint", str(snap), "--wal", str(wal)]) == 0
+    assert wal.read_bytes() == b""
+    client.post("/workouts", json={"workout": "Row", "duration": 40})
+
+    restarted = create_app(config).test_client()
+    assert sorted(w["duration"] for w in restarted.get("/workouts").get_json()["workouts"]) == [10, 20, 30, 40]
+    assert snapshot.main(["checkpoint", str(snap), "--wal", str(wal)]) == 0
+    assert wal.read_bytes() == b"" and len(snapshot.Snapshot(str(snap))) == 4
+
+
+def test_checkpoint_interrupted_before_the_new_snapshot_replays_in_full(tmp_path, monkeypatch):
+    wal, snap = tmp_path / "workouts.ndjson", tmp_path / "store.snap"
+    config = {"TESTING": True, "INGEST_WAL_PATH": str(wal), "SNAPSHOT_PATH": str(snap)}
+    client = create_app(config).test_client()
+    for minutes in (10, 20):
+        client.post("/workouts", json={"workout": "Run", "duration": minutes})
+
+    replace = os.replace
+
+    def crash(src, dst):
+        if dst == str(snap):
+            raise KeyboardInterrupt
+        replace(src, dst)
+    monkeypatch.setattr(os, "replace", crash)
+    with pytest.raises(KeyboardInterrupt):
+        checkpoint(str(wal), str(snap))
+    monkeypatch.undo()
+    # The checkpoint line is in the log, but the snapshot it names never went live.
+    assert b'"checkpoint"' in wal.read_bytes() and not snap.exists()
+    restarted = create_app(config).test_client()
+    assert restarted.get("/summary").get_json()["total_time"] == 30
+
+
+def test_checkpoint_interrupted_before_trimming_skips_folded_entries(tmp_path, monkeypatch):
+    wal, snap = tmp_path / "workouts.ndjson", tmp_path / "store.snap"
+    config = {"TESTING": True, "INGEST_WAL_PATH": str(wal), "SNAPSHOT_PATH": str(snap), "SYNC_MAX_IDS": 1}
+    client = create_app(config).test_client()
+    for minutes in (10, 20):
+        client.post("/workouts", json={"workout": "Run", "duration": minutes})
+
+    def crash(self, offset):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(WriteAheadLog, "truncate_before", crash)
+    with pytest.raises(KeyboardInterrupt):
+        checkpoint(str(wal), str(snap))
+    monkeypatch.undo()
+    client = create_app(config).test_client()
+    assert client.get("/summary").get_json()["total_time"] == 30
+    client.post("/workouts", json={"workout": "Row", "duration": 5})
+    assert create_app(config).test_client().get("/summary").get_json()["total_time"] == 35
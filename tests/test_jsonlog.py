@@ -0,0 +1,54 @@
+import json
+import logging
+import queue
+from app import jsonlog
+from app.app import create_app
+
+
+class Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def access_records(app):
+    collect = Collect()
+    logging.getLogger(jsonlog.ACCESS_LOGGER).addHandler(collect)
+    return collect.records
+
+
+def test_access_log_fields():
+    app = create_app({"TESTING": True})
+    records = access_records(app)
+    client = app.test_client()
+    client.post("/workouts", json={"workout": "Run", "duration": 5})
+    client.get("/nope")
+    created, missing = (r.fields for r in records)
+    assert created["route"] == "/workouts" and created["method"] == "POST"
+    assert created["status"] == 201 and created["latency_ms"] >= 0
+    assert created["request_bytes"] > 0 and created["response_bytes"] > 0
+    assert missing["route"] is None and missing["status"] == 404
+
+
+def test_health_is_sampled():
+    app = create_app({"TESTING": True, "LOG_SAMPLE_RATES": {"/health": 0.0}})
+    records = access_records(app)
+    client = app.test_client()
+    for _ in range(20):
+        client.get("/health")
+    client.get("/summary")
+    assert [r.fields["route"] for r in records] == ["/summary"]
+
+
+def test_json_formatter_and_full_queue_drops():
+    record = logging.LogRecord("aceest", logging.INFO, __file__, 1, "saved %s", ("Run",), None)
+    record.fields = {"status": 201}
+    handler = jsonlog.DroppingQueueHandler(queue.Queue(1))
+    handler.handle(record)
+    handler.handle(record)
+    assert handler.dropped == 1
+    line = json.loads(jsonlog.JsonFormatter().format(handler.queue.get_nowait()))
+    assert line["msg"] == "saved Run" and line["status"] == 201 and line["level"] == "INFO"
@@ -0,0 +1,40 @@
+import random
+from app.leaderboard import Leaderboard, LongestSessions, MonotonicTopK
+
+
+def test_monotonic_topk_matches_full_sort():
+    rng = random.Random(7)
+    top = MonotonicTopK(size=5)
+    for _ in range(5000):
+        top.add(f"ex{rng.randint(0, 60)}", rng.randint(1, 90))
+    expected = sorted(top.scores.items(), key=lambda kv: (-kv[1], kv[0]))[:5]
+    assert top.top(5) == expected
+
+
+def test_longest_sessions_are_bounded_and_sorted():
+    longest = LongestSessions(size=3)
+    for minutes in [10, 50, 20, 90, 5, 60]:
+        longest.add({"exercise": "Row", "duration": minutes})
+    assert [s["duration"] for s in longest.top(10)] == [90, 60, 50]
+
+
+def test_leaderboard_scopes():
+    board = Leaderboard(["Warm-up", "Workout", "Cool-down"])
+    for category, name, minutes in [("Workout", "Running", 30), ("Workout", "running", 40),
+                                    ("Workout", "Squats", 15), ("Warm-up", "Jumping Jacks", 5)]:
+        board.add(category, {"exercise": name, "duration": minutes, "timestamp": "2026-01-01 10:00:00"})
+    assert board.top("frequency", "all", 2) == [{"exercise": "Running", "sessions": 2},
+                                                {"exercise": "Jumping Jacks", "sessions": 1}]
+    assert board.top("minutes", "Workout", 1) == [{"exercise": "Running", "minutes": 70}]
+    assert board.top("longest", "Warm-up", 5)[0]["exercise"] == "Jumping Jacks"
+
+
+def test_leaderboard_endpoint(client):
+    for name, minutes in [("Running", 30), ("Running", 20), ("Plank", 45)]:
+        client.post("/workouts", json={"workout": name, "duration": minutes})
+    data = client.get("/leaderboard?by=minutes&k=1").get_json()
+    assert data["leaders"] == [{"exercise": "Running", "minutes": 50}]
+    data = client.get("/leaderboard?by=longest&category=Workout").get_json()
+    assert [s["duration"] for s in data["leaders"]] == [45, 30, 20]
+    assert client.get("/leaderboard?by=nope").status_code == 400
+    assert client.get("/leaderboard?category=Yoga").status_code == 400
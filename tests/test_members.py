@@ -0,0 +1,51 @@
+from app.app import create_app
+
+PROFILE = {"name": "Asha Rao", "age": 30, "gender": "F", "height": 165, "weight": 60}
+
+
+def calories(client):
+    return [w.get("calories") for w in client.get("/workouts").get_json()["workouts"]]
+
+
+def test_profile_round_trip(client):
+    rv = client.put("/members/ACE001", json=PROFILE)
+    assert rv.status_code == 201
+    member = rv.get_json()["member"]
+    assert member["bmi"] == 22.0 and member["bmr"] == 1320 and member["weekly_cal_goal"] == 2000
+    assert client.get("/members/ACE001").get_json()["member"] == member
+    assert client.put("/members/ACE001", json={**PROFILE, "age": 31}).status_code == 200
+    assert client.get("/members/nobody").status_code == 404
+    assert client.put("/members/ACE002", json={**PROFILE, "weight": "heavy"}).status_code == 400
+    assert client.put("/members/ACE002", json={**PROFILE, "gender": "X"}).status_code == 400
+
+
+def test_calories_attached_and_recalculated(client):
+    client.post("/workouts", json={"workout": "Run", "duration": 20, "member": "ACE001"})
+    client.post("/workouts", json={"workout": "Walk", "duration": 10, "category": "Cool-down"})
+    assert calories(client) == [None, None]
+
+    # Saving the profile tags the member's existing entries...
+    assert client.put("/members/ACE001", json=PROFILE).get_json()["recalculated"] == 1
+    assert calories(client) == [126.0, None]
+    # ...new ones are tagged on write, and a weight change rewrites them all.
+    client.post("/workouts", json={"workout": "Jog", "duration": 10, "category": "Warm-up", "member": "ACE001"})
+    assert calories(client) == [31.5, 126.0, None]
+    assert client.put("/members/ACE001", json={**PROFILE, "weight": 80}).get_json()["recalculated"] == 2
+    assert client.put("/members/ACE001", json={**PROFILE, "weight": 80, "age": 40}).get_json()["recalculated"] == 0
+    assert calories(client) == [42.0, 168.0, None]
+    assert client.post("/workouts", json={"workout": "Run", "duration": 5, "member": ""}).status_code == 201
+    assert client.post("/workouts", json={"workout": "Run", "duration": 5, "member": 7}).status_code == 400
+
+
+def test_sealed_entries_leave_the_index(tmp_path):
+    app = create_app({"TESTING": True, "RETENTION_DIR": str(tmp_path), "RETENTION_HOT_LIMIT": 4,
+                      "RETENTION_SEGMENT_SIZE": 2})
+    client = app.test_client()
+    client.put("/members/ACE001", json=PROFILE)
+    for minutes in range(1, 7):
+        client.post("/workouts", json={"workout": "Run", "duration": minutes, "member": "ACE001"})
+    assert app.workouts.flush(5)
+    assert len(app.members.entries["ACE001"]) == 4
+    assert client.put("/members/ACE001", json={**PROFILE, "weight": 70}).get_json()["recalculated"] == 4
+    # Sealed history keeps the calories it was written with.
+    assert calories(client) == [6.3, 12.6] + [round(7.35 * minutes, 1) for minutes in range(3, 7)]
@@ -0,0 +1,59 @@
+import pstats
+import time
+from app.app import create_app
+
+
+def test_profiling_is_off_by_default(client):
+    assert client.application.profiler is None
+    assert "X-Profiled" not in client.get("/health").headers
+
+
+def test_sampled_requests_write_pstats(tmp_path):
+    app = create_app({"TESTING": True, "PROFILE_SAMPLE_RATE": 1.0, "PROFILE_FORMAT": "pstats",
+                      "PROFILE_DIR": str(tmp_path), "PROFILE_FLUSH_EVERY": 2})
+    client = app.test_client()
+    assert client.post("/workouts", json={"workout": "Run", "duration": 5}).headers["X-Profiled"] == "1"
+    client.get("/summary")
+    [dump] = tmp_path.glob("GET_summary.*.pstats")
+    stats = pstats.Stats(str(dump))
+    assert any(func[2] == "get_summary" for func in stats.stats)
+    assert list(tmp_path.glob("POST_workouts.*.pstats"))
+
+
+def test_authenticated_header_writes_folded_stacks(tmp_path):
+    app = create_app({"TESTING": True, "PROFILE_TOKEN": "s3cret", "PROFILE_DIR": str(tmp_path),
+                      "PROFILE_FLUSH_EVERY": 1})
+
+    def slow():
+        time.sleep(0.05)
+        return "done"
+    app.add_url_rule("/slow", "slow", slow)
+    client = app.test_client()
+
+    assert "X-Profiled" not in client.get("/slow").headers
+    assert "X-Profiled" not in client.get("/slow", headers={"X-Profile": "wrong"}).headers
+    assert client.get("/slow", headers={"X-Profile": "s3cret"}).headers["X-Profiled"] == "1"
+    [folded] = tmp_path.glob("GET_slow.*.folded")
+    lines = folded.read_text().splitlines()
+    assert lines
+    stack, samples = lines[0].rsplit(" ", 1)
+    assert int(samples) >= 1
+    assert any("slow (test_profiling.py" in line for line in lines)
+
+
+def test_concurrent_pstats_request_falls_back_to_sampling(tmp_path):
+    from app.profiling import RequestProfiler
+
+    profiler = RequestProfiler(str(tmp_path), "pstats", 1.0, 100)
+    first = profiler.begin("GET_a")
+    # A second profile while the first is running must not touch cProfile.
+    second = profiler.begin("GET_b")
+    assert first[1] is not None and second[1] is None
+    time.sleep(0.02)
+    profiler.end(second)
+    profiler.end(first)
+    profiler.flush()
+    assert list(tmp_path.glob("GET_a.*.pstats")) and list(tmp_path.glob("GET_b.*.folded"))
+    third = profiler.begin("GET_c")
+    profiler.end(third)
+    assert third[1] is not None
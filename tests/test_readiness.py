@@ -0,0 +1,51 @@
+from collections import deque
+from types import SimpleNamespace
+from app.admission import gthread_backlog
+from app.app import create_app
+from app.readiness import LatencyWindow, p99
+
+
+def test_ready_reports_signals(client):
+    client.post("/workouts", json={"workout": "Run", "duration": 5})
+    rv = client.get("/ready")
+    assert rv.status_code == 200
+    body = rv.get_json()
+    assert body["status"] == "ready" and body["failing"] == []
+    assert body["signals"]["busy_threads"] == 0 and body["signals"]["queue_depth"] is None
+
+
+def test_slow_requests_fail_readiness_but_not_liveness():
+    app = create_app({"TESTING": True, "READY_MAX_P99_MS": 100, "READY_MIN_SAMPLES": 5})
+    for _ in range(10):
+        app.readiness.latency.add(250.0)
+    client = app.test_client()
+    rv = client.get("/ready")
+    assert rv.status_code == 503
+    assert rv.get_json()["failing"] == ["latency_p99_ms"]
+    assert client.get("/health").status_code == 200
+
+
+def test_queue_depth_and_write_latency_thresholds():
+    app = create_app({"TESTING": True, "READY_WORKER_THREADS": 2, "READY_MAX_QUEUE_DEPTH": 1,
+                      "READY_MAX_WRITE_P99_MS": 0, "READY_MIN_SAMPLES": 1})
+    client = app.test_client()
+    client.post("/workouts", json={"workout": "Run", "duration": 5})
+    # A gthread worker with both threads busy and two more connections accepted.
+    worker = SimpleNamespace(futures=deque(range(4)), cfg=SimpleNamespace(threads=2))
+    app.readiness.use_worker(worker.cfg.threads, gthread_backlog(worker))
+    for _ in range(2):
+        app.readiness.started()
+    body = client.get("/ready").get_json()
+    assert body["signals"]["busy_threads"] == 2 and body["signals"]["queue_depth"] == 2
+    assert body["failing"] == ["queue_depth", "write_p99_ms"]
+
+
+def test_old_samples_age_out():
+    now = [0.0]
+    window = LatencyWindow(100, seconds=30, clock=lambda: now[0])
+    window.add(900.0)
+    now[0] = 20.0
+    window.add(10.0)
+    assert p99(window.recent()) == 900.0
+    now[0] = 40.0
+    assert window.recent() == [10.0]
@@ -0,0 +1,54 @@
+import json
+from datetime import date, timedelta
+from app.members import MemberRegistry
+from app.recommendations import Recommender
+
+TODAY = date(2024, 5, 10)
+
+
+def entry(exercise, days_ago, duration=20, member="A"):
+    return {"member": member, "exercise": exercise, "duration": duration,
+            "timestamp": f"{TODAY - timedelta(days=days_ago)} 07:00:00"}
+
+
+def parsed(recommender, member="A", goal=None):
+    return json.loads(recommender.recommend(member, goal)[0])
+
+
+def test_scores_rotate_recent_exercises_and_weight_the_goal():
+    recommender = Recommender(MemberRegistry(("Warm-up", "Workout", "Cool-down")), today=lambda: TODAY)
+    recommender.add_many([("Workout", entry("push-ups", 0)), ("Workout", entry("Squats", 5)),
+                          ("Workout", entry("Deadlift", 1))])
+    body = parsed(recommender, goal="Muscle Gain")
+    workout = body["categories"]["Workout"]
+    # Lunges: focus and never done; Squats: focus, done 5 days ago; Plank: not a focus; Push-ups: done today.
+    assert [e["exercise"] for e in workout["exercises"]] == ["Lunges", "Squats", "Plank"]
+    assert workout["exercises"][1]["last_done_days_ago"] == 5 and workout["recent_minutes"] == 60
+    assert body["focus"] == "Warm-up" and body["diet"][2] == {"meal": "Post-Workout", "food": "Protein Shake, Greek Yogurt"}
+    assert parsed(recommender, member=None)["diet"] == []
+
+
+def test_cached_until_the_member_changes():
+    recommender = Recommender(MemberRegistry(("Warm-up", "Workout", "Cool-down")), today=lambda: TODAY)
+    recommender.add("Workout", entry("Plank", 2))
+    first = recommender.recommend("A")
+    assert recommender.recommend("A") == first and ("A", None) in recommender._cache
+    recommender.add("Workout", entry("Plank", 0, member="B"))
+    assert ("A", None) in recommender._cache
+    recommender.add("Workout", entry("Plank", 0))
+    assert ("A", None) not in recommender._cache and recommender.recommend("A") != first
+    recommender.recommend("stranger")
+    assert ("stranger", None) not in recommender._cache
+
+
+def test_endpoint_uses_profile_goal_and_etags(client):
+    client.put("/members/ACE001", json={"name": "Asha", "age": 30, "gender": "F", "height": 165, "weight": 60,
+                                        "goal": "Endurance"})
+    rv = client.get("/recommendations?member=ACE001")
+    assert rv.status_code == 200 and rv.get_json()["goal"] == "Endurance"
+    assert client.get("/recommendations?member=ACE001", headers={"If-None-Match": rv.headers["ETag"]}).status_code == 304
+    client.post("/workouts", json={"workout": "Plank", "duration": 10, "member": "ACE001"})
+    assert client.get("/recommendations?member=ACE001", headers={"If-None-Match": rv.headers["ETag"]}).status_code == 200
+    assert client.get("/recommendations?goal=Bulking").status_code == 400
+    assert client.put("/members/ACE002", json={"name": "B", "age": 30, "gender": "F", "height": 165, "weight": 60,
+                                               "goal": "Bulking"}).status_code == 400
@@ -0,0 +1,44 @@
+import json
+import os
+from datetime import date
+from app import datagen, reports
+
+
+def write_inputs(tmp_path, members=12):
+    profiles = datagen.generate_members(members, seed=5)
+    members_path, workouts_path = tmp_path / "members.ndjson", tmp_path / "workouts.ndjson"
+    members_path.write_text("".join(json.dumps(m) + "\n" for m in profiles))
+    with open(workouts_path, "w", encoding="utf-8") as f:
+        datagen.write_ndjson(datagen.generate(profiles, seed=5, days=60), f)
+    return str(members_path), str(workouts_path), profiles
+
+
+def test_parse_week():
+    assert reports.parse_week("2024-W18") == ("2024-W18", date(2024, 4, 29))
+    assert reports.parse_week(None, today=date(2024, 5, 8)) == ("2024-W18", date(2024, 4, 29))
+
+
+def test_batch_renders_every_member_and_resumes(tmp_path):
+    members_path, workouts_path, profiles = write_inputs(tmp_path)
+    out = str(tmp_path / "reports")
+    rendered, errors = reports.run(members_path, workouts_path, out, "2022-W05", workers=2, shards=4)
+    assert rendered == len(profiles) and errors == []
+    week_dir = os.path.join(out, "2022-W05")
+    assert sorted(os.listdir(week_dir)) == sorted(f"{m['regn_id']}.pdf" for m in profiles)
+    assert open(os.path.join(week_dir, os.listdir(week_dir)[0]), "rb").read(5) == b"%PDF-"
+    assert not os.path.exists(os.path.join(out, ".spool-2022-W05"))
+
+    # A rerun after a crash only renders what is missing.
+    os.remove(reports.report_path(week_dir, profiles[3]["regn_id"]))
+    assert reports.run(members_path, workouts_path, out, "2022-W05", workers=2) == (1, [])
+    assert reports.run(members_path, workouts_path, out, "2022-W05", workers=2) == (0, [])
+
+
+def test_resume_reuses_a_finished_spool(tmp_path):
+    members_path, workouts_path, profiles = write_inputs(tmp_path, members=4)
+    out = tmp_path / "reports"
+    spool = str(out / ".spool-2022-W05")
+    (out / "2022-W05").mkdir(parents=True)
+    assert reports.partition(members_path, workouts_path, spool, str(out / "2022-W05"), date(2022, 1, 31), 3) == 4
+    os.remove(workouts_path)  # the spool is all a restart needs
+    assert reports.run(members_path, workouts_path, str(out), "2022-W05", workers=1) == (4, [])
@@ -0,0 +1,45 @@
+from app.search import ExerciseIndex, normalize
+
+
+def test_normalize_folds_case_accents_and_punctuation():
+    assert normalize("  Push-Ups (3x10) ") == "push ups 3x10"
+    assert normalize("Café Étirement") == "cafe etirement"
+
+
+def test_prefix_and_full_text_search():
+    index = ExerciseIndex(recent_per_name=2)
+    for name in ["Push-ups", "push ups", "Pull-ups", "Squats", "Jump Squats", "Plank"]:
+        index.add("Workout", {"exercise": name, "duration": 10, "timestamp": "2026-01-01 10:00:00"})
+
+    assert [s["exercise"] for s in index.suggest("pu")] == ["Push-ups", "Pull-ups"]
+    assert index.suggest("push")[0] == {"exercise": "Push-ups", "count": 2}
+    assert [s["exercise"] for s in index.suggest("squ")] == ["Jump Squats", "Squats"]
+    assert [s["exercise"] for s in index.suggest("jump sq")] == ["Jump Squats"]
+    assert index.suggest("jum squats") == []
+    assert index.suggest("zzz") == []
+
+
+def test_recent_entries_are_bounded():
+    index = ExerciseIndex(recent_per_name=3)
+    for minutes in range(1, 11):
+        index.add("Workout", {"exercise": "Rowing", "duration": minutes, "timestamp": "t"})
+    [result] = index.search("row", entries=5)
+    assert result["count"] == 10
+    assert [e["duration"] for e in result["recent"]] == [10, 9, 8]
+    assert len(index) == 1
+
+
+def test_search_endpoint(client):
+    client.post("/workouts", json={"workout": "Running", "duration": 30})
+    client.post("/workouts", json={"category": "Warm-up", "workout": "Running drills", "duration": 10})
+
+    rv = client.get("/workouts/search?q=run")
+    assert rv.status_code == 200
+    data = rv.get_json()
+    assert data["count"] == 2
+    assert {r["exercise"] for r in data["results"]} == {"Running", "Running drills"}
+    assert data["results"][0]["recent"][0]["category"] in ("Workout", "Warm-up")
+
+    rv = client.get("/workouts/search?q=running%20dr&mode=suggest")
+    assert rv.get_json()["suggestions"] == [{"exercise": "Running drills", "count": 1}]
+    assert client.get("/workouts/search").status_code == 400
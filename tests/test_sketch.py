@@ -0,0 +1,71 @@
+import random
+from app.sketch import DurationSketch
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    position = q * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def test_small_datasets_are_exact():
+    values = [5, 10, 10, 20, 30, 45, 60]
+    sketch = DurationSketch()
+    for v in values:
+        sketch.add(v)
+    assert sketch.exact
+    for q in (0.5, 0.9, 0.99):
+        assert sketch.quantile(q) == exact_quantile(values, q)
+    assert sketch.summary()["p50"] == 20
+
+
+def test_large_datasets_are_bounded_and_close():
+    rng = random.Random(11)
+    values = [rng.randint(1, 120) for _ in range(50000)]
+    sketch = DurationSketch(compression=100, exact_limit=500)
+    for v in values:
+        sketch.add(v)
+    assert not sketch.exact
+    assert len(sketch.centroids) <= 200
+    for q in (0.5, 0.9, 0.99):
+        assert abs(sketch.quantile(q) - exact_quantile(values, q)) <= 2
+    mean = sum(values) / len(values)
+    assert abs(sketch.mean - mean) < 1e-9
+    assert abs(sketch.variance - sum((v - mean) ** 2 for v in values) / len(values)) < 1e-6
+
+
+def test_sketches_merge_across_workers():
+    rng = random.Random(5)
+    values = [rng.randint(1, 90) for _ in range(20000)]
+    workers = [DurationSketch(exact_limit=100) for _ in range(4)]
+    for i, v in enumerate(values):
+        workers[i % 4].add(v)
+    merged = DurationSketch(exact_limit=100)
+    for w in workers:
+        merged.merge(DurationSketch.from_dict(w.to_dict()))
+    assert merged.count == len(values)
+    assert merged.min == min(values) and merged.max == max(values)
+    assert abs(merged.quantile(0.9) - exact_quantile(values, 0.9)) <= 2
+
+    small = DurationSketch()
+    small.add(3)
+    other = DurationSketch()
+    other.add(7)
+    small.merge(other)
+    assert small.exact and small.quantile(0.5) == 5
+
+
+def test_summary_stats_endpoint(client):
+    for minutes in (10, 20, 30):
+        client.post("/workouts", json={"workout": "Run", "duration": minutes})
+    client.post("/workouts", json={"category": "Warm-up", "workout": "Jog", "duration": 5})
+    data = client.get("/summary/stats").get_json()
+    workout = data["by_category"]["Workout"]
+    assert workout["count"] == 3
+    assert workout["p50"] == 20
+    assert workout["mean"] == 20
+    assert data["overall"]["count"] == 4
+    assert data["by_category"]["Cool-down"]["p50"] is None
+    assert "sketches" in client.get("/summary/stats?include=sketch").get_json()
@@ -0,0 +1,106 @@
+import json
+import pytest
+from app import snapshot
+from app.app import create_app
+
+STORE = {
+    "Warm-up": [{"exercise": "Jog", "duration": 5, "timestamp": "2024-03-02 07:00:00", "id": "w1"}],
+    "Workout": [
+        {"exercise": "Squats", "duration": 20, "timestamp": "2024-03-03 08:00:00", "id": "a", "version": 7},
+        {"exercise": "Rowing", "duration": 30, "timestamp": "2024-03-01 08:00:00", "id": "b"},
+        {"exercise": "Squats", "duration": 25, "timestamp": "2024-03-05 08:00:00"},
+    ],
+    "Cool-down": [],
+}
+
+
+def test_round_trip_and_slicing(tmp_path):
+    path = str(tmp_path / "store.snap")
+    assert snapshot.write_snapshot(path, STORE) == 4
+    with snapshot.Snapshot(path) as snap:
+        assert len(snap) == 4 and snap.string_count == 10
+        assert list(snap.categories) == ["Warm-up", "Workout", "Cool-down"]
+        workouts = [entry for _, entry in snap.iter("Workout")]
+        assert [e["timestamp"] for e in workouts] == ["2024-03-01 08:00:00", "2024-03-03 08:00:00", "2024-03-05 08:00:00"]
+        assert workouts[1] == {"exercise": "Squats", "duration": 20, "timestamp": "2024-03-03 08:00:00", "id": "a", "version": 7}
+        assert "id" not in workouts[2]
+        assert snap.count("Workout", since="2024-03-02", until="2024-03-05") == 1
+        assert [e["exercise"] for _, e in snap.iter(since="2024-03-02T00:00:00")] == ["Jog", "Squats", "Squats"]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.snap"
+    path.write_bytes(b"{}" * 64)
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.Snapshot(str(path))
+
+
+def test_app_downloads_and_loads_snapshots(tmp_path):
+    source = create_app({"TESTING": True}).test_client()
+    for minutes in (10, 40):
+        source.post("/workouts", json={"workout": "Cycling", "duration": minutes})
+    rv = source.get("/snapshot")
+    assert rv.status_code == 200 and rv.mimetype == "application/octet-stream"
+    path = tmp_path / "store.snap"
+    path.write_bytes(rv.data)
+
+    restored = create_app({"TESTING": True, "SNAPSHOT_PATH": str(path)}).test_client()
+    assert restored.get("/summary").get_json()["total_time"] == 50
+    assert restored.get("/leaderboard?by=longest").get_json()["leaders"][0]["duration"] == 40
+    assert restored.get("/workouts/search?q=cyc").get_json()["results"][0]["count"] == 2
+
+
+def test_cli_export(tmp_path, capsys):
+    path = str(tmp_path / "store.snap")
+    snapshot.write_snapshot(path, STORE)
+    assert snapshot.main(["export", path, "--category", "Workout", "--until", "2024-03-04"]) == 0
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(r["workout"], r["category"]) for r in rows] == [("Rowing", "Workout"), ("Squats", "Workout")]
+
+
+def test_member_ids_survive_and_version_1_still_reads(tmp_path):
+    path = str(tmp_path / "store.snap")
+    snapshot.write_snapshot(path, {"Workout": [{"exercise": "Run", "duration": 10, "timestamp": "2024-03-01 08:00:00",
+                                                "member": "ACE001"}]})
+    with snapshot.Snapshot(path) as snap:
+        assert next(iter(snap))[1]["member"] == "ACE001"
+
+    # A version 1 file: one Workout record, no member column.
+    strings = [b"Workout", b"Run", b""]
+    offsets = b"".join(snapshot.OFFSET.pack(sum(map(len, strings[:i]))) for i in range(len(strings) + 1))
+    record = snapshot.RECORDS[1].pack(snapshot.to_epoch("2024-03-01 08:00:00"), 0, 10, 1, 2)
+    records_at = snapshot.HEADER.size + snapshot.CATEGORY.size
+    old = tmp_path / "old.snap"
+    old.write_bytes(snapshot.HEADER.pack(snapshot.MAGIC, 1, len(record), 1, 1, snapshot.HEADER.size, records_at,
+                                         records_at + len(record), len(strings))
+                    + snapshot.CATEGORY.pack(0, 0, 1) + record + offsets + b"".join(strings))
+    with snapshot.Snapshot(str(old)) as snap:
+        assert list(snap) == [("Workout", {"exercise": "Run", "duration": 10, "timestamp": "2024-03-01 08:00:00"})]
+
+
+def test_large_categories_sort_in_spilled_runs(tmp_path):
+    rows = [{"exercise": f"Row {i % 7}", "duration": i, "timestamp": f"2024-03-{1 + (i * 37) % 28:02d} 08:00:00",
+             "id": f"r{i}"} for i in range(50)]
+    small, whole = str(tmp_path / "small.snap"), str(tmp_path / "whole.snap")
+    assert snapshot.write_snapshot(small, {"Workout": rows}, run_size=8) == 50
+    snapshot.write_snapshot(whole, {"Workout": rows})
+    with snapshot.Snapshot(small) as a, snapshot.Snapshot(whole) as b:
+        assert list(a) == list(b)
+        assert [e["timestamp"] for _, e in a] == sorted(e["timestamp"] for e in rows)
+
+
+def test_truncated_or_corrupt_files_raise_snapshot_error(tmp_path):
+    path = tmp_path / "store.snap"
+    snapshot.write_snapshot(str(path), STORE)
+    data = path.read_bytes()
+    for size in (snapshot.HEADER.size + 4, len(data) // 2, len(data) - 1):
+        path.write_bytes(data[:size])
+        with pytest.raises(snapshot.SnapshotError):
+            snapshot.Snapshot(str(path))
+    # A record pointing past the string table.
+    records_at = snapshot.HEADER.unpack_from(data)[6]
+    bad = bytearray(data)
+    snapshot.RECORD.pack_into(bad, records_at, *snapshot.RECORD.unpack_from(data, records_at)[:3], 999, 0, 0)
+    path.write_bytes(bytes(bad))
+    with snapshot.Snapshot(str(path)) as snap, pytest.raises(snapshot.SnapshotError):
+        list(snap)
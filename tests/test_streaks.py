@@ -0,0 +1,51 @@
+import random
+from datetime import date, timedelta
+from app.streaks import ActiveDays, StreakTracker
+
+
+def brute_force(days, today):
+    def run_back(day):
+        length = 0
+        while day - length in days:
+            length += 1
+        return length
+
+    longest = max((run_back(day) for day in days), default=0)
+    current = run_back(today) or run_back(today - 1)
+    return current, longest, sum(1 for day in range(today - 29, today + 1) if day in days)
+
+
+def test_backfilled_days_match_a_full_recount():
+    rng = random.Random(4)
+    today = 1000
+    for _ in range(20):
+        days = rng.sample(range(900, 1002), rng.randint(1, 80))
+        tracked = ActiveDays()
+        for day in days:  # arrival order is random, like backfills
+            tracked.add(day)
+            tracked.add(day)
+        assert (tracked.current(today), tracked.longest, tracked.active_in_window(today)) == brute_force(set(days), today)
+
+
+def test_tracker_per_member():
+    today = date(2024, 5, 10)
+    tracker = StreakTracker(today=lambda: today)
+    for offset in (1, 2, 4, 3, 40, 41):  # 2024-05-06..09, then a backfilled gap-filler
+        tracker.add("Workout", {"member": "A", "timestamp": f"{today - timedelta(days=offset)} 07:00:00"})
+    tracker.add("Workout", {"timestamp": "2024-05-10 07:00:00"})
+    assert tracker.get("A") == {"member": "A", "current_streak": 4, "longest_streak": 4, "active_days_30": 4}
+    assert tracker.get("B") is None
+
+
+def test_streaks_endpoint(client):
+    today = date.today()
+    for regn_id, offsets in (("A", (0, 1, 2)), ("B", (5,))):
+        for offset in offsets:
+            client.post("/workouts/import?format=ndjson", content_type="application/x-ndjson", data=(
+                f'{{"member": "{regn_id}", "workout": "Run", "duration": 10, '
+                f'"timestamp": "{today - timedelta(days=offset)} 07:00:00"}}\n'))
+    body = client.get("/streaks").get_json()
+    assert [(row["member"], row["current_streak"], row["longest_streak"]) for row in body["members"]] == [
+        ("A", 3, 3), ("B", 0, 1)]
+    assert client.get("/streaks?member=B").get_json()["active_days_30"] == 1
+    assert client.get("/streaks?member=C").status_code == 404
@@ -0,0 +1,86 @@
+from app.app import create_app
+from app.sync import SyncLog
+
+
+def change(entry_id, workout="Run", duration=10, category="Workout"):
+    return {"id": entry_id, "category": category, "workout": workout, "duration": duration,
+            "timestamp": "2024-05-01T07:30:00"}
+
+
+def test_push_and_pull_in_one_round_trip(client):
+    client.post("/workouts", json={"workout": "Squats", "duration": 15})
+    rv = client.post("/sync", json={"since_version": 0, "changes": [change("a"), change("b", "Jog", 5, "Warm-up")]})
+    body = rv.get_json()
+    assert rv.status_code == 200
+    assert body["applied"] == ["a", "b"] and body["duplicates"] == [] and body["errors"] == []
+    # The client's own entries are not echoed back; the server's one is.
+    assert [c["exercise"] for c in body["changes"]] == ["Squats"]
+    assert body["version"] == 3 and body["more"] is False
+
+    pulled = client.get(f"/sync?since_version=1&epoch={body['epoch']}").get_json()
+    assert [(c["id"], c["version"], c["timestamp"]) for c in pulled["changes"]] == [
+        ("a", 2, "2024-05-01 07:30:00"), ("b", 3, "2024-05-01 07:30:00")]
+    assert client.get("/workouts").get_json()["count"] == 3
+
+
+def test_conflicts_resolved_by_id(client):
+    client.post("/sync", json={"changes": [change("a")]})
+    retry = client.post("/sync", json={"changes": [change("a", duration=99), change("c"), change("c"),
+                                                   {"id": "", "workout": "X", "duration": 1},
+                                                   change("d", duration=-1)]}).get_json()
+    assert retry["applied"] == ["c"]
+    assert retry["duplicates"] == ["a", "c"]
+    assert [e["id"] for e in retry["errors"]] == ["", "d"]
+    assert [w["duration"] for w in client.get("/workouts").get_json()["workouts"]] == [10, 10]
+
+
+def test_unknown_epoch_or_trimmed_log_returns_everything():
+    app = create_app({"TESTING": True, "SYNC_LOG_LIMIT": 2, "SYNC_PAGE_SIZE": 2})
+    client = app.test_client()
+    for i in range(6):
+        client.post("/workouts", json={"workout": f"Lunges {i}", "duration": 5})
+    assert len(app.sync_log.changes) < 6
+    first = client.get("/sync?since_version=0").get_json()
+    assert [c["version"] for c in first["changes"]] == [1, 2] and first["more"]
+    seen, version = [1, 2], first["version"]
+    while True:
+        page = client.get(f"/sync?since_version={version}").get_json()
+        seen += [c["version"] for c in page["changes"]]
+        version = page["version"]
+        if not page["more"]:
+            break
+    assert seen == [1, 2, 3, 4, 5, 6]
+    stale = client.get("/sync?since_version=4&epoch=other-run").get_json()
+    assert [c["version"] for c in stale["changes"]] == [1, 2]
+
+
+def test_sync_log_since():
+    log = SyncLog(limit=10)
+    log.stamp_many([("Workout", {"exercise": "Row"}), ("Workout", {"exercise": "Ski"})])
+    changes, more, upto = log.since(1, 10)
+    assert [entry["exercise"] for _, entry in changes] == ["Ski"] and not more and upto == 2
+
+
+def test_malformed_pushed_changes_are_reported(client):
+    body = client.post("/sync", json={"changes": [change("a"), {**change("b"), "workout": 5},
+                                                  {**change("c"), "category": ["Workout"]}]}).get_json()
+    assert body["applied"] == ["a"]
+    assert body["errors"] == [{"id": "b", "error": "Field 'workout' must be a string"},
+                              {"id": "c", "error": "Invalid category. Must be: Warm-up, Workout, or Cool-down"}]
+
+
+def test_full_pull_pages_through_sealed_segments(tmp_path):
+    app = create_app({"TESTING": True, "SYNC_LOG_LIMIT": 4, "SYNC_PAGE_SIZE": 3, "RETENTION_DIR": str(tmp_path),
+                      "RETENTION_HOT_LIMIT": 4, "RETENTION_SEGMENT_SIZE": 2})
+    client = app.test_client()
+    for i in range(20):
+        client.post("/workouts", json={"workout": f"Row {i}", "duration": 5, "category": ("Workout", "Warm-up")[i % 2]})
+    assert app.workouts.flush(5) and app.workouts.stats()["Workout"]["segments"] > 1
+    seen, version = [], 0
+    while True:
+        page = client.get(f"/sync?since_version={version}").get_json()
+        seen += [c["version"] for c in page["changes"]]
+        version = page["version"]
+        if not page["more"]:
+            break
+    assert seen == list(range(1, 21))